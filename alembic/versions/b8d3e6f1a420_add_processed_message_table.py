@@ -0,0 +1,32 @@
+"""add processed message table
+
+Revision ID: b8d3e6f1a420
+Revises: f4a7c2e9b105
+Create Date: 2026-10-18 18:04:51.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d3e6f1a420'
+down_revision: Union[str, None] = 'f4a7c2e9b105'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('processed_message',
+    sa.Column('message_id', sa.String(), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('message_id')
+    )
+    op.create_index(op.f('ix_processed_message_processed_at'), 'processed_message', ['processed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_processed_message_processed_at'), table_name='processed_message')
+    op.drop_table('processed_message')
@@ -0,0 +1,39 @@
+"""add vehicle is_available
+
+Revision ID: c7d2f5a8e914
+Revises: a4c8e1f3b692
+Create Date: 2026-10-18 15:48:03.815276
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2f5a8e914'
+down_revision: Union[str, None] = 'a4c8e1f3b692'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('vehicle', sa.Column('is_available', sa.Boolean(), server_default=sa.true(), nullable=False))
+    # Backfill: every vehicle with a sale, whatever its status, is not available.
+    op.execute(
+        'UPDATE vehicle SET is_available = false '
+        'WHERE EXISTS (SELECT 1 FROM vehicle_sold WHERE vehicle_sold.vehicle_id = vehicle.id)'
+    )
+    op.create_index(
+        'ix_vehicle_available_price_id',
+        'vehicle',
+        ['price', 'id'],
+        unique=False,
+        postgresql_where=sa.text('is_available'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vehicle_available_price_id', table_name='vehicle')
+    op.drop_column('vehicle', 'is_available')
@@ -0,0 +1,25 @@
+"""add vehicle sold status created at index
+
+Revision ID: d5f8a2c4e736
+Revises: b8d3e6f1a420
+Create Date: 2026-10-18 18:41:07.529613
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f8a2c4e736'
+down_revision: Union[str, None] = 'b8d3e6f1a420'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_vehicle_sold_status_created_at', 'vehicle_sold', ['status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vehicle_sold_status_created_at', table_name='vehicle_sold')
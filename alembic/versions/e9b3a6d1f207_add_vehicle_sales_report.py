@@ -0,0 +1,51 @@
+"""add vehicle sales report
+
+Revision ID: e9b3a6d1f207
+Revises: c7d2f5a8e914
+Create Date: 2026-10-18 16:37:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9b3a6d1f207'
+down_revision: Union[str, None] = 'c7d2f5a8e914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('vehicle_sold', sa.Column('brand_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(None, 'vehicle_sold', 'vehicle_brand', ['brand_id'], ['id'])
+    op.create_table('vehicle_sales_report',
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('brand_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('sales_count', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['brand_id'], ['vehicle_brand.id'], ),
+    sa.PrimaryKeyConstraint('status', 'brand_id', 'month')
+    )
+    # Backfill: confirmed sales are reported under the current brand of their vehicle.
+    op.execute(
+        'UPDATE vehicle_sold SET brand_id = vehicle.brand_id '
+        'FROM vehicle WHERE vehicle.id = vehicle_sold.vehicle_id'
+    )
+    op.execute(
+        "INSERT INTO vehicle_sales_report (status, brand_id, month, sales_count, revenue, updated_at) "
+        "SELECT status::text, brand_id, date_trunc('month', sold_date)::date, count(*), sum(sold_price), now() "
+        "FROM vehicle_sold "
+        "WHERE status IN ('awaiting_pickup', 'sold') AND sold_date IS NOT NULL "
+        "GROUP BY 1, 2, 3"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('vehicle_sales_report')
+    op.drop_constraint('vehicle_sold_brand_id_fkey', 'vehicle_sold', type_='foreignkey')
+    op.drop_column('vehicle_sold', 'brand_id')
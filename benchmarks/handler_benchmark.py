@@ -0,0 +1,381 @@
+"""
+Load-test the Lambda handlers in-process with synthetic events.
+
+Each handler runs against a freshly seeded database: a temporary SQLite file by
+default, or the database of --database-url. Every table of that database is
+dropped and created again, so only point it at a dedicated one.
+
+Requests are sent from --concurrency threads, as that many warm containers
+sharing the database would. The SQS handlers run one invocation at a time, as
+their container keeps a single event loop. Allocations are measured apart,
+on --alloc-samples sequential requests traced with tracemalloc, so tracing
+does not slow down the timed requests.
+
+Usage: python -m benchmarks.handler_benchmark [--inventory 10000] [--requests 200]
+    [--concurrency 4] [--handlers get_vehicle list_available_vehicles]
+    [--database-url postgresql://localhost/vehicle_benchmark]
+    [--save NAME] [--compare NAME]
+"""
+import argparse
+import contextlib
+import importlib
+import json
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from cryptography.fernet import Fernet
+
+BASELINES = Path(__file__).resolve().parent / "baselines"
+
+BRANDS = 20
+SQS_BATCH_SIZE = 10
+
+class Pools(NamedTuple):
+    """Ids of the seeded vehicles, by the state their handlers expect."""
+    available: range
+    draft: range
+    awaiting_pickup: range
+
+class Handler(NamedTuple):
+    """A handler, the event of its i-th request, and how many it may run at once."""
+    module: str
+    function: str
+    event: Callable[[int, Pools], dict]
+    max_concurrency: Optional[int] = None
+
+def http_event(
+        path_id: Optional[int] = None,
+        query: Optional[Dict[str, str]] = None,
+        body: Any = None
+    ) -> dict:
+    """API Gateway HTTP API event of an authenticated request."""
+    return {
+        "pathParameters": {"id": str(path_id)} if path_id is not None else {},
+        "queryStringParameters": query,
+        "headers": {"authorization": "Bearer token", "content-type": "application/json"},
+        "body": json.dumps(body) if body is not None else None,
+        "requestContext": {"authorizer": {"jwt": {"claims": {"sub": "benchmark-user"}}}},
+    }
+
+def sqs_event(index: int, vehicle_ids: range) -> dict:
+    """SQS event with a batch of sale messages, one message group per vehicle."""
+    records = []
+    for position in range(index * SQS_BATCH_SIZE, (index + 1) * SQS_BATCH_SIZE):
+        vehicle_id = vehicle_ids[position % len(vehicle_ids)]
+        records.append({
+            "messageId": f"message-{position}",
+            "body": json.dumps({"vehicle_id": vehicle_id}),
+            "attributes": {"MessageGroupId": str(vehicle_id)},
+        })
+
+    return {"Records": records}
+
+def vehicle_body(model: str, price: float = 25000) -> dict:
+    """Body of a vehicle registration or update."""
+    return {"brand_name": "Brand 1", "model": model, "year": 2020, "color": "blue", "price": price}
+
+def pick(ids: range, index: int) -> int:
+    """The id a request works on, cycling once the pool is used up."""
+    return ids[index % len(ids)]
+
+CONTROLLERS = "vehicle.adapters.controllers"
+
+HANDLERS = {
+    "get_vehicle": Handler(
+        "get_vehicle_controller", "get_vehicle",
+        lambda index, pools: http_event(pick(pools.available, index)),
+    ),
+    "list_available_vehicles": Handler(
+        "list_available_vehicles_controller", "list_available_vehicles",
+        lambda index, pools: http_event(query={"limit": "50"}),
+    ),
+    "list_sold_vehicles": Handler(
+        "list_sold_vehicles_controller", "list_sold_vehicles",
+        lambda index, pools: http_event(query={"limit": "50"}),
+    ),
+    "search_vehicles": Handler(
+        "search_vehicles_controller", "search_vehicles",
+        lambda index, pools: http_event(query={"brand_name": f"Brand {index % BRANDS}", "year_min": "2010"}),
+    ),
+    "get_sales_report": Handler(
+        "get_sales_report_controller", "get_sales_report",
+        lambda index, pools: http_event(),
+    ),
+    "register_vehicle": Handler(
+        "create_vehicle_controller", "register_vehicle",
+        lambda index, pools: http_event(body=vehicle_body(f"Registered {index}")),
+    ),
+    "update_vehicle": Handler(
+        "update_vehicle_controller", "update_vehicle",
+        lambda index, pools: http_event(
+            pick(pools.available, index),
+            body=vehicle_body(f"Model {pick(pools.available, index)}", 30000 + index),
+        ),
+    ),
+    "import_vehicles": Handler(
+        "import_vehicles_controller", "import_vehicles",
+        lambda index, pools: http_event(body=[vehicle_body(f"Imported {index}-{row}") for row in range(50)]),
+    ),
+    "initialize_sale": Handler(
+        "initialize_sale_controller", "initialize_sale",
+        lambda index, pools: http_event(pick(pools.available, index)),
+    ),
+    "cancel_sale": Handler(
+        "cancel_sale_controller", "cancel_sale",
+        lambda index, pools: http_event(pick(pools.draft, index)),
+    ),
+    "confirm_pickup": Handler(
+        "confirm_pickup_controller", "confirm_pickup",
+        lambda index, pools: http_event(pick(pools.awaiting_pickup, index)),
+    ),
+    "confirm_sale": Handler(
+        "confirm_sale_controller", "confirm_sale",
+        lambda index, pools: sqs_event(index, pools.draft),
+        max_concurrency=1,
+    ),
+    "revert_sale": Handler(
+        "revert_sale_controller", "revert_sale",
+        lambda index, pools: sqs_event(index, pools.draft),
+        max_concurrency=1,
+    ),
+    "relay_outbox": Handler(
+        "relay_outbox_controller", "relay_outbox",
+        lambda index, pools: {},
+    ),
+    "purge_idempotency_records": Handler(
+        "purge_idempotency_records_controller", "purge_idempotency_records",
+        lambda index, pools: {},
+    ),
+    "expire_draft_sales": Handler(
+        "expire_draft_sales_controller", "expire_draft_sales",
+        lambda index, pools: {},
+    ),
+}
+
+class StatementCounter:
+    """Count the statements sent by each thread, whatever the engine."""
+    def __init__(self):
+        self.local = threading.local()
+
+    def install(self) -> None:
+        """Listen to every engine."""
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        event.listen(Engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args) -> None:
+        self.local.count = self.count() + 1
+
+    def count(self) -> int:
+        """Statements sent by the current thread so far."""
+        return getattr(self.local, "count", 0)
+
+def seed(inventory: int, pool_size: int) -> Pools:
+    """Create the schema and seed brands, vehicles, sales and outbox messages."""
+    from vehicle.infrastructure.database import models
+    from vehicle.infrastructure.database.setup import Base, engine
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    available = range(1, inventory + 1)
+    draft = range(available.stop, available.stop + pool_size)
+    awaiting_pickup = range(draft.stop, draft.stop + pool_size)
+    sold = range(awaiting_pickup.stop, awaiting_pickup.stop + max(inventory // 10, 1))
+    now = datetime.now()
+
+    with engine.begin() as connection:
+        connection.execute(models.VehicleBrand.__table__.insert(), [
+            {"id": index + 1, "name": f"Brand {index}"} for index in range(BRANDS)
+        ])
+        connection.execute(models.Vehicle.__table__.insert(), [
+            {
+                "id": vehicle_id,
+                "brand_id": vehicle_id % BRANDS + 1,
+                "model": f"Model {vehicle_id}",
+                "year": 2000 + vehicle_id % 25,
+                "color": "red",
+                "price": 10000 + vehicle_id,
+                "is_available": vehicle_id in available,
+            }
+            for vehicle_id in range(1, sold.stop)
+        ])
+        sales = [(draft, models.StatusEnum.draft), (awaiting_pickup, models.StatusEnum.awaiting_pickup), (sold, models.StatusEnum.sold)]
+        connection.execute(models.VehicleSold.__table__.insert(), [
+            {
+                "vehicle_id": vehicle_id,
+                "status": status,
+                "sold_price": 10000 + vehicle_id,
+                "brand_id": vehicle_id % BRANDS + 1,
+                "sold_date": now,
+                "user_id": "benchmark-user",
+                # Old enough for the draft sweeper to reclaim them.
+                "created_at": now - timedelta(days=1),
+            }
+            for vehicle_ids, status in sales
+            for vehicle_id in vehicle_ids
+        ])
+        connection.execute(models.OutboxMessage.__table__.insert(), [
+            {"queue": "initialize_payment", "group_id": str(vehicle_id), "body": "{}"}
+            for vehicle_id in draft
+        ])
+
+    return Pools(available, draft, awaiting_pickup)
+
+def percentile(durations: List[float], percent: int) -> float:
+    """Nearest-rank percentile of durations."""
+    ordered = sorted(durations)
+
+    return ordered[max(round(percent / 100 * len(ordered)) - 1, 0)]
+
+def failed(response: Any) -> bool:
+    """Whether a handler response is a server error."""
+    return isinstance(response, dict) and response.get("statusCode", 200) >= 500
+
+def run(name: str, inventory: int, requests: int, concurrency: int, warmup: int, alloc_samples: int, counter: StatementCounter) -> dict:
+    """Seed the database, send the requests to a handler and summarize them."""
+    handler = HANDLERS[name]
+    function = getattr(importlib.import_module(f"{CONTROLLERS}.{handler.module}"), handler.function)
+    batch = SQS_BATCH_SIZE if handler.max_concurrency == 1 else 1
+    pools = seed(inventory, (warmup + requests + alloc_samples) * batch)
+
+    def invoke(index: int) -> tuple:
+        event = handler.event(index, pools)
+        statements = counter.count()
+        started_at = time.perf_counter()
+        try:
+            error = failed(function(event, None))
+        except Exception:
+            error = True
+
+        return (time.perf_counter() - started_at) * 1000, counter.count() - statements, error
+
+    for index in range(warmup):
+        invoke(index)
+
+    workers = min(concurrency, handler.max_concurrency or concurrency)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(invoke, range(warmup, warmup + requests)))
+
+    allocations = []
+    tracemalloc.start()
+    for index in range(warmup + requests, warmup + requests + alloc_samples):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        invoke(index)
+        allocations.append((tracemalloc.get_traced_memory()[1] - baseline) / 1024)
+    tracemalloc.stop()
+
+    durations = [duration for duration, _, _ in results]
+
+    return {
+        "handler": name,
+        "concurrency": workers,
+        "requests": requests,
+        "errors": sum(error for _, _, error in results),
+        "p50_ms": round(percentile(durations, 50), 2),
+        "p95_ms": round(percentile(durations, 95), 2),
+        "p99_ms": round(percentile(durations, 99), 2),
+        "statements": round(statistics.mean(statements for _, statements, _ in results), 1),
+        "peak_kib": round(statistics.mean(allocations), 1) if allocations else None,
+    }
+
+def change(current: float, previous: Optional[float]) -> str:
+    """Relative change against a baseline."""
+    if not previous:
+        return "n/a"
+
+    return f"{(current - previous) / previous * 100:+.0f}%"
+
+def report(results: List[dict], baseline: Optional[Dict[str, dict]]) -> List[str]:
+    """Format the results, and their change against a baseline, as markdown lines."""
+    header = "| handler | threads | requests | errors | p50 (ms) | p95 (ms) | p99 (ms) | statements | peak KiB |"
+    if baseline is not None:
+        header += " p95 vs baseline | statements vs baseline |"
+    lines = [header, "|" + " --- |" + " ---: |" * (header.count("|") - 2)]
+
+    for result in results:
+        line = (
+            f"| {result['handler']} | {result['concurrency']} | {result['requests']} | {result['errors']} "
+            f"| {result['p50_ms']:.1f} | {result['p95_ms']:.1f} | {result['p99_ms']:.1f} "
+            f"| {result['statements']:.1f} | {result['peak_kib'] if result['peak_kib'] is not None else 'n/a'} |"
+        )
+        if baseline is not None:
+            previous = baseline.get(result["handler"], {})
+            line += (
+                f" {change(result['p95_ms'], previous.get('p95_ms'))} "
+                f"| {change(result['statements'], previous.get('statements'))} |"
+            )
+        lines.append(line)
+
+    return lines
+
+def main(arguments: argparse.Namespace) -> None:
+    """Benchmark the handlers, print the report and save or compare baselines."""
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DATABASE_URL"] = arguments.database_url or f"sqlite:///{directory}/benchmark.db"
+        # The relay sends to the in-memory queue instead of SQS.
+        os.environ.pop("INITIALIZE_PAYMENT_QUEUE_URL", None)
+        os.environ["MESSAGE_QUEUE_IN_MEMORY"] = "true"
+        os.environ.setdefault("OUTBOX_ENCRYPTION_KEY", Fernet.generate_key().decode())
+
+        counter = StatementCounter()
+        counter.install()
+        results = []
+        # Handlers print their metrics and log every invocation.
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            logging.disable(logging.WARNING)
+            for name in arguments.handlers:
+                results.append(run(
+                    name,
+                    arguments.inventory,
+                    arguments.requests,
+                    arguments.concurrency,
+                    arguments.warmup,
+                    arguments.alloc_samples,
+                    counter,
+                ))
+            logging.disable(logging.NOTSET)
+
+    baseline = None
+    if arguments.compare:
+        baseline = {
+            result["handler"]: result
+            for result in json.loads((BASELINES / f"{arguments.compare}.json").read_text())["results"]
+        }
+
+    print("\n".join(report(results, baseline)))
+
+    if arguments.save:
+        BASELINES.mkdir(exist_ok=True)
+        configuration = {
+            key: value for key, value in vars(arguments).items()
+            if key in ("inventory", "requests", "concurrency", "warmup", "alloc_samples")
+        }
+        (BASELINES / f"{arguments.save}.json").write_text(
+            json.dumps({"configuration": configuration, "results": results}, indent=2)
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--inventory", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--alloc-samples", type=int, default=20)
+    parser.add_argument("--handlers", nargs="+", choices=sorted(HANDLERS), default=list(HANDLERS))
+    parser.add_argument("--database-url")
+    parser.add_argument("--save", metavar="NAME", help="save the results as a baseline")
+    parser.add_argument("--compare", metavar="NAME", help="compare the results with a saved baseline")
+
+    main(parser.parse_args())
@@ -0,0 +1,106 @@
+"""
+Compare the listing read and serialization paths.
+
+entities: the previous path, loading ORM objects with their brand, validating a
+Vehicle entity per row and serializing with model_dump and json.dumps.
+columns: the current path, selecting the listing columns into dicts and
+serializing the page with pydantic-core through model_dump_json.
+
+Usage: python -m benchmarks.serialization_benchmark [--sizes 1000 10000 100000] [--runs 5]
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import Callable, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, joinedload, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from vehicle.adapters.repositories.vehicle_repository_adapter import VehicleRepositoryAdapter
+from vehicle.application.services.pagination import build_page
+from vehicle.domain.entities.vehicle import Vehicle as VehicleEntity
+from vehicle.infrastructure.database import models
+from vehicle.infrastructure.database.setup import Base
+
+def seed(size: int) -> Session:
+    """Create an in-memory database with size available vehicles."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    brands = [models.VehicleBrand(name=f"Brand {index}") for index in range(20)]
+    db.add_all(brands)
+    db.flush()
+    db.execute(models.Vehicle.__table__.insert(), [
+        {
+            "brand_id": brands[index % 20].id,
+            "model": f"Model {index}",
+            "year": 2000 + index % 25,
+            "color": "red",
+            "price": 10000 + index,
+        }
+        for index in range(size)
+    ])
+    db.commit()
+
+    return db
+
+def entities(db: Session, size: int) -> str:
+    """Previous listing path."""
+    vehicles = db.query(models.Vehicle) \
+        .options(joinedload(models.Vehicle.brand)) \
+        .filter(models.Vehicle.is_available) \
+        .order_by(models.Vehicle.price, models.Vehicle.id) \
+        .limit(size + 1) \
+        .all()
+    page = [VehicleEntity(
+        id=vehicle.id,
+        brand_name=vehicle.brand.name,
+        model=vehicle.model,
+        year=vehicle.year,
+        color=vehicle.color,
+        price=vehicle.price,
+        sold=None
+        ) for vehicle in vehicles][:size]
+
+    return json.dumps({"vehicles": [vehicle.model_dump() for vehicle in page], "next_cursor": None})
+
+def columns(db: Session, size: int) -> str:
+    """Current listing path."""
+    vehicles = VehicleRepositoryAdapter(db).get_all_available(size + 1)
+
+    return build_page(vehicles, size).model_dump_json()
+
+def measure(path: Callable[[Session, int], str], db: Session, size: int, runs: int) -> List[float]:
+    """Run a path runs times and return the durations in milliseconds."""
+    durations = []
+    for _ in range(runs):
+        db.expunge_all()
+        start = time.perf_counter()
+        path(db, size)
+        durations.append((time.perf_counter() - start) * 1000)
+
+    return durations
+
+def main(sizes: List[int], runs: int) -> None:
+    """Print the median duration of every path and size."""
+    print("| rows | entities (ms) | columns (ms) | speedup |")
+    print("| ---: | ---: | ---: | ---: |")
+    for size in sizes:
+        db = seed(size)
+        assert json.loads(entities(db, size)) == json.loads(columns(db, size))
+
+        before = statistics.median(measure(entities, db, size, runs))
+        after = statistics.median(measure(columns, db, size, runs))
+        print(f"| {size} | {before:.1f} | {after:.1f} | {before / after:.1f}x |")
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the listing serialization paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--runs", type=int, default=5)
+    arguments = parser.parse_args()
+
+    main(arguments.sizes, arguments.runs)
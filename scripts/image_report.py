@@ -0,0 +1,114 @@
+"""
+Build the deployment image variants and compare their size and handler import time.
+
+The monolith variant installs vehicle/requirements.txt, as the single image used to.
+The other variants are the images declared in serverless.yml.
+
+Usage: python scripts/image_report.py [--platform linux/arm64] [--runs 3]
+Requires Docker.
+"""
+import argparse
+import re
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+
+VARIANTS = {
+    "monolith": "requirements.txt",
+    "vehicle": "requirements-runtime.txt",
+    "vehicle-relay": "requirements-relay.txt",
+}
+
+def handler_images() -> Dict[str, str]:
+    """Map each handler module to the image its function runs on."""
+    images = {}
+    for function in sorted((ROOT / "resources" / "functions").glob("*.yml")):
+        definition = function.read_text()
+        image = re.search(r"^  name: (\S+)$", definition, re.MULTILINE).group(1)
+        command = re.search(r'command: \["([\w.]+)"\]', definition).group(1)
+        images[command.rsplit(".", 1)[0]] = image
+
+    return images
+
+def build(variant: str, requirements: str, platform: str) -> str:
+    """Build an image variant and return its tag."""
+    tag = f"auto-deal-{variant}:report"
+    subprocess.run(
+        [
+            "docker", "build",
+            "--platform", platform,
+            "--build-arg", f"REQUIREMENTS={requirements}",
+            "--tag", tag,
+            str(ROOT / "vehicle"),
+        ],
+        check=True,
+    )
+
+    return tag
+
+def image_size_mb(tag: str) -> float:
+    """Size of an image, in megabytes."""
+    size = subprocess.run(
+        ["docker", "image", "inspect", "--format", "{{.Size}}", tag],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    return int(size) / 1024 / 1024
+
+def import_time_ms(tag: str, module: str, platform: str) -> float:
+    """Cumulative import time of a handler module in a fresh container, in milliseconds."""
+    result = subprocess.run(
+        [
+            "docker", "run", "--rm",
+            "--platform", platform,
+            "--entrypoint", "python",
+            tag,
+            "-X", "importtime", "-c", f"import {module}",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and line.split("|")[2].strip() == module:
+            return int(line.split("|")[1]) / 1000
+
+    raise ValueError(f"{module} was not imported")
+
+def report(platform: str, runs: int) -> List[str]:
+    """Build every variant and return the report as markdown lines."""
+    images = handler_images()
+    lines = [
+        "| image | size (MB) | handler | import p50 (ms) |",
+        "| --- | ---: | --- | ---: |",
+    ]
+
+    for variant, requirements in VARIANTS.items():
+        tag = build(variant, requirements, platform)
+        size = image_size_mb(tag)
+        modules = [
+            module for module, image in images.items()
+            if variant == "monolith" or image == variant
+        ]
+
+        for module in modules:
+            times = [import_time_ms(tag, module, platform) for _ in range(runs)]
+            lines.append(
+                f"| {variant} | {size:.0f} | {module.rsplit('.', 1)[-1]} "
+                f"| {statistics.median(times):.0f} |"
+            )
+
+    return lines
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--platform", default="linux/arm64")
+    parser.add_argument("--runs", type=int, default=3)
+    arguments = parser.parse_args()
+
+    print("\n".join(report(arguments.platform, arguments.runs)))
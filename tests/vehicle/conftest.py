@@ -0,0 +1,106 @@
+"""Shared fixtures for the vehicle tests."""
+import os
+from typing import List
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Read when the outbox cipher is set up, before the adapters are imported.
+os.environ.setdefault("OUTBOX_ENCRYPTION_KEY", "IS40Y2ZDWd3wStnh4A2bnHrnhi7EckHKVPN7UxuoUV4=")
+
+from vehicle.infrastructure.database.setup import Base
+from vehicle.infrastructure.database import models
+
+class StatementCounter:
+    """Record every SQL statement sent to the database while active."""
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.statements: List[str] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        """Number of statements recorded."""
+        return len(self.statements)
+
+    def __enter__(self) -> "StatementCounter":
+        self.statements.clear()
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+@pytest.fixture
+def db_engine() -> Engine:
+    """Fixture for an isolated in-memory database."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def db_session(db_engine: Engine) -> Session:
+    """Fixture for a session bound to the in-memory database."""
+    session = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)()
+    yield session
+    session.close()
+
+@pytest.fixture
+def statement_counter(db_engine: Engine) -> StatementCounter:
+    """Fixture for counting the statements emitted by a block of code."""
+    return StatementCounter(db_engine)
+
+@pytest.fixture
+def seed_vehicles(db_session: Session):
+    """Fixture that seeds brands, vehicles and sales."""
+    def seed(available: int = 3, sold: int = 3) -> List[int]:
+        brands = [models.VehicleBrand(name=f"Brand {index}") for index in range(2)]
+        db_session.add_all(brands)
+        db_session.flush()
+
+        vehicles = []
+        for index in range(available + sold):
+            vehicle = models.Vehicle(
+                brand_id=brands[index % 2].id,
+                model=f"Model {index}",
+                year=2020,
+                color="red",
+                price=10000 + index * 1000,
+            )
+            if index >= available:
+                vehicle.is_available = False
+                vehicle.sold = models.VehicleSold(
+                    sold_price=vehicle.price,
+                    user_id=f"user-{index}",
+                )
+            vehicles.append(vehicle)
+
+        db_session.add_all(vehicles)
+        db_session.flush()
+        vehicle_ids = [vehicle.id for vehicle in vehicles]
+        db_session.commit()
+        db_session.expunge_all()
+
+        return vehicle_ids
+    return seed
+
+@pytest.fixture
+def stage_payment_requests(db_session: Session):
+    """Fixture that stages the payment requests of draft sales, as initialize_sale does."""
+    def stage(vehicle_ids: List[int]) -> None:
+        db_session.add_all([
+            models.OutboxMessage(queue="initialize_payment", group_id=str(vehicle_id), body="{}")
+            for vehicle_id in vehicle_ids
+        ])
+        db_session.commit()
+
+    return stage
@@ -0,0 +1,41 @@
+"""Test the conditional GET helpers."""
+import pytest
+
+from vehicle.adapters.http.conditional import is_not_modified, not_modified, weak_etag
+
+def test_weak_etag_depends_on_every_part() -> None:
+    """Test that the ETag is weak, stable and changes with any part."""
+    etag = weak_etag("available", "3:2024-01-01T00:00:00", 20, None)
+
+    assert etag.startswith('W/"')
+    assert etag == weak_etag("available", "3:2024-01-01T00:00:00", 20, None)
+    assert etag != weak_etag("available", "3:2024-01-01T00:00:00", 10, None)
+    assert etag != weak_etag("available", "2:2024-01-01T00:00:00", 20, None)
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    (None, False),
+    ('W/"abc"', True),
+    ('"abc"', True),
+    ('W/"other"', False),
+    ('W/"other", W/"abc"', True),
+    ('*', True),
+])
+def test_is_not_modified(if_none_match, expected) -> None:
+    """Test the weak comparison of If-None-Match against the ETag."""
+    headers = {"If-None-Match": if_none_match} if if_none_match else {}
+
+    assert is_not_modified({"headers": headers}, 'W/"abc"') is expected
+
+def test_is_not_modified_header_case_and_missing_headers() -> None:
+    """Test that header names are case insensitive and headers may be absent."""
+    assert is_not_modified({"headers": {"if-none-match": 'W/"abc"'}}, 'W/"abc"')
+    assert not is_not_modified({"headers": None}, 'W/"abc"')
+    assert not is_not_modified({}, 'W/"abc"')
+
+def test_not_modified() -> None:
+    """Test that a 304 carries the ETag and no body."""
+    assert not_modified('W/"abc"') == {
+        "statusCode": 304,
+        "headers": {"ETag": 'W/"abc"'},
+        "body": "",
+    }
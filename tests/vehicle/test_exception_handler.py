@@ -0,0 +1,68 @@
+"""Test the mapping of exceptions to controller responses and logs."""
+import json
+from unittest.mock import MagicMock
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from vehicle.exceptions.error_mapping import resolve_error
+from vehicle.exceptions.exception_handler import event_exception_handlers, http_exception_handler
+from vehicle.exceptions.vehicle_exceptions import VehicleAlreadySoldError, VehicleNotFoundError
+
+class Limit(BaseModel):
+    """Model raising a ValidationError."""
+    limit: int
+
+class PopularVehicleNotFoundError(VehicleNotFoundError):
+    """Exception without a mapping of its own."""
+
+def raising(error: Exception):
+    """Handler that raises the given error."""
+    def handler(event, context):
+        raise error
+    return handler
+
+def validation_error() -> ValidationError:
+    """A pydantic ValidationError, which is also a ValueError."""
+    try:
+        Limit(limit="many")
+    except ValidationError as error:
+        return error
+
+@pytest.mark.parametrize("error, status_code, body", [
+    (VehicleAlreadySoldError("Vehicle already sold", 409), 409, {"message": "Vehicle already sold", "error": "Vehicle already sold"}),
+    (PopularVehicleNotFoundError("Vehicle not found", 404), 404, {"message": "Vehicle not found", "error": "Vehicle not found"}),
+    (KeyError("id"), 400, {"message": "Key error", "error": "'id'"}),
+    (ValueError("bad cursor"), 400, {"message": "Value error", "error": "bad cursor"}),
+    (RuntimeError("secret"), 500, {"message": "An error occurred"}),
+])
+def test_http_exception_handler(error, status_code, body) -> None:
+    """Test that each exception is answered by the mapping of the closest class in its MRO."""
+    response = http_exception_handler(raising(error))({}, None)
+
+    assert response["statusCode"] == status_code
+    assert json.loads(response["body"]) == body
+
+def test_validation_errors_are_listed() -> None:
+    """Test that a ValidationError is not answered as a plain ValueError."""
+    response = http_exception_handler(raising(validation_error()))({}, None)
+
+    body = json.loads(response["body"])
+    assert response["statusCode"] == 400
+    assert body["message"] == "Validation error"
+    assert body["errors"][0]["loc"] == ["limit"]
+
+def test_event_exception_handlers_log_the_label() -> None:
+    """Test that event handlers log the label of the exception and swallow it."""
+    logger = MagicMock()
+
+    assert event_exception_handlers(logger)(raising(PopularVehicleNotFoundError("gone", 404)))({}, None) is None
+    logger.error.assert_called_once_with("Vehicle not found: gone")
+
+def test_resolution_is_cached() -> None:
+    """Test that the MRO is walked once per exception class."""
+    resolve_error.cache_clear()
+    resolve_error(PopularVehicleNotFoundError)
+    resolve_error(PopularVehicleNotFoundError)
+
+    assert resolve_error.cache_info().hits == 1
+    assert resolve_error(PopularVehicleNotFoundError) is resolve_error(VehicleNotFoundError)
@@ -0,0 +1,50 @@
+"""Test the parsing of vehicle import bodies."""
+import base64
+import pytest
+
+from vehicle.adapters.http.import_body import content_type, parse_rows, read_body
+
+def test_parse_json_array() -> None:
+    """Test that a JSON array yields its items."""
+    rows = list(parse_rows('[{"model": "A"}, {"model": "B"}]', "application/json"))
+
+    assert rows == [{"model": "A"}, {"model": "B"}]
+
+def test_parse_json_requires_array() -> None:
+    """Test that a JSON body must be an array."""
+    with pytest.raises(ValueError):
+        list(parse_rows('{"model": "A"}', "application/json"))
+
+def test_parse_ndjson_keeps_invalid_lines() -> None:
+    """Test that NDJSON lines are parsed one by one."""
+    body = '{"model": "A"}\n\nnot json\n{"model": "B"}\n'
+
+    rows = list(parse_rows(body, "application/x-ndjson"))
+
+    assert rows == [{"model": "A"}, "not json", {"model": "B"}]
+
+def test_parse_csv() -> None:
+    """Test that CSV rows are keyed by the header."""
+    body = "brand_name,model,year,color,price\nToyota,Prius,2022,red,200000\n"
+
+    rows = list(parse_rows(body, "text/csv"))
+
+    assert rows == [{
+        "brand_name": "Toyota",
+        "model": "Prius",
+        "year": "2022",
+        "color": "red",
+        "price": "200000",
+    }]
+
+def test_read_event() -> None:
+    """Test that base64 bodies and content type parameters are handled."""
+    event = {
+        "body": base64.b64encode(b"[]").decode(),
+        "isBase64Encoded": True,
+        "headers": {"Content-Type": "text/csv; charset=utf-8"},
+    }
+
+    assert read_body(event) == "[]"
+    assert content_type(event) == "text/csv"
+    assert content_type({}) == "application/json"
@@ -0,0 +1,150 @@
+"""Import time budgets of the Lambda handlers, measured with python -X importtime."""
+import os
+import re
+import subprocess
+import sys
+from functools import lru_cache
+from importlib.metadata import packages_distributions
+from pathlib import Path
+from typing import Dict, Set
+
+import pytest
+
+CONTROLLERS = "vehicle.adapters.controllers"
+
+# Cumulative import time budget of each handler module, in milliseconds.
+# Scale them with IMPORT_TIME_BUDGET_SCALE on slow machines.
+HANDLER_BUDGETS_MS = {
+    "get_vehicle_controller": 1500,
+    "list_available_vehicles_controller": 1500,
+    "list_sold_vehicles_controller": 1500,
+    "get_sales_report_controller": 1500,
+    "search_vehicles_controller": 1500,
+    "create_vehicle_controller": 1500,
+    "update_vehicle_controller": 1500,
+    "import_vehicles_controller": 1500,
+    "initialize_sale_controller": 1500,
+    "cancel_sale_controller": 1500,
+    "confirm_sale_controller": 1500,
+    "revert_sale_controller": 1500,
+    "confirm_pickup_controller": 1500,
+    "relay_outbox_controller": 1500,
+    "purge_idempotency_records_controller": 1500,
+    "expire_draft_sales_controller": 1500,
+}
+
+# Modules no handler may import on cold start.
+DEFERRED_MODULES = ("boto3", "botocore", "dotenv", "asyncpg", "aiosqlite")
+
+# Packages aws_lambda_powertools only tries to import, to find out whether
+# they are installed; their submodules are still deferred.
+PROBED_PACKAGES = ("botocore",)
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Requirements installed in each deployment image, see serverless.yml.
+IMAGE_REQUIREMENTS = {
+    "vehicle": "requirements-runtime.txt",
+    "vehicle-relay": "requirements-relay.txt",
+}
+
+# Code run after the import to load what a handler only imports on first use.
+ASYNC_ENGINE = (
+    "import os; os.environ['DATABASE_URL'] = 'postgresql://localhost/vehicle'\n"
+    "from vehicle.infrastructure.database.async_setup import async_session_factory; async_session_factory()"
+)
+FIRST_USE = {
+    "relay_outbox_controller": "from vehicle.infrastructure.queue.setup import sqs_client; sqs_client()",
+    "confirm_sale_controller": ASYNC_ENGINE,
+    "revert_sale_controller": ASYNC_ENGINE,
+}
+
+# Distributions that come with the base image.
+BASE_IMAGE_DISTRIBUTIONS = {"pip", "setuptools"}
+
+def handler_images() -> Dict[str, str]:
+    """Map each handler module to the image its function runs on."""
+    images = {}
+    for function in (ROOT / "resources" / "functions").glob("*.yml"):
+        definition = function.read_text()
+        image = re.search(r"^  name: (\S+)$", definition, re.MULTILINE).group(1)
+        command = re.search(r'command: \["([\w.]+)"\]', definition).group(1)
+        images[command.rsplit(".", 2)[-2]] = image
+
+    return images
+
+def requirements(file_name: str) -> Set[str]:
+    """Read the normalized distribution names of a requirements file and its includes."""
+    names = set()
+    for line in (ROOT / "vehicle" / file_name).read_text().splitlines():
+        if line.startswith("-r "):
+            names |= requirements(line[3:].strip())
+        elif line.strip():
+            names.add(normalize(line.split("==")[0]))
+
+    return names
+
+def normalize(distribution: str) -> str:
+    """Normalize a distribution name as pip does."""
+    return re.sub(r"[-_.]+", "-", distribution).lower()
+
+@lru_cache(maxsize=None)
+def import_times(module: str, first_use: str = "") -> Dict[str, int]:
+    """Import a module in a fresh interpreter and return the cumulative time of every import, in microseconds."""
+    env = {
+        **os.environ,
+        "INITIALIZE_PAYMENT_QUEUE_URL": "https://sqs.us-east-1.amazonaws.com/0/queue.fifo",
+    }
+    env.pop("DATABASE_URL", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}\n{first_use}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+
+    return times
+
+@pytest.mark.parametrize("handler", sorted(HANDLER_BUDGETS_MS))
+def test_handler_import_time(handler: str) -> None:
+    """Test that a handler imports within its budget and defers heavy modules."""
+    module = f"{CONTROLLERS}.{handler}"
+    scale = float(os.getenv("IMPORT_TIME_BUDGET_SCALE", "1"))
+
+    times = import_times(module)
+
+    assert times[module] / 1000 <= HANDLER_BUDGETS_MS[handler] * scale
+    assert not [
+        name for name in times
+        if name.split(".")[0] in DEFERRED_MODULES and name not in PROBED_PACKAGES
+    ]
+
+@pytest.mark.parametrize("handler", sorted(HANDLER_BUDGETS_MS))
+def test_handler_image_requirements(handler: str) -> None:
+    """Test that the image of a handler installs every distribution it imports."""
+    image = handler_images()[handler]
+    installed = requirements(IMAGE_REQUIREMENTS[image]) | BASE_IMAGE_DISTRIBUTIONS
+    distributions = packages_distributions()
+
+    module = f"{CONTROLLERS}.{handler}"
+    times = import_times(module, FIRST_USE[handler]) if handler in FIRST_USE else import_times(module)
+    imported = {
+        normalize(distribution)
+        for name in times
+        if name not in PROBED_PACKAGES
+        for distribution in distributions.get(name.split(".")[0], [])
+    }
+
+    assert imported - installed == set()
+
+def test_every_handler_has_a_budget() -> None:
+    """Test that new handlers are added to the budgets."""
+    assert set(handler_images()) == set(HANDLER_BUDGETS_MS)
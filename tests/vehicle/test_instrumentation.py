@@ -0,0 +1,130 @@
+"""Test the metrics published by the handlers."""
+import json
+from contextlib import asynccontextmanager, contextmanager
+from datetime import timedelta
+from typing import List
+from unittest.mock import MagicMock
+import pytest
+from aws_lambda_powertools.metrics import MetricUnit
+from sqlalchemy import text
+
+from vehicle.adapters.controllers import confirm_sale_controller, expire_draft_sales_controller
+from vehicle.adapters.events.async_runner import event_loop
+from vehicle.adapters.events.sqs_batch import VehicleRecord
+from vehicle.domain.entities.outbox_message import INITIALIZE_PAYMENT_QUEUE, OutboxMessage
+from vehicle.exceptions.vehicle_exceptions import VehicleSaleNotInitializedError
+from vehicle.infrastructure.metrics import instrumentation
+from vehicle.infrastructure.metrics.instrumentation import instrumented
+from vehicle.infrastructure.metrics.setup import metrics
+from vehicle.infrastructure.queue.sqs_message_queue import SqsMessageQueue
+
+@pytest.fixture(autouse=True)
+def cold_container(monkeypatch):
+    """Fixture for a container that has not served any invocation yet."""
+    metrics.clear_metrics()
+    monkeypatch.setattr(instrumentation, "_cold_start", True)
+
+def published(stdout: str) -> List[dict]:
+    """Parse the Embedded Metric Format documents printed to stdout."""
+    return [json.loads(line) for line in stdout.splitlines() if line.startswith('{"_aws"')]
+
+def test_instrumented_publishes_invocation_metrics(db_engine, capsys) -> None:
+    """Test that latency, database activity and cold starts are published per invocation."""
+    @instrumented
+    def handler(event, context):
+        with db_engine.connect() as connection:
+            for _ in range(event["statements"]):
+                connection.execute(text("SELECT 1"))
+        return "done"
+
+    assert handler({"statements": 2}, None) == "done"
+    handler({"statements": 0}, None)
+
+    cold, warm = published(capsys.readouterr().out)
+    assert cold["function"] == "handler"
+    assert cold["_aws"]["CloudWatchMetrics"][0]["Namespace"] == "AutoDeal"
+    assert cold["ColdStart"] == [1.0]
+    assert cold["DbStatements"] == [2.0]
+    assert cold["Latency"][0] >= cold["DbTime"][0] > 0
+    assert warm["ColdStart"] == [0.0]
+    assert warm["DbStatements"] == [0.0]
+
+def test_instrumented_publishes_when_the_handler_fails(capsys) -> None:
+    """Test that a failed invocation is still measured."""
+    @instrumented
+    def handler(event, context):
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        handler({}, None)
+
+    assert published(capsys.readouterr().out)[0]["function"] == "handler"
+
+def test_sqs_send_latency_is_published_with_the_invocation(capsys) -> None:
+    """Test that each SQS call adds its latency to the metrics of the invocation."""
+    client = MagicMock()
+    client.send_message_batch.return_value = {"Successful": [{"Id": "7"}]}
+    queue = SqsMessageQueue(lambda: client, {INITIALIZE_PAYMENT_QUEUE: "queue-url"})
+    message = OutboxMessage(id=7, queue=INITIALIZE_PAYMENT_QUEUE, group_id="1", body="{}")
+
+    @instrumented
+    def relay(event, context):
+        queue.send_batch(INITIALIZE_PAYMENT_QUEUE, [message])
+        queue.send_batch(INITIALIZE_PAYMENT_QUEUE, [message])
+
+    relay({}, None)
+
+    assert len(published(capsys.readouterr().out)[0]["SqsSendLatency"]) == 2
+
+def test_metrics_flushed_early_carry_the_function(capsys) -> None:
+    """Test that metrics flushed at the limit of 100 values, before the handler returns, keep its dimension."""
+    @instrumented
+    def relay(event, context):
+        for _ in range(150):
+            metrics.add_metric(name="SqsSendLatency", unit=MetricUnit.Milliseconds, value=1)
+
+    relay({}, None)
+
+    documents = published(capsys.readouterr().out)
+    assert len(documents) == 2
+    assert [document["function"] for document in documents] == ["relay", "relay"]
+
+def test_reclaimed_drafts_are_published(db_session, seed_vehicles, stage_payment_requests, monkeypatch, capsys) -> None:
+    """Test that the sweeper publishes how many abandoned drafts it reclaimed."""
+    @contextmanager
+    def session_scope():
+        yield db_session
+
+    stage_payment_requests(seed_vehicles(available=1, sold=3)[1:])
+    monkeypatch.setattr(expire_draft_sales_controller, "DRAFT_SALE_TTL", timedelta(0))
+    monkeypatch.setattr(expire_draft_sales_controller, "session_scope", session_scope)
+
+    assert expire_draft_sales_controller.expire_draft_sales({}, None) == {"reclaimed": 3}
+
+    assert published(capsys.readouterr().out)[0]["ReclaimedDrafts"] == [3.0]
+
+def test_rejected_confirmations_are_published(monkeypatch, capsys) -> None:
+    """Test that confirmations without a draft to confirm are published, as their payment has no sale."""
+    class RejectingService:
+        def __init__(self, repository):
+            pass
+
+        async def confirm_sales(self, vehicle_ids, message_ids):
+            return {vehicle_id: VehicleSaleNotInitializedError("Sale not initialized", 400) for vehicle_id in vehicle_ids}
+
+    @asynccontextmanager
+    async def async_session_scope():
+        yield None
+
+    monkeypatch.setattr(confirm_sale_controller, "AsyncVehicleService", RejectingService)
+    monkeypatch.setattr(confirm_sale_controller, "async_session_scope", async_session_scope)
+
+    @instrumented
+    def confirm(event, context):
+        event_loop().run_until_complete(confirm_sale_controller._confirm_sales(
+            [VehicleRecord("a", "1", 1), VehicleRecord("b", "2", 2)]
+        ))
+
+    confirm({}, None)
+
+    assert published(capsys.readouterr().out)[0]["RejectedConfirmations"] == [2.0]
@@ -0,0 +1,117 @@
+"""Test for the outbox and its relay."""
+import json
+from unittest.mock import MagicMock
+import pytest
+from cryptography.fernet import Fernet
+
+from vehicle.adapters.repositories.outbox_repository_adapter import OutboxRepositoryAdapter
+from vehicle.adapters.repositories.vehicle_repository_adapter import VehicleRepositoryAdapter
+from vehicle.application.services.outbox_relay import OutboxRelay
+from vehicle.domain.entities.outbox_message import INITIALIZE_PAYMENT_QUEUE, OutboxMessage
+from vehicle.infrastructure.database import models
+from vehicle.infrastructure.queue.memory_message_queue import InMemoryMessageQueue
+from vehicle.infrastructure.queue.sqs_message_queue import SqsMessageQueue
+from vehicle.infrastructure.security.field_cipher import FieldCipher
+
+def stage_messages(db_session, count: int, group_ids=None) -> None:
+    """Stage outbox messages directly in the database."""
+    db_session.add_all([
+        models.OutboxMessage(
+            queue=INITIALIZE_PAYMENT_QUEUE,
+            group_id=group_ids[index] if group_ids else str(index),
+            body=json.dumps({"index": index}),
+        )
+        for index in range(count)
+    ])
+    db_session.commit()
+
+def test_initialize_sale_is_relayed(db_session, seed_vehicles) -> None:
+    """Test that the payment request of a sale reaches the queue."""
+    vehicle_ids = seed_vehicles(available=1, sold=0)
+    sale = VehicleRepositoryAdapter(db_session).initialize_sale(
+        vehicle_ids[0],
+        "buyer",
+        {"idempotency_key": "key", "access_token": "token"}
+    )
+    staged = json.loads(db_session.query(models.OutboxMessage).one().body)
+    assert staged["access_token"] != "token"
+    queue = InMemoryMessageQueue()
+
+    relayed = OutboxRelay(OutboxRepositoryAdapter(db_session), queue).relay()
+
+    assert relayed == 1
+    message = queue.sent[INITIALIZE_PAYMENT_QUEUE][0]
+    assert message.group_id == str(vehicle_ids[0])
+    assert json.loads(message.body) == {
+        "vehicle_id": vehicle_ids[0],
+        "order_id": sale.order_id,
+        "idempotency_key": "key",
+        "access_token": "token",
+    }
+    assert db_session.query(models.OutboxMessage).count() == 0
+
+def test_relay_sends_in_batches(db_session) -> None:
+    """Test that the outbox is drained in queue sized batches."""
+    stage_messages(db_session, 25)
+    queue = InMemoryMessageQueue()
+
+    relayed = OutboxRelay(OutboxRepositoryAdapter(db_session), queue, batch_size=20).relay()
+
+    assert relayed == 25
+    assert queue.batches == 3
+    assert [json.loads(message.body)["index"] for message in queue.sent[INITIALIZE_PAYMENT_QUEUE]] \
+        == list(range(25))
+
+def test_relay_keeps_refused_messages(db_session) -> None:
+    """Test that refused messages, and the rest of their group, stay in the outbox."""
+    stage_messages(db_session, 3, group_ids=["a", "a", "b"])
+    queue = InMemoryMessageQueue(rejected_ids=[1])
+
+    relayed = OutboxRelay(OutboxRepositoryAdapter(db_session), queue).relay()
+
+    assert relayed == 1
+    assert [message.id for message in queue.sent[INITIALIZE_PAYMENT_QUEUE]] == [3]
+    assert [message.id for message in db_session.query(models.OutboxMessage).all()] == [1, 2]
+
+def test_sqs_message_queue() -> None:
+    """Test that SQS batch entries are deduplicated by outbox id."""
+    client = MagicMock()
+    client.send_message_batch.return_value = {"Successful": [{"Id": "7"}], "Failed": [{"Id": "8"}]}
+    queue = SqsMessageQueue(lambda: client, {INITIALIZE_PAYMENT_QUEUE: "queue-url"})
+
+    accepted = queue.send_batch(INITIALIZE_PAYMENT_QUEUE, [
+        OutboxMessage(id=7, queue=INITIALIZE_PAYMENT_QUEUE, group_id="1", body="{}"),
+        OutboxMessage(id=8, queue=INITIALIZE_PAYMENT_QUEUE, group_id="2", body="{}"),
+    ])
+
+    assert accepted == [7]
+    entries = client.send_message_batch.call_args.kwargs["Entries"]
+    assert entries[0]["MessageDeduplicationId"] == "outbox-7"
+    assert client.send_message_batch.call_args.kwargs["QueueUrl"] == "queue-url"
+
+def test_message_queue_requires_a_url(monkeypatch) -> None:
+    """Test that the relay only falls back to the in-memory queue when asked to."""
+    monkeypatch.delenv("INITIALIZE_PAYMENT_QUEUE_URL", raising=False)
+    monkeypatch.setenv("MESSAGE_QUEUE_IN_MEMORY", "true")
+    from vehicle.infrastructure.queue.setup import setup_message_queue
+
+    assert isinstance(setup_message_queue(), InMemoryMessageQueue)
+
+    monkeypatch.delenv("MESSAGE_QUEUE_IN_MEMORY")
+    with pytest.raises(RuntimeError, match="INITIALIZE_PAYMENT_QUEUE_URL"):
+        setup_message_queue()
+
+    monkeypatch.setenv("INITIALIZE_PAYMENT_QUEUE_URL", "queue-url")
+    assert isinstance(setup_message_queue(), SqsMessageQueue)
+
+def test_field_cipher_rotation() -> None:
+    """Test that secrets encrypted with a previous key are still decrypted after a rotation."""
+    old_key, new_key = Fernet.generate_key().decode(), Fernet.generate_key().decode()
+    body = json.dumps(FieldCipher(old_key, ("access_token",)).encrypt_fields({"order_id": 1, "access_token": "token"}))
+
+    rotated = FieldCipher(f"{new_key},{old_key}", ("access_token",))
+
+    assert json.loads(rotated.decrypt_fields(body)) == {"order_id": 1, "access_token": "token"}
+    assert rotated.decrypt_fields('{"order_id": 1}') == '{"order_id": 1}'
+    with pytest.raises(RuntimeError, match="OUTBOX_ENCRYPTION_KEY"):
+        FieldCipher(None, ("access_token",)).encrypt_fields({"access_token": "token"})
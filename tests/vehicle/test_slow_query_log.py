@@ -0,0 +1,104 @@
+"""Test the slow query log."""
+import logging
+from unittest.mock import MagicMock, call
+import pytest
+from sqlalchemy import text
+
+from vehicle.adapters.repositories.vehicle_repository_adapter import VehicleRepositoryAdapter
+from vehicle.infrastructure.database.slow_query_log import SlowQueryLog, fingerprint, normalize
+
+@pytest.fixture
+def slow_query_log(db_engine):
+    """Fixture for a slow query log listening to the in-memory database."""
+    log = SlowQueryLog(threshold_ms=0, top_n=2).install(db_engine)
+    yield log
+    log.uninstall(db_engine)
+
+@pytest.mark.parametrize("statement", [
+    "SELECT * FROM vehicle WHERE id IN (?, ?, ?) AND model = 'Model 1'",
+    "SELECT *\n  FROM vehicle WHERE id IN (%(id_1_1)s) AND model = %(model_1)s",
+    "SELECT * FROM vehicle WHERE id IN ($1, $2) AND model = $3",
+])
+def test_normalize(statement) -> None:
+    """Test that statements differing only by their values share a shape."""
+    assert normalize(statement) == "SELECT * FROM vehicle WHERE id IN (...) AND model = ?"
+
+def test_statements_are_aggregated_by_fingerprint(db_session, seed_vehicles, slow_query_log) -> None:
+    """Test that repeated statements add up under one fingerprint, ranked by total time."""
+    vehicle_ids = seed_vehicles(available=3, sold=0)
+    repository = VehicleRepositoryAdapter(db_session)
+    slow_query_log.stats.clear()
+
+    for vehicle_id in vehicle_ids:
+        repository.get(vehicle_id)
+    db_session.execute(text("SELECT 1"))
+
+    top = slow_query_log.top()
+    assert len(top) == 2
+    assert top[0]["count"] == 3
+    assert top[0]["fingerprint"] == fingerprint(top[0]["statement"])
+    assert top[0]["total_ms"] >= top[0]["max_ms"] > 0
+
+def test_slow_queries_are_logged(db_session, slow_query_log, caplog) -> None:
+    """Test that queries above the threshold are logged, without a plan outside PostgreSQL."""
+    with caplog.at_level(logging.INFO):
+        db_session.execute(text("SELECT 42"))
+        slow_query_log.threshold_ms = 60_000
+        db_session.execute(text("SELECT 43"))
+        slow_query_log.log_top()
+
+    slow = [record.message for record in caplog.records if record.levelno == logging.WARNING]
+    assert len(slow) == 1
+    assert slow[0].endswith("rows: SELECT ?")
+    assert "Query " in caplog.records[-1].message
+
+def test_only_postgres_selects_are_explained(db_engine) -> None:
+    """Test that EXPLAIN ANALYZE is only run on PostgreSQL, and never on statements that write."""
+    postgres = MagicMock()
+    postgres.dialect.name = "postgresql"
+    postgres.connection.cursor.return_value.fetchall.return_value = [("Seq Scan on vehicle",), ("Buffers: shared hit=1",)]
+
+    assert SlowQueryLog._explainable(postgres, "SELECT ?")
+    assert not SlowQueryLog._explainable(postgres, "UPDATE vehicle SET price = ?")
+    assert not SlowQueryLog._explainable(postgres, "WITH sold AS (DELETE FROM vehicle_sold RETURNING vehicle_id) SELECT * FROM sold")
+    with db_engine.connect() as connection:
+        assert not SlowQueryLog._explainable(connection, "SELECT ?")
+    assert SlowQueryLog._explain(postgres, "SELECT 1", {}) == "Seq Scan on vehicle\nBuffers: shared hit=1"
+    assert postgres.connection.cursor.return_value.execute.call_args_list == [
+        call("SAVEPOINT slow_query_explain"),
+        call("EXPLAIN (ANALYZE, BUFFERS) SELECT 1", {}),
+        call("RELEASE SAVEPOINT slow_query_explain"),
+    ]
+
+class TimingOutCursor:
+    """DBAPI cursor whose EXPLAIN hits statement_timeout."""
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.statements = []
+
+    def execute(self, statement, *args):
+        self.statements.append(statement)
+        if statement.startswith("EXPLAIN"):
+            raise TimeoutError("canceling statement due to statement timeout")
+        return self.cursor.execute(statement, *args)
+
+    def close(self):
+        self.cursor.close()
+
+def test_failed_explain_keeps_the_transaction(db_session, seed_vehicles) -> None:
+    """Test that a failed EXPLAIN is rolled back to its savepoint and the session still commits."""
+    vehicle_ids = seed_vehicles(available=1, sold=0)
+    db_session.execute(text("UPDATE vehicle SET price = 1 WHERE id = :id"), {"id": vehicle_ids[0]})
+    connection = db_session.connection()
+    cursor = TimingOutCursor(connection.connection.cursor())
+    connection.connection.cursor = lambda: cursor
+
+    assert SlowQueryLog._explain(connection, "SELECT 1", ()) is None
+    db_session.commit()
+
+    assert cursor.statements == [
+        "SAVEPOINT slow_query_explain",
+        "EXPLAIN (ANALYZE, BUFFERS) SELECT 1",
+        "ROLLBACK TO SAVEPOINT slow_query_explain",
+    ]
+    assert db_session.execute(text("SELECT price FROM vehicle WHERE id = :id"), {"id": vehicle_ids[0]}).scalar() == 1
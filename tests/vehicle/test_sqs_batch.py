@@ -0,0 +1,95 @@
+"""Test the SQS batch helpers."""
+import asyncio
+import json
+import logging
+import pytest
+
+from vehicle.adapters.events.async_runner import event_loop
+from vehicle.adapters.events.sqs_batch import (
+    VehicleRecord,
+    group_records,
+    parse_vehicle_records,
+    process_in_bulk_async,
+)
+
+logger = logging.getLogger(__name__)
+
+def make_record(message_id: str, body: str, group: str = "1") -> dict:
+    """Create a SQS record."""
+    return {
+        "messageId": message_id,
+        "body": body,
+        "attributes": {"MessageGroupId": group},
+    }
+
+def test_parse_vehicle_records() -> None:
+    """Test that every valid record is parsed and invalid ones are dropped."""
+    event = {"Records": [
+        make_record("a", json.dumps({"vehicle_id": 1}), "1"),
+        make_record("b", json.dumps({"vehicle_id": "2"}), "2"),
+        make_record("c", json.dumps({"order_id": 3})),
+        make_record("d", "not json"),
+    ]}
+
+    assert parse_vehicle_records(event, logger) == [
+        VehicleRecord("a", "1", 1),
+        VehicleRecord("b", "2", 2),
+    ]
+
+def test_group_records() -> None:
+    """Test that records are grouped in order and records without a group stand alone."""
+    records = [
+        VehicleRecord("a", "1", 1),
+        VehicleRecord("b", "", 2),
+        VehicleRecord("c", "1", 3),
+        VehicleRecord("d", "", 4),
+    ]
+
+    assert group_records(records) == [[records[0], records[2]], [records[1]], [records[3]]]
+
+def test_process_in_bulk_async_groups_concurrently() -> None:
+    """Test that groups run concurrently within the bound, each one in order."""
+    records = [VehicleRecord(f"{group}{index}", group, index) for index in range(3) for group in "abcd"]
+    running = []
+    peak = []
+    handled = []
+
+    async def handle(batch):
+        if len(batch) > 1:
+            raise RuntimeError("database unavailable")
+        running.append(batch[0])
+        peak.append(len(running))
+        await asyncio.sleep(0)
+        running.remove(batch[0])
+        handled.append(batch[0].message_id)
+
+    response = event_loop().run_until_complete(
+        process_in_bulk_async(records, handle, logger, max_workers=2)
+    )
+
+    assert response == {"batchItemFailures": []}
+    assert max(peak) == 2
+    for group in "abcd":
+        assert [message_id for message_id in handled if message_id[0] == group] == [
+            f"{group}0", f"{group}1", f"{group}2"
+        ]
+
+def test_process_in_bulk_async_stops_failed_groups() -> None:
+    """Test that a failed record holds back the rest of its group only."""
+    records = [
+        VehicleRecord("a0", "a", 1),
+        VehicleRecord("b0", "b", 2),
+        VehicleRecord("a1", "a", 3),
+        VehicleRecord("b1", "b", 4),
+    ]
+    handled = []
+
+    async def handle(batch):
+        if len(batch) > 1 or batch[0].vehicle_id == 1:
+            raise RuntimeError("database unavailable")
+        handled.append(batch[0].message_id)
+
+    response = event_loop().run_until_complete(process_in_bulk_async(records, handle, logger))
+
+    assert handled == ["b0", "b1"]
+    assert response == {"batchItemFailures": [{"itemIdentifier": "a0"}, {"itemIdentifier": "a1"}]}
@@ -0,0 +1,158 @@
+"""Test the vehicle cache."""
+from datetime import datetime
+from unittest.mock import MagicMock, create_autospec
+import pytest
+
+from vehicle.adapters.repositories.cached_vehicle_repository import CachedVehicleRepository, invalidating
+from vehicle.application.ports.vehicle_repository import VehicleRepository
+from vehicle.domain.entities.vehicle import Vehicle
+from vehicle.infrastructure.cache.memory_cache import InMemoryCache
+from vehicle.infrastructure.cache.redis_cache import RedisCache
+
+class FakeRedis:
+    """In-memory stand-in for the redis client."""
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        """Get a value."""
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        """Set a value."""
+        self.values[key] = value
+
+    def delete(self, *keys):
+        """Delete values."""
+        for key in keys:
+            self.values.pop(key, None)
+
+@pytest.fixture
+def vehicle() -> Vehicle:
+    """Fixture for a vehicle entity."""
+    return Vehicle(
+        id=1,
+        brand_name="Toyota",
+        model="Prius",
+        year=2022,
+        color="red",
+        price=200000,
+    )
+
+@pytest.fixture
+def vehicle_repository(vehicle: Vehicle) -> VehicleRepository:
+    """Fixture for the repository behind the cache."""
+    repository = create_autospec(VehicleRepository)
+    repository.get.return_value = vehicle
+
+    return repository
+
+@pytest.fixture(params=["memory", "redis"])
+def cached_repository(request, vehicle_repository) -> CachedVehicleRepository:
+    """Fixture for the cached repository, for every cache backend."""
+    if request.param == "memory":
+        cache = InMemoryCache()
+    else:
+        cache = RedisCache(FakeRedis())
+
+    return CachedVehicleRepository(vehicle_repository, cache)
+
+def test_in_memory_cache_expires_entries() -> None:
+    """Test that entries expire after their time to live."""
+    now = [0.0]
+    cache = InMemoryCache(ttl=10, clock=lambda: now[0])
+    cache.set("key", "value")
+
+    now[0] = 9.9
+    assert cache.get("key") == "value"
+
+    now[0] = 10
+    assert cache.get("key") is None
+
+def test_in_memory_cache_evicts_least_recently_used() -> None:
+    """Test that the least recently used entry is evicted when full."""
+    cache = InMemoryCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+def test_get_is_read_through(cached_repository, vehicle_repository, vehicle) -> None:
+    """Test that only the first lookup reaches the repository."""
+    assert cached_repository.get(1) == vehicle
+    assert cached_repository.get(1) == vehicle
+
+    vehicle_repository.get.assert_called_once_with(1)
+
+def test_update_invalidates(cached_repository, vehicle_repository, vehicle) -> None:
+    """Test that updating a vehicle invalidates it."""
+    cached_repository.get(1)
+    cached_repository.update(1, vehicle)
+    cached_repository.get(1)
+
+    assert vehicle_repository.get.call_count == 2
+
+@pytest.mark.parametrize("method", [
+    "initialize_sale",
+    "confirm_sale",
+    "confirm_pickup",
+    "revert_sale",
+])
+def test_sale_flows_invalidate(cached_repository, vehicle_repository, method) -> None:
+    """Test that every sale flow invalidates the vehicle."""
+    sold_vehicle = MagicMock(id=1)
+    cached_repository.get(1)
+
+    if method == "initialize_sale":
+        cached_repository.initialize_sale(1, "user", {})
+    else:
+        getattr(cached_repository, method)(sold_vehicle)
+    cached_repository.get(1)
+
+    assert vehicle_repository.get.call_count == 2
+
+def test_batch_sale_flows_invalidate(cached_repository, vehicle_repository) -> None:
+    """Test that batch sale flows invalidate every vehicle."""
+    cached_repository.get(1)
+    cached_repository.confirm_sales([1])
+    cached_repository.get(1)
+    cached_repository.revert_sales([MagicMock(id=1)])
+    cached_repository.get(1)
+
+    assert vehicle_repository.get.call_count == 3
+
+def test_expire_draft_sales_invalidates(cached_repository, vehicle_repository) -> None:
+    """Test that the vehicles of expired drafts are invalidated, and only them."""
+    vehicle_repository.expire_draft_sales.return_value = [1]
+    cached_repository.get(1)
+    cached_repository.get(2)
+    cached_repository.expire_draft_sales(datetime.now(), 10)
+    cached_repository.get(1)
+    cached_repository.get(2)
+
+    assert vehicle_repository.get.call_count == 3
+
+class UnavailableRedis:
+    """Redis client of an outage."""
+    def __getattr__(self, command):
+        def fail(*args, **kwargs):
+            raise ConnectionError("Timeout connecting to server")
+        return fail
+
+def test_redis_outage_falls_back_to_the_repository(vehicle_repository, vehicle) -> None:
+    """Test that reads and writes go on when Redis is unavailable."""
+    cached_repository = CachedVehicleRepository(vehicle_repository, RedisCache(UnavailableRedis(), errors=(ConnectionError,)))
+
+    assert cached_repository.get(1) == vehicle
+    cached_repository.update(1, vehicle)
+
+    vehicle_repository.update.assert_called_once_with(1, vehicle)
+
+def test_invalidating_needs_a_shared_cache(vehicle_repository) -> None:
+    """Test that writers only go through the cache when it is shared."""
+    assert invalidating(vehicle_repository, None) is vehicle_repository
+    assert isinstance(invalidating(vehicle_repository, RedisCache(FakeRedis())), CachedVehicleRepository)
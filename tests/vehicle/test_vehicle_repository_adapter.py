@@ -0,0 +1,601 @@
+"""Test for VehicleRepositoryAdapter."""
+import json
+from datetime import datetime, timedelta
+import warnings
+import pytest
+from sqlalchemy.orm.exc import NoResultFound
+
+from vehicle.adapters.repositories.idempotency_repository_adapter import IdempotencyRepositoryAdapter
+from vehicle.adapters.repositories.outbox_repository_adapter import OutboxRepositoryAdapter
+from vehicle.adapters.repositories.vehicle_repository_adapter import VehicleRepositoryAdapter
+from vehicle.application.services.outbox_relay import OutboxRelay
+from vehicle.application.services.pagination import build_page
+from vehicle.domain.entities.idempotency_record import IDEMPOTENCY_TTL, IdempotencyRecord
+from vehicle.domain.entities.vehicle import Vehicle as VehicleEntity
+from vehicle.domain.entities.vehicle_search import VehicleSearch
+from vehicle.domain.entities.vehicle_sold import VehicleSold
+from vehicle.infrastructure.cache.memory_cache import InMemoryCache
+from vehicle.infrastructure.database.models import OutboxMessage, VehicleBrand
+from vehicle.infrastructure.queue.memory_message_queue import InMemoryMessageQueue
+
+def test_get_all_available_single_statement(
+        db_session,
+        seed_vehicles,
+        statement_counter,
+    ) -> None:
+    """Test that listing available vehicles does not lazy load brands."""
+    seed_vehicles(available=5, sold=2)
+    repository = VehicleRepositoryAdapter(db_session)
+
+    with statement_counter:
+        vehicles = repository.get_all_available(10)
+
+    assert len(vehicles) == 5
+    assert [vehicle["brand_name"] for vehicle in vehicles] == [
+        "Brand 0", "Brand 1", "Brand 0", "Brand 1", "Brand 0"
+    ]
+    assert statement_counter.count == 1
+
+def test_get_all_sold_single_statement(
+        db_session,
+        seed_vehicles,
+        statement_counter,
+    ) -> None:
+    """Test that listing sold vehicles loads brand and sale in one query."""
+    seed_vehicles(available=2, sold=5)
+    repository = VehicleRepositoryAdapter(db_session)
+
+    with statement_counter:
+        vehicles = repository.get_all_sold(10)
+
+    assert len(vehicles) == 5
+    assert all(vehicle["sold"]["status"] == "draft" for vehicle in vehicles)
+    assert [vehicle["price"] for vehicle in vehicles] == sorted(
+        vehicle["price"] for vehicle in vehicles
+    )
+    assert statement_counter.count == 1
+
+def test_sold_page_serialization(db_session, seed_vehicles) -> None:
+    """Test that listing rows serialize to the vehicle JSON shape without warnings."""
+    vehicle_ids = seed_vehicles(available=0, sold=1)
+    repository = VehicleRepositoryAdapter(db_session)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        body = json.loads(build_page(repository.get_all_sold(10), 10).model_dump_json())
+
+    vehicle = body["vehicles"][0]
+    assert body["next_cursor"] is None
+    assert vehicle["id"] == vehicle_ids[0]
+    assert vehicle["brand_name"] == "Brand 0"
+    assert vehicle["sold"]["status"] == "draft"
+    assert vehicle["sold"]["user_id"] == "user-0"
+    assert set(vehicle["sold"]) == set(VehicleSold.model_fields)
+
+def test_get_with_sold_single_statement(
+        db_session,
+        seed_vehicles,
+        statement_counter,
+    ) -> None:
+    """Test that get_with_sold loads brand and sale eagerly."""
+    vehicle_ids = seed_vehicles(available=1, sold=1)
+    repository = VehicleRepositoryAdapter(db_session)
+
+    with statement_counter:
+        vehicle = repository.get_with_sold(vehicle_ids[1])
+        assert vehicle.brand.name == "Brand 1"
+        assert vehicle.sold.user_id == "user-1"
+
+    assert statement_counter.count == 1
+
+def test_get_all_available_uses_partial_index(db_session, statement_counter) -> None:
+    """Test that listing available vehicles is a scan of the availability partial index."""
+    repository = VehicleRepositoryAdapter(db_session)
+
+    with statement_counter:
+        repository.get_all_available(10, (10000, 1))
+
+    plan = db_session.connection().exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {statement_counter.statements[0]}",
+        (10000, 1, 10, 0),
+    ).all()
+    assert "vehicle_sold" not in statement_counter.statements[0]
+    assert "ix_vehicle_available_price_id" in plan[0][-1]
+
+def test_get_all_available_keyset_pagination(
+        db_session,
+        seed_vehicles,
+    ) -> None:
+    """Test that pages continue after the (price, id) of the last vehicle."""
+    seed_vehicles(available=5, sold=1)
+    repository = VehicleRepositoryAdapter(db_session)
+
+    first_page = repository.get_all_available(2)
+    last = first_page[-1]
+    second_page = repository.get_all_available(10, (last["price"], last["id"]))
+
+    assert [vehicle["model"] for vehicle in first_page] == ["Model 0", "Model 1"]
+    assert [vehicle["model"] for vehicle in second_page] == [
+        "Model 2", "Model 3", "Model 4"
+    ]
+
+@pytest.mark.parametrize("criteria, models", [
+    (VehicleSearch(), ["Model 0", "Model 1", "Model 2", "Model 3"]),
+    (VehicleSearch(brand_name="Brand 1"), ["Model 1", "Model 3"]),
+    (VehicleSearch(brand_name="Unknown"), []),
+    (VehicleSearch(model="model 1"), ["Model 1"]),
+    (VehicleSearch(model="Model_"), []),
+    (VehicleSearch(price_min=11000, price_max=12000), ["Model 1", "Model 2"]),
+    (VehicleSearch(year_min=2021), []),
+    (VehicleSearch(color="RED", year_max=2020), ["Model 0", "Model 1", "Model 2", "Model 3"]),
+])
+def test_search(db_session, seed_vehicles, statement_counter, criteria, models) -> None:
+    """Test that search combines criteria over available vehicles in one statement."""
+    seed_vehicles(available=4, sold=2)
+    repository = VehicleRepositoryAdapter(db_session)
+
+    with statement_counter:
+        vehicles = repository.search(criteria, 10)
+
+    assert [vehicle["model"] for vehicle in vehicles] == models
+    assert statement_counter.count == 1
+
+def test_search_keyset_pagination(db_session, seed_vehicles) -> None:
+    """Test that search pages continue after the (price, id) of the last vehicle."""
+    seed_vehicles(available=4, sold=0)
+    repository = VehicleRepositoryAdapter(db_session)
+    criteria = VehicleSearch(brand_name="Brand 0")
+
+    first_page = repository.search(criteria, 1)
+    second_page = repository.search(criteria, 10, (first_page[-1]["price"], first_page[-1]["id"]))
+
+    assert [vehicle["model"] for vehicle in first_page] == ["Model 0"]
+    assert [vehicle["model"] for vehicle in second_page] == ["Model 2"]
+
+def test_confirm_sales_single_update(
+        db_session,
+        seed_vehicles,
+        statement_counter,
+    ) -> None:
+    """Test that draft sales are confirmed with a single UPDATE ... RETURNING and reported with a single upsert."""
+    vehicle_ids = seed_vehicles(available=0, sold=3)
+    repository = VehicleRepositoryAdapter(db_session)
+
+    with statement_counter:
+        confirmed = repository.confirm_sales(vehicle_ids)
+
+    assert statement_counter.count == 2
+    assert sorted(confirmed) == vehicle_ids
+    assert {
+        vehicle.sold.status.value
+        for vehicle in repository.get_many_with_sold(vehicle_ids).values()
+    } == {"awaiting_pickup"}
+
+def test_confirm_sales_skips_confirmed_sales(db_session, seed_vehicles, statement_counter) -> None:
+    """Test that confirming sales again changes nothing, in a single statement."""
+    vehicle_ids = seed_vehicles(available=1, sold=2)
+    repository = VehicleRepositoryAdapter(db_session)
+    repository.confirm_sales(vehicle_ids[1:2])
+
+    with statement_counter:
+        confirmed = repository.confirm_sales(vehicle_ids)
+
+    assert confirmed == [vehicle_ids[2]]
+    assert statement_counter.count == 2
+    with statement_counter:
+        assert repository.confirm_sales(vehicle_ids) == []
+    assert statement_counter.count == 1
+
+def test_mark_processed(db_session) -> None:
+    """Test that only the messages not consumed before are returned, and kept once committed."""
+    repository = VehicleRepositoryAdapter(db_session)
+
+    assert repository.mark_processed(["message-1", "message-2", "message-1"]) == ["message-1", "message-2"]
+    db_session.commit()
+    assert repository.mark_processed(["message-2", "message-3"]) == ["message-3"]
+    db_session.rollback()
+    assert repository.mark_processed(["message-3"]) == ["message-3"]
+
+def test_confirm_sales_with_lock(db_session, seed_vehicles, monkeypatch) -> None:
+    """Test the SELECT ... FOR UPDATE path of databases without RETURNING."""
+    vehicle_ids = seed_vehicles(available=1, sold=2)
+    repository = VehicleRepositoryAdapter(db_session)
+    monkeypatch.setattr(repository, "_insert", lambda model: None)
+
+    assert repository.mark_processed(["message-1"]) == ["message-1"]
+    assert repository.confirm_sales(vehicle_ids[1:2]) == [vehicle_ids[1]]
+    assert repository.mark_processed(["message-1", "message-2"]) == ["message-2"]
+    assert repository.confirm_sales(vehicle_ids) == [vehicle_ids[2]]
+    assert report_counts(repository) == {
+        ("awaiting_pickup", "Brand 0"): 1,
+        ("awaiting_pickup", "Brand 1"): 1,
+    }
+
+def test_revert_sales_single_delete(
+        db_session,
+        seed_vehicles,
+        statement_counter,
+    ) -> None:
+    """Test that many draft sales are reverted with a single DELETE and relisted with a single UPDATE."""
+    vehicle_ids = seed_vehicles(available=0, sold=3)
+    repository = VehicleRepositoryAdapter(db_session)
+    vehicles = list(repository.get_many_with_sold(vehicle_ids).values())
+
+    with statement_counter:
+        repository.revert_sales(vehicles[:2])
+
+    assert statement_counter.count == 3
+    assert len(repository.get_all_sold(10)) == 1
+    assert [vehicle["id"] for vehicle in repository.get_all_available(10)] == vehicle_ids[:2]
+
+def test_initialize_sale_statements(
+        db_session,
+        seed_vehicles,
+        statement_counter,
+    ) -> None:
+    """Test that a sale claims the vehicle, inserts the sale and its outbox message, and commits once."""
+    vehicle_ids = seed_vehicles(available=1, sold=0)
+    repository = VehicleRepositoryAdapter(db_session)
+
+    with statement_counter:
+        sale = repository.initialize_sale(vehicle_ids[0], "buyer", {"idempotency_key": "key"})
+
+    assert statement_counter.count == 3
+    assert sale.vehicle_id == vehicle_ids[0]
+    assert sale.order_id is not None
+    assert sale.status == "draft"
+    assert sale.sold_price == 10000
+    assert repository.get_with_sold(vehicle_ids[0]).sold.user_id == "buyer"
+    assert repository.get_all_available(10) == []
+
+def test_initialize_sale_cannot_double_sell(db_session, seed_vehicles) -> None:
+    """Test that a second buyer or a missing vehicle gets no sale."""
+    vehicle_ids = seed_vehicles(available=1, sold=1)
+    repository = VehicleRepositoryAdapter(db_session)
+
+    assert repository.initialize_sale(vehicle_ids[0], "first", {}) is not None
+    assert repository.initialize_sale(vehicle_ids[0], "second", {}) is None
+    assert repository.initialize_sale(vehicle_ids[1], "second", {}) is None
+    assert repository.initialize_sale(404, "second", {}) is None
+    assert repository.get_with_sold(vehicle_ids[0]).sold.user_id == "first"
+    assert db_session.query(OutboxMessage).count() == 1
+
+def test_initialize_sale_with_lock(db_session, seed_vehicles, monkeypatch) -> None:
+    """Test the SELECT ... FOR UPDATE path of databases without ON CONFLICT."""
+    vehicle_ids = seed_vehicles(available=1, sold=1)
+    repository = VehicleRepositoryAdapter(db_session)
+    monkeypatch.setattr(repository, "_insert", lambda model: None)
+
+    sale = repository.initialize_sale(vehicle_ids[0], "first", {})
+
+    assert sale.vehicle_id == vehicle_ids[0]
+    assert repository.initialize_sale(vehicle_ids[0], "second", {}) is None
+    assert repository.initialize_sale(vehicle_ids[1], "second", {}) is None
+    assert repository.get_all_available(10) == []
+    assert db_session.query(OutboxMessage).count() == 1
+
+def make_vehicle(brand_name: str = "Brand 0", model: str = "New Model") -> VehicleEntity:
+    """Create a vehicle entity to be saved."""
+    return VehicleEntity(
+        brand_name=brand_name,
+        model=model,
+        year=2024,
+        color="blue",
+        price=50000,
+    )
+
+def test_save_with_new_brand(db_session, statement_counter) -> None:
+    """Test that a new brand is upserted in the same transaction as the vehicle."""
+    brands = InMemoryCache()
+    repository = VehicleRepositoryAdapter(db_session, brands)
+
+    with statement_counter:
+        vehicle = repository.save(make_vehicle("New Brand"))
+
+    assert statement_counter.count == 2
+    assert brands.get("New Brand") is not None
+    assert repository.get(vehicle.id).brand_name == "New Brand"
+
+def test_save_with_cached_brand(db_session, seed_vehicles, statement_counter) -> None:
+    """Test that a cached brand costs no query."""
+    seed_vehicles(available=1, sold=0)
+    repository = VehicleRepositoryAdapter(db_session, InMemoryCache())
+    repository.save(make_vehicle("Brand 0", "First"))
+
+    with statement_counter:
+        repository.save(make_vehicle("Brand 0", "Second"))
+
+    assert statement_counter.count == 1
+
+def test_save_with_existing_brand(db_session, seed_vehicles) -> None:
+    """Test that an existing brand is reused when missing from the cache."""
+    seed_vehicles(available=1, sold=0)
+    repository = VehicleRepositoryAdapter(db_session, InMemoryCache())
+
+    vehicle = repository.save(make_vehicle("Brand 0"))
+
+    assert repository.get(vehicle.id).brand_name == "Brand 0"
+    assert len(db_session.query(VehicleBrand).all()) == 2
+
+def test_update_single_statement(db_session, seed_vehicles, statement_counter) -> None:
+    """Test that an update is a single statement when the brand is cached."""
+    vehicle_ids = seed_vehicles(available=1, sold=0)
+    brands = InMemoryCache()
+    brands.set("Brand 1", 2)
+    repository = VehicleRepositoryAdapter(db_session, brands)
+
+    with statement_counter:
+        vehicle = repository.update(vehicle_ids[0], make_vehicle("Brand 1"))
+
+    assert statement_counter.count == 1
+    assert vehicle.id == vehicle_ids[0]
+    assert repository.get(vehicle_ids[0]).brand_name == "Brand 1"
+
+def test_update_missing_vehicle(db_session) -> None:
+    """Test that updating a missing vehicle raises NoResultFound."""
+    repository = VehicleRepositoryAdapter(db_session, InMemoryCache())
+
+    with pytest.raises(NoResultFound):
+        repository.update(404, make_vehicle())
+
+def test_save_many(db_session, seed_vehicles, statement_counter) -> None:
+    """Test that brands are resolved and vehicles inserted in batches."""
+    seed_vehicles(available=1, sold=0)
+    repository = VehicleRepositoryAdapter(db_session, InMemoryCache())
+    vehicles = [
+        make_vehicle("Brand 0", "Imported 1"),
+        make_vehicle("Brand 9", "Imported 2"),
+        make_vehicle("Brand 9", "Model 0"),
+        make_vehicle("Brand 0", "Imported 1"),
+    ]
+
+    with statement_counter:
+        saved_vehicles = repository.save_many(vehicles)
+
+    assert statement_counter.count == 3
+    assert saved_vehicles[0].id is not None
+    assert saved_vehicles[1].id is not None
+    assert saved_vehicles[2] is None
+    assert saved_vehicles[3] is None
+    assert repository.get(saved_vehicles[1].id).brand_name == "Brand 9"
+
+def test_available_version_changes_with_the_listing(db_session, seed_vehicles) -> None:
+    """Test that the available version moves on a sale, an update and a revert."""
+    vehicle_ids = seed_vehicles(available=2, sold=0)
+    repository = VehicleRepositoryAdapter(db_session)
+    versions = [repository.get_available_version()]
+
+    assert versions[0] == repository.get_available_version()
+
+    repository.update(vehicle_ids[1], make_vehicle(model="Updated"))
+    versions.append(repository.get_available_version())
+    repository.initialize_sale(vehicle_ids[0], "buyer", {})
+    versions.append(repository.get_available_version())
+    repository.revert_sales([repository.get_with_sold(vehicle_ids[0])])
+    versions.append(repository.get_available_version())
+
+    assert len(set(versions)) == len(versions)
+
+def test_sold_version_changes_with_the_listing(db_session, seed_vehicles) -> None:
+    """Test that the sold version moves on a sale and a confirmation."""
+    vehicle_ids = seed_vehicles(available=1, sold=0)
+    repository = VehicleRepositoryAdapter(db_session)
+    versions = [repository.get_sold_version()]
+
+    repository.initialize_sale(vehicle_ids[0], "buyer", {})
+    versions.append(repository.get_sold_version())
+    repository.confirm_sales(vehicle_ids)
+    repository.confirm_pickup(repository.get_with_sold(vehicle_ids[0]))
+    versions.append(repository.get_sold_version())
+
+    assert len(set(versions)) == len(versions)
+
+def report_counts(repository: VehicleRepositoryAdapter) -> dict:
+    """Sales count of each (status, brand) of the sales report."""
+    return {
+        (bucket["status"], bucket["brand_name"]): bucket["sales_count"]
+        for bucket in repository.get_sales_report()
+    }
+
+def test_sales_report_follows_the_sales(db_session, seed_vehicles) -> None:
+    """Test that confirming, picking up and reverting sales moves them in the report."""
+    vehicle_ids = seed_vehicles(available=0, sold=3)
+    repository = VehicleRepositoryAdapter(db_session)
+    assert repository.get_sales_report() == []
+
+    repository.confirm_sales(vehicle_ids)
+    assert report_counts(repository) == {
+        ("awaiting_pickup", "Brand 0"): 2,
+        ("awaiting_pickup", "Brand 1"): 1,
+    }
+
+    repository.confirm_pickup(repository.get_with_sold(vehicle_ids[0]))
+    repository.revert_sales([repository.get_with_sold(vehicle_ids[1])])
+    assert report_counts(repository) == {
+        ("awaiting_pickup", "Brand 0"): 1,
+        ("sold", "Brand 0"): 1,
+    }
+
+    buckets = repository.get_sales_report()
+    assert [bucket["revenue"] for bucket in buckets] == [12000, 10000]
+    assert {bucket["month"] for bucket in buckets} == {datetime.now().strftime("%Y-%m")}
+
+def test_picked_up_sales_are_not_changed_again(db_session, seed_vehicles) -> None:
+    """Test that a sale picked up after it was checked is neither picked up again nor reverted."""
+    vehicle_ids = seed_vehicles(available=0, sold=1)
+    repository = VehicleRepositoryAdapter(db_session)
+    repository.confirm_sales(vehicle_ids)
+    checked = repository.get_with_sold(vehicle_ids[0])
+    repository.confirm_pickup(checked)
+
+    repository.confirm_pickup(checked)
+    repository.revert_sales([checked])
+
+    vehicle = repository.get_with_sold(vehicle_ids[0])
+    assert vehicle.sold.status.value == "sold"
+    assert not vehicle.is_available
+    assert report_counts(repository) == {("sold", "Brand 0"): 1}
+
+def test_sales_report_confirming_twice(db_session, seed_vehicles) -> None:
+    """Test that a sale confirmed again keeps the price and brand it was confirmed with."""
+    vehicle_ids = seed_vehicles(available=0, sold=1)
+    repository = VehicleRepositoryAdapter(db_session)
+
+    repository.confirm_sale(repository.get_with_sold(vehicle_ids[0]))
+    repository.update(vehicle_ids[0], make_vehicle(brand_name="Brand 1", model="Model 0"))
+    repository.confirm_sale(repository.get_with_sold(vehicle_ids[0]))
+
+    assert [
+        (bucket["brand_name"], bucket["sales_count"], bucket["revenue"])
+        for bucket in repository.get_sales_report()
+    ] == [("Brand 0", 1, 10000)]
+
+def test_sales_report_with_lock(db_session, seed_vehicles, monkeypatch) -> None:
+    """Test the SELECT ... FOR UPDATE path of databases without ON CONFLICT."""
+    vehicle_ids = seed_vehicles(available=0, sold=2)
+    repository = VehicleRepositoryAdapter(db_session)
+    monkeypatch.setattr(repository, "_insert", lambda model: None)
+
+    repository.confirm_sales(vehicle_ids)
+    repository.confirm_pickup(repository.get_with_sold(vehicle_ids[0]))
+
+    assert report_counts(repository) == {
+        ("awaiting_pickup", "Brand 1"): 1,
+        ("sold", "Brand 0"): 1,
+    }
+
+def make_idempotency_record(key: str = "client-key", expires_in: timedelta = IDEMPOTENCY_TTL) -> IdempotencyRecord:
+    """Create the idempotency record of an initialize_sale request."""
+    return IdempotencyRecord(
+        user_id="buyer",
+        key=key,
+        request_hash="hash",
+        response={"idempotency_key": "payment-key"},
+        expires_at=datetime.now() + expires_in,
+    )
+
+def test_initialize_sale_saves_idempotency_record(db_session, seed_vehicles) -> None:
+    """Test that the idempotency record is saved with the sale, and not without it."""
+    vehicle_ids = seed_vehicles(available=1, sold=1)
+    repository = VehicleRepositoryAdapter(db_session)
+    idempotency = IdempotencyRepositoryAdapter(db_session)
+
+    assert repository.initialize_sale(vehicle_ids[1], "buyer", {}, make_idempotency_record("lost")) is None
+    assert repository.initialize_sale(vehicle_ids[0], "buyer", {}, make_idempotency_record()) is not None
+
+    assert idempotency.get("buyer", "lost") is None
+    assert idempotency.get("buyer", "client-key").response == {"idempotency_key": "payment-key"}
+    assert idempotency.get("another-buyer", "client-key") is None
+
+@pytest.mark.parametrize("with_lock", [False, True])
+def test_initialize_sale_replaces_expired_idempotency_record(db_session, seed_vehicles, monkeypatch, with_lock) -> None:
+    """Test that a key whose record expired but was not purged yet can be used again."""
+    vehicle_ids = seed_vehicles(available=2, sold=0)
+    repository = VehicleRepositoryAdapter(db_session)
+    idempotency = IdempotencyRepositoryAdapter(db_session)
+    if with_lock:
+        monkeypatch.setattr(repository, "_insert", lambda model: None)
+    repository.initialize_sale(vehicle_ids[0], "buyer", {}, make_idempotency_record(expires_in=-timedelta(minutes=1)))
+
+    record = make_idempotency_record()
+    record.request_hash = "another-hash"
+    assert repository.initialize_sale(vehicle_ids[1], "buyer", {}, record) is not None
+
+    assert idempotency.get("buyer", "client-key").request_hash == "another-hash"
+
+@pytest.mark.parametrize("with_lock", [False, True])
+def test_initialize_sale_leaves_live_idempotency_record(db_session, seed_vehicles, monkeypatch, with_lock) -> None:
+    """Test that a sale is not initialized while another request holds the key."""
+    vehicle_ids = seed_vehicles(available=2, sold=0)
+    repository = VehicleRepositoryAdapter(db_session)
+    idempotency = IdempotencyRepositoryAdapter(db_session)
+    if with_lock:
+        monkeypatch.setattr(repository, "_insert", lambda model: None)
+    repository.initialize_sale(vehicle_ids[0], "buyer", {}, make_idempotency_record())
+
+    record = make_idempotency_record()
+    record.request_hash = "another-hash"
+    assert repository.initialize_sale(vehicle_ids[1], "buyer", {}, record) is None
+
+    assert idempotency.get("buyer", "client-key").request_hash == "hash"
+    vehicle = repository.get_with_sold(vehicle_ids[1])
+    assert vehicle.is_available and vehicle.sold is None
+    assert db_session.query(OutboxMessage).count() == 1
+
+def test_purge_expired_idempotency_records(db_session, seed_vehicles) -> None:
+    """Test that expired records are ignored and purged in batches."""
+    vehicle_ids = seed_vehicles(available=4, sold=0)
+    repository = VehicleRepositoryAdapter(db_session)
+    idempotency = IdempotencyRepositoryAdapter(db_session)
+    for index, vehicle_id in enumerate(vehicle_ids):
+        expires_in = -timedelta(minutes=1) if index < 3 else IDEMPOTENCY_TTL
+        repository.initialize_sale(vehicle_id, "buyer", {}, make_idempotency_record(f"key-{index}", expires_in))
+
+    assert idempotency.get("buyer", "key-0") is None
+    assert idempotency.purge_expired(datetime.now(), 2) == 2
+    assert idempotency.purge_expired(datetime.now(), 2) == 1
+    assert idempotency.purge_expired(datetime.now(), 2) == 0
+    assert idempotency.get("buyer", "key-3") is not None
+
+def test_purge_processed_messages(db_session) -> None:
+    """Test that only the messages consumed before the given time are purged."""
+    repository = VehicleRepositoryAdapter(db_session)
+    idempotency = IdempotencyRepositoryAdapter(db_session)
+    repository.mark_processed(["message-1", "message-2"])
+    db_session.commit()
+
+    assert idempotency.purge_processed_messages(datetime.now() - timedelta(hours=1), 10) == 0
+    assert idempotency.purge_processed_messages(datetime.now(), 1) == 1
+    assert repository.mark_processed(["message-1", "message-2"]) in (["message-1"], ["message-2"])
+
+@pytest.mark.parametrize("with_lock", [False, True])
+def test_expire_draft_sales(db_session, seed_vehicles, stage_payment_requests, monkeypatch, with_lock) -> None:
+    """Test that old drafts are reverted in batches and confirmed sales are kept."""
+    vehicle_ids = seed_vehicles(available=0, sold=4)
+    stage_payment_requests(vehicle_ids)
+    repository = VehicleRepositoryAdapter(db_session)
+    if with_lock:
+        monkeypatch.setattr(repository, "_insert", lambda model: None)
+    repository.confirm_sales(vehicle_ids[:1])
+
+    assert repository.expire_draft_sales(datetime.now() - timedelta(hours=1), 2) == []
+    first_batch = repository.expire_draft_sales(datetime.now(), 2)
+    second_batch = repository.expire_draft_sales(datetime.now(), 2)
+
+    assert sorted(first_batch + second_batch) == vehicle_ids[1:]
+    assert len(first_batch) == 2
+    vehicles = repository.get_many_with_sold(vehicle_ids)
+    assert vehicles[vehicle_ids[0]].sold.status.value == "awaiting_pickup"
+    assert all(vehicles[vehicle_id].sold is None for vehicle_id in vehicle_ids[1:])
+    assert all(vehicles[vehicle_id].is_available for vehicle_id in vehicle_ids[1:])
+
+@pytest.mark.parametrize("with_lock", [False, True])
+def test_expire_draft_sales_drops_their_payment_requests(db_session, seed_vehicles, monkeypatch, with_lock) -> None:
+    """Test that the pending payment requests of expired drafts are deleted with them, and only them."""
+    vehicle_ids = seed_vehicles(available=2, sold=0)
+    repository = VehicleRepositoryAdapter(db_session)
+    for vehicle_id in vehicle_ids:
+        repository.initialize_sale(vehicle_id, "buyer", {"idempotency_key": f"key-{vehicle_id}"})
+    if with_lock:
+        monkeypatch.setattr(repository, "_insert", lambda model: None)
+    repository.confirm_sales(vehicle_ids[:1])
+
+    assert repository.expire_draft_sales(datetime.now(), 10) == vehicle_ids[1:]
+
+    assert [message.group_id for message in db_session.query(OutboxMessage).all()] == [str(vehicle_ids[0])]
+
+@pytest.mark.parametrize("with_lock", [False, True])
+def test_expire_draft_sales_keeps_relayed_drafts(db_session, seed_vehicles, monkeypatch, with_lock) -> None:
+    """Test that a draft whose payment request was already relayed is left for its confirmation."""
+    vehicle_ids = seed_vehicles(available=2, sold=0)
+    repository = VehicleRepositoryAdapter(db_session)
+    for vehicle_id in vehicle_ids:
+        repository.initialize_sale(vehicle_id, "buyer", {"idempotency_key": f"key-{vehicle_id}"})
+    if with_lock:
+        monkeypatch.setattr(repository, "_insert", lambda model: None)
+    relayed = OutboxRelay(OutboxRepositoryAdapter(db_session), InMemoryMessageQueue(), batch_size=1).relay(max_batches=1)
+
+    assert relayed == 1
+    assert repository.expire_draft_sales(datetime.now(), 10) == vehicle_ids[1:]
+    assert repository.get_with_sold(vehicle_ids[0]).sold.status.value == "draft"
+    assert repository.confirm_sales(vehicle_ids[:1]) == vehicle_ids[:1]
@@ -0,0 +1,23 @@
+"""Test the VehicleSearch entity."""
+import pytest
+from vehicle.domain.entities.vehicle_search import VehicleSearch
+
+def test_vehicle_search_from_query_parameters() -> None:
+    """Test that query string values are coerced."""
+    criteria = VehicleSearch.model_validate({"year_min": "2020", "price_max": "30000.5"})
+
+    assert criteria.year_min == 2020
+    assert criteria.price_max == 30000.5
+    assert criteria.brand_name is None
+
+def test_vehicle_search_with_inverted_range() -> None:
+    """Test that a minimum above its maximum is rejected."""
+    with pytest.raises(ValueError):
+        VehicleSearch(year_min=2024, year_max=2020)
+    with pytest.raises(ValueError):
+        VehicleSearch(price_min=2, price_max=1)
+
+def test_vehicle_search_with_unknown_criterion() -> None:
+    """Test that unknown criteria are rejected instead of ignored."""
+    with pytest.raises(ValueError):
+        VehicleSearch.model_validate({"engine": "v8"})
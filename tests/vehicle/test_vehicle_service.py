@@ -1,11 +1,27 @@
 """Test for VehicleService."""
-from unittest.mock import create_autospec, patch
+from unittest.mock import MagicMock, create_autospec, patch
 import pytest
+from pydantic import ValidationError
 
 from vehicle.domain.entities.vehicle import Vehicle
 from vehicle.application.services.vehicle_service import VehicleService
+from vehicle.application.ports.idempotency_repository import IdempotencyRepository
 from vehicle.application.ports.vehicle_repository import VehicleRepository
+from vehicle.domain.entities.vehicle_search import VehicleSearch
 from vehicle.domain.entities.vehicle_sold import VehicleSold
+from vehicle.application.services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    decode_cursor,
+    parse_limit,
+)
+from vehicle.exceptions.vehicle_exceptions import (
+    IdempotencyKeyReusedError,
+    InvalidPaginationError,
+    VehicleAlreadySoldError,
+    VehicleNotFoundError,
+    VehicleSaleNotInitializedError,
+)
+from vehicle.infrastructure.database.models import StatusEnum
 
 @pytest.fixture
 def vehicle_repository() -> VehicleRepository:
@@ -15,9 +31,17 @@ def vehicle_repository() -> VehicleRepository:
     return vehicle_repository
 
 @pytest.fixture
-def vehicle_service(vehicle_repository) -> VehicleService:
+def idempotency_repository() -> IdempotencyRepository:
+    """Fixture for IdempotencyRepository."""
+    idempotency_repository = create_autospec(IdempotencyRepository)
+    idempotency_repository.get.return_value = None
+
+    return idempotency_repository
+
+@pytest.fixture
+def vehicle_service(vehicle_repository, idempotency_repository) -> VehicleService:
     """Fixture for VehicleService."""
-    vehicle_service = VehicleService(vehicle_repository)
+    vehicle_service = VehicleService(vehicle_repository, idempotency_repository)
 
     return vehicle_service
 
@@ -115,9 +139,27 @@ def test_get_all_available(
         mocked_vehicle: dict,
     ) -> None:
     """Test for get_all_available."""
+    vehicle_repository.get_all_available.return_value = []
     vehicle_service.get_all_available()
 
-    vehicle_repository.get_all_available.assert_called_once()
+    vehicle_repository.get_all_available.assert_called_once_with(
+        DEFAULT_PAGE_SIZE + 1,
+        None,
+    )
+
+def test_search(
+        vehicle_repository: VehicleRepository,
+        vehicle_service: VehicleService,
+    ) -> None:
+    """Test that search forwards the criteria and the decoded cursor."""
+    criteria = VehicleSearch(brand_name="Toyota")
+    vehicle_repository.search.return_value = []
+
+    page = vehicle_service.search(criteria, 10)
+
+    vehicle_repository.search.assert_called_once_with(criteria, 11, None)
+    assert page.vehicles == []
+    assert page.next_cursor is None
 
 def test_get_all_sold(
         vehicle_repository: VehicleRepository,
@@ -126,29 +168,276 @@ def test_get_all_sold(
         mocked_vehicle: dict,
     ) -> None:
     """Test for get_all_sold."""
+    vehicle_repository.get_all_sold.return_value = []
     vehicle_service.get_all_sold()
 
-    vehicle_repository.get_all_sold.assert_called_once()
+    vehicle_repository.get_all_sold.assert_called_once_with(
+        DEFAULT_PAGE_SIZE + 1,
+        None,
+    )
+
+def test_listing_versions(
+        vehicle_repository: VehicleRepository,
+        vehicle_service: VehicleService,
+    ) -> None:
+    """Test that the listing versions come from the repository."""
+    vehicle_repository.get_available_version.return_value = "3:2024-01-01T00:00:00"
+    vehicle_repository.get_sold_version.return_value = "1::"
+
+    assert vehicle_service.get_available_version() == "3:2024-01-01T00:00:00"
+    assert vehicle_service.get_sold_version() == "1::"
+
+def test_get_sales_report(
+        vehicle_repository: VehicleRepository,
+        vehicle_service: VehicleService,
+    ) -> None:
+    """Test that the sales report sums the buckets by status, brand and month."""
+    vehicle_repository.get_sales_report.return_value = [
+        {"status": "awaiting_pickup", "brand_name": "Toyota", "month": "2024-01", "sales_count": 2, "revenue": 300.0},
+        {"status": "sold", "brand_name": "Honda", "month": "2024-01", "sales_count": 1, "revenue": 100.0},
+        {"status": "sold", "brand_name": "Toyota", "month": "2024-02", "sales_count": 1, "revenue": 200.0},
+    ]
+
+    report = vehicle_service.get_sales_report()
+
+    assert (report.sales_count, report.revenue) == (4, 600.0)
+    assert [(line.key, line.sales_count, line.revenue) for line in report.by_status] == [
+        ("awaiting_pickup", 2, 300.0),
+        ("sold", 2, 300.0),
+    ]
+    assert [(line.key, line.sales_count) for line in report.by_brand] == [("Honda", 1), ("Toyota", 3)]
+    assert [(line.key, line.revenue) for line in report.by_month] == [("2024-01", 400.0), ("2024-02", 200.0)]
+
+def test_get_all_available_next_cursor(
+        vehicle_repository: VehicleRepository,
+        vehicle_service: VehicleService,
+        mocked_vehicle: dict,
+    ) -> None:
+    """Test that a full page returns a cursor to the next one."""
+    vehicle_repository.get_all_available.return_value = [
+        {"id": index, **mocked_vehicle, "price": 100 * index, "sold": None}
+        for index in range(1, 4)
+    ]
+
+    page = vehicle_service.get_all_available(limit=2)
+
+    assert [vehicle["id"] for vehicle in page.vehicles] == [1, 2]
+    assert decode_cursor(page.next_cursor) == (200, 2)
+
+    vehicle_service.get_all_available(limit=2, cursor=page.next_cursor)
+    vehicle_repository.get_all_available.assert_called_with(3, (200, 2))
+
+def test_get_all_available_last_page(
+        vehicle_repository: VehicleRepository,
+        vehicle_service: VehicleService,
+        mocked_vehicle: dict,
+    ) -> None:
+    """Test that the last page has no cursor."""
+    vehicle_repository.get_all_available.return_value = [
+        {"id": 1, **mocked_vehicle, "sold": None}
+    ]
+
+    page = vehicle_service.get_all_available(limit=2)
+
+    assert len(page.vehicles) == 1
+    assert page.next_cursor is None
+
+def test_get_all_available_invalid_pagination(
+        vehicle_service: VehicleService,
+    ) -> None:
+    """Test that invalid cursors and limits are rejected."""
+    with pytest.raises(InvalidPaginationError):
+        vehicle_service.get_all_available(cursor="not-a-cursor")
+
+    with pytest.raises(InvalidPaginationError):
+        parse_limit("0")
+
+    with pytest.raises(InvalidPaginationError):
+        parse_limit("abc")
 
 def test_initialize_sale(
         vehicle_repository: VehicleRepository,
         vehicle_service: VehicleService,
-        mocked_vehicle_entity: Vehicle,
         mocked_vehicle_entity_with_sold: Vehicle
     ) -> None:
     """Test for initialize_sale."""
-    with patch.object(
-        vehicle_repository,
-            "get_with_sold",
-            return_value=mocked_vehicle_entity,
-        ), patch(
-            "vehicle.application.services.vehicle_service.sqs.send_message"
-        ), patch(
-            "uuid.uuid4", return_value="mocked-uuid"
-        ), patch.object(
-            vehicle_repository,
-            'initialize_sale',
-            return_value=mocked_vehicle_entity_with_sold
-        ):
-        vehicle_service.initialize_sale(22, 1, 'access_token')
-        vehicle_repository.initialize_sale.assert_called_once()
+    vehicle_repository.initialize_sale.return_value = mocked_vehicle_entity_with_sold.sold
+
+    with patch("uuid.uuid4", return_value="mocked-uuid"):
+        idempotency_key = vehicle_service.initialize_sale(1, "22", 'access_token')
+
+    vehicle_repository.initialize_sale.assert_called_once_with(
+        1,
+        "22",
+        {"idempotency_key": "mocked-uuid", "access_token": "access_token"},
+        None
+    )
+    vehicle_repository.get_with_sold.assert_not_called()
+    assert idempotency_key == "mocked-uuid"
+
+def test_initialize_sale_saves_idempotency_record(
+        vehicle_repository: VehicleRepository,
+        idempotency_repository: IdempotencyRepository,
+        vehicle_service: VehicleService,
+        mocked_vehicle_entity_with_sold: Vehicle
+    ) -> None:
+    """Test that the response of a request with an idempotency key is saved with the sale."""
+    vehicle_repository.initialize_sale.return_value = mocked_vehicle_entity_with_sold.sold
+
+    with patch("uuid.uuid4", return_value="mocked-uuid"):
+        idempotency_key = vehicle_service.initialize_sale(1, "22", "access_token", "client-key")
+
+    idempotency_repository.get.assert_called_once_with("22", "client-key")
+    record = vehicle_repository.initialize_sale.call_args.args[3]
+    assert (record.user_id, record.key) == ("22", "client-key")
+    assert record.response == {"idempotency_key": "mocked-uuid"}
+    assert idempotency_key == "mocked-uuid"
+
+def test_initialize_sale_replays_retries(
+        vehicle_repository: VehicleRepository,
+        idempotency_repository: IdempotencyRepository,
+        vehicle_service: VehicleService,
+    ) -> None:
+    """Test that a retry replays the first response without touching the sale."""
+    vehicle_service.initialize_sale(1, "22", "access_token", "client-key")
+    record = vehicle_repository.initialize_sale.call_args.args[3]
+    vehicle_repository.reset_mock()
+    idempotency_repository.get.return_value = record
+
+    idempotency_key = vehicle_service.initialize_sale("1", "22", "new_access_token", "client-key")
+
+    assert idempotency_key == record.response["idempotency_key"]
+    vehicle_repository.initialize_sale.assert_not_called()
+
+def test_initialize_sale_replays_concurrent_retries(
+        vehicle_repository: VehicleRepository,
+        idempotency_repository: IdempotencyRepository,
+        vehicle_service: VehicleService,
+    ) -> None:
+    """Test that a retry losing the sale to the first request replays its response."""
+    vehicle_service.initialize_sale(1, "22", "access_token", "client-key")
+    record = vehicle_repository.initialize_sale.call_args.args[3]
+    vehicle_repository.initialize_sale.return_value = None
+    idempotency_repository.get.side_effect = [None, record]
+
+    assert vehicle_service.initialize_sale(1, "22", "access_token", "client-key") == \
+        record.response["idempotency_key"]
+
+def test_initialize_sale_rejects_reused_key(
+        vehicle_repository: VehicleRepository,
+        idempotency_repository: IdempotencyRepository,
+        vehicle_service: VehicleService,
+    ) -> None:
+    """Test that a key cannot be reused for a sale of another vehicle."""
+    vehicle_service.initialize_sale(1, "22", "access_token", "client-key")
+    idempotency_repository.get.return_value = vehicle_repository.initialize_sale.call_args.args[3]
+
+    with pytest.raises(IdempotencyKeyReusedError):
+        vehicle_service.initialize_sale(2, "22", "access_token", "client-key")
+
+def test_initialize_sale_rejects_invalid_key(vehicle_service: VehicleService) -> None:
+    """Test that an empty or too long key is a validation error."""
+    for key in ("", "k" * 256):
+        with pytest.raises(ValidationError):
+            vehicle_service.initialize_sale(1, "22", "access_token", key)
+
+def test_initialize_sale_already_sold(
+        vehicle_repository: VehicleRepository,
+        vehicle_service: VehicleService,
+        mocked_vehicle_entity_with_sold: Vehicle
+    ) -> None:
+    """Test that a vehicle with a sale cannot be sold again."""
+    vehicle_repository.initialize_sale.return_value = None
+    vehicle_repository.get_with_sold.return_value = mocked_vehicle_entity_with_sold
+
+    with pytest.raises(VehicleAlreadySoldError):
+        vehicle_service.initialize_sale(1, "22", 'access_token')
+
+def test_initialize_sale_not_found(
+        vehicle_repository: VehicleRepository,
+        vehicle_service: VehicleService,
+    ) -> None:
+    """Test that a missing vehicle cannot be sold."""
+    vehicle_repository.initialize_sale.return_value = None
+    vehicle_repository.get_with_sold.return_value = None
+
+    with pytest.raises(VehicleNotFoundError):
+        vehicle_service.initialize_sale(404, "22", 'access_token')
+
+def test_confirm_sales(
+        vehicle_repository: VehicleRepository,
+        vehicle_service: VehicleService,
+    ) -> None:
+    """Test that confirm_sales confirms draft sales in one call and only reads the others."""
+    confirmed = MagicMock(id=4, sold=MagicMock(status=StatusEnum.awaiting_pickup))
+    picked_up = MagicMock(id=2, sold=MagicMock(status=StatusEnum.sold))
+    vehicle_repository.confirm_sales.return_value = [1]
+    vehicle_repository.get_many_with_sold.return_value = {2: picked_up, 4: confirmed}
+
+    rejected = vehicle_service.confirm_sales([1, 2, 3, 4])
+
+    vehicle_repository.confirm_sales.assert_called_once_with([1, 2, 3, 4])
+    vehicle_repository.get_many_with_sold.assert_called_once_with([2, 3, 4])
+    assert list(rejected) == [2, 3]
+    assert isinstance(rejected[2], VehicleAlreadySoldError)
+    assert isinstance(rejected[3], VehicleNotFoundError)
+
+def test_confirm_sales_skips_processed_messages(
+        vehicle_repository: VehicleRepository,
+        vehicle_service: VehicleService,
+    ) -> None:
+    """Test that redelivered messages are not confirmed again."""
+    vehicle_repository.mark_processed.return_value = ["message-2"]
+    vehicle_repository.confirm_sales.return_value = [2]
+
+    assert vehicle_service.confirm_sales([1, 2], ["message-1", "message-2"]) == {}
+    vehicle_repository.confirm_sales.assert_called_once_with([2])
+    vehicle_repository.get_many_with_sold.assert_not_called()
+
+    vehicle_repository.mark_processed.return_value = []
+    assert vehicle_service.confirm_sales([1], ["message-1"]) == {}
+    vehicle_repository.confirm_sales.assert_called_once()
+
+def test_revert_sales(
+        vehicle_repository: VehicleRepository,
+        vehicle_service: VehicleService,
+    ) -> None:
+    """Test that revert_sales skips the repository when nothing is revertible."""
+    vehicle_repository.get_many_with_sold.return_value = {
+        1: MagicMock(id=1, sold=None)
+    }
+
+    rejected = vehicle_service.revert_sales([1])
+
+    vehicle_repository.revert_sales.assert_not_called()
+    assert isinstance(rejected[1], VehicleSaleNotInitializedError)
+
+def test_import_vehicles(
+        vehicle_repository: VehicleRepository,
+        vehicle_service: VehicleService,
+        mocked_vehicle: dict,
+    ) -> None:
+    """Test that rows are validated and saved in chunks."""
+    def save_many(vehicles):
+        return [
+            None if vehicle.model == "Duplicate" else vehicle.model_copy(update={"id": 7})
+            for vehicle in vehicles
+        ]
+    vehicle_repository.save_many.side_effect = save_many
+    rows = [
+        mocked_vehicle,
+        {**mocked_vehicle, "year": 0},
+        {**mocked_vehicle, "model": "Duplicate"},
+        "not a vehicle",
+        {**mocked_vehicle, "model": "Yaris"},
+    ]
+
+    results = vehicle_service.import_vehicles(rows, chunk_size=2)
+
+    assert vehicle_repository.save_many.call_count == 2
+    assert [result.status for result in results] == [
+        "created", "invalid", "duplicate", "invalid", "created"
+    ]
+    assert [result.row for result in results] == [0, 1, 2, 3, 4]
+    assert results[0].vehicle_id == 7
+    assert results[1].errors[0]["loc"] == ("year",)
@@ -1,11 +1,15 @@
 """ Cancel a sale for a Vehicle """
 from vehicle.application.services.vehicle_service import VehicleService
+from vehicle.adapters.repositories.cached_vehicle_repository import invalidating
 from vehicle.adapters.repositories.vehicle_repository_adapter import VehicleRepositoryAdapter
 from vehicle.exceptions.exception_handler import http_exception_handler
 from vehicle.exceptions.vehicle_exceptions import InvalidVehicleIDError
 from vehicle.infrastructure.database.exceptions.orm_exceptions import handle_sqlalchemy_exceptions
-from vehicle.infrastructure.database.setup import get_db
+from vehicle.infrastructure.cache.setup import shared_vehicle_cache
+from vehicle.infrastructure.database.setup import session_scope
+from vehicle.infrastructure.metrics.instrumentation import instrumented
 
+@instrumented
 @http_exception_handler
 @handle_sqlalchemy_exceptions
 def cancel_sale(event, context):
@@ -18,10 +22,10 @@ def cancel_sale(event, context):
             status_code=400
         )
 
-    db = next(get_db())
-    repository = VehicleRepositoryAdapter(db)
-    service = VehicleService(repository)
-    service.revert_sale(vehicle_id)
+    with session_scope() as db:
+        repository = invalidating(VehicleRepositoryAdapter(db), shared_vehicle_cache)
+        service = VehicleService(repository)
+        service.revert_sale(vehicle_id)
 
     return {
         "message": "Sale cancelled successfully",
@@ -1,12 +1,23 @@
 """ This module contains the controller for the create vehicle """
-import json
 import logging
+from typing import List
+from aws_lambda_powertools.metrics import MetricUnit
 
-from vehicle.application.services.vehicle_service import VehicleService
+from vehicle.application.services.async_vehicle_service import AsyncVehicleService
+from vehicle.adapters.repositories.cached_vehicle_repository import invalidating
+from vehicle.adapters.repositories.async_vehicle_repository_adapter import AsyncVehicleRepositoryAdapter
 from vehicle.adapters.repositories.vehicle_repository_adapter import VehicleRepositoryAdapter
-from vehicle.exceptions.vehicle_exceptions import InvalidVehicleIDError
-from vehicle.infrastructure.database.setup import get_db
+from vehicle.adapters.events.async_runner import run_async
+from vehicle.adapters.events.sqs_batch import (
+    VehicleRecord,
+    parse_vehicle_records,
+    process_in_bulk_async,
+)
+from vehicle.infrastructure.cache.setup import shared_vehicle_cache
+from vehicle.infrastructure.database.async_setup import async_session_scope
 from vehicle.exceptions.exception_handler import event_exception_handlers
+from vehicle.infrastructure.metrics.instrumentation import instrumented
+from vehicle.infrastructure.metrics.setup import metrics
 
 logging.basicConfig(
     level=logging.INFO,
@@ -15,19 +26,30 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@instrumented
 @event_exception_handlers(logger=logger)
-def confirm_sale(event, context):
-    """ Confirm a sale for a Vehicle """
-    body = json.loads(event["Records"][0]["body"])
-    vehicle_id = body["vehicle_id"]
+@run_async
+async def confirm_sale(event, context):
+    """ Confirm the sales of every Vehicle in the batch """
+    records = parse_vehicle_records(event, logger)
+
+    return await process_in_bulk_async(records, _confirm_sales, logger)
 
-    if not vehicle_id:
-        raise InvalidVehicleIDError(
-            message="vehicle_id is required",
-            status_code=400
+async def _confirm_sales(records: List[VehicleRecord]) -> None:
+    """ Confirm the sales of the given records in one session """
+    async with async_session_scope() as db:
+        repository = AsyncVehicleRepositoryAdapter(
+            db,
+            lambda session: invalidating(VehicleRepositoryAdapter(session), shared_vehicle_cache)
+        )
+        service = AsyncVehicleService(repository)
+        rejected = await service.confirm_sales(
+            [record.vehicle_id for record in records],
+            [record.message_id for record in records]
         )
 
-    db = next(get_db())
-    repository = VehicleRepositoryAdapter(db)
-    service = VehicleService(repository)
-    service.confirm_sale(vehicle_id)
+    # A rejected confirmation is a payment without a sale: alarm on this metric.
+    if rejected:
+        metrics.add_metric(name="RejectedConfirmations", unit=MetricUnit.Count, value=len(rejected))
+    for vehicle_id, error in rejected.items():
+        logger.error(f"Sale of vehicle {vehicle_id} not confirmed: {error}")
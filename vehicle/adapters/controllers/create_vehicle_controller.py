@@ -5,18 +5,20 @@ from vehicle.application.services.vehicle_service import VehicleService
 from vehicle.adapters.repositories.vehicle_repository_adapter import VehicleRepositoryAdapter
 from vehicle.exceptions.exception_handler import http_exception_handler
 from vehicle.infrastructure.database.exceptions.orm_exceptions import handle_sqlalchemy_exceptions
-from vehicle.infrastructure.database.setup import get_db
+from vehicle.infrastructure.database.setup import session_scope
+from vehicle.infrastructure.metrics.instrumentation import instrumented
 
+@instrumented
 @http_exception_handler
 @handle_sqlalchemy_exceptions
 def register_vehicle(event, context):
     """ Register a new Vehicle """
     body = json.loads(event.get('body', '{}'))
 
-    db = next(get_db())
-    repository = VehicleRepositoryAdapter(db)
-    service = VehicleService(repository)
-    vehicle = service.register_vehicle(body)
+    with session_scope() as db:
+        repository = VehicleRepositoryAdapter(db)
+        service = VehicleService(repository)
+        vehicle = service.register_vehicle(body)
 
     return {
         'statusCode': 201,
@@ -0,0 +1,45 @@
+""" This module contains the controller for the abandoned draft sales sweeper """
+import logging
+import os
+from datetime import datetime, timedelta
+from aws_lambda_powertools.metrics import MetricUnit
+
+from vehicle.application.services.vehicle_service import VehicleService
+from vehicle.adapters.repositories.cached_vehicle_repository import invalidating
+from vehicle.adapters.repositories.vehicle_repository_adapter import VehicleRepositoryAdapter
+from vehicle.infrastructure.cache.setup import shared_vehicle_cache
+from vehicle.infrastructure.database.setup import session_scope
+from vehicle.exceptions.exception_handler import event_exception_handlers
+from vehicle.infrastructure.metrics.instrumentation import instrumented
+from vehicle.infrastructure.metrics.setup import metrics
+
+DRAFT_SALE_TTL = timedelta(minutes=int(os.getenv("DRAFT_SALE_TTL_MINUTES", "60")))
+DRAFT_SWEEP_BATCH_SIZE = int(os.getenv("DRAFT_SWEEP_BATCH_SIZE", "500"))
+DRAFT_SWEEP_MAX_BATCHES = int(os.getenv("DRAFT_SWEEP_MAX_BATCHES", "20"))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+@instrumented
+@event_exception_handlers(logger=logger)
+def expire_draft_sales(event, context):
+    """ Revert the draft sales whose payment never completed, one short transaction per batch """
+    before = datetime.now() - DRAFT_SALE_TTL
+    reclaimed = 0
+    with session_scope() as db:
+        service = VehicleService(invalidating(VehicleRepositoryAdapter(db), shared_vehicle_cache))
+        for _ in range(DRAFT_SWEEP_MAX_BATCHES):
+            expired = service.expire_draft_sales(before, DRAFT_SWEEP_BATCH_SIZE)
+            reclaimed += len(expired)
+            logger.info(f"Reverted the abandoned draft sales of vehicles {expired}")
+            if len(expired) < DRAFT_SWEEP_BATCH_SIZE:
+                break
+
+    logger.info(f"Reclaimed {reclaimed} vehicles from abandoned draft sales")
+    metrics.add_metric(name="ReclaimedDrafts", unit=MetricUnit.Count, value=reclaimed)
+
+    return {"reclaimed": reclaimed}
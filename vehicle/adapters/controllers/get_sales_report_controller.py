@@ -0,0 +1,30 @@
+""" Get the Sales Report """
+
+from vehicle.application.services.vehicle_service import VehicleService
+from vehicle.adapters.repositories.vehicle_repository_adapter import VehicleRepositoryAdapter
+from vehicle.adapters.http.conditional import is_not_modified, not_modified, weak_etag
+from vehicle.exceptions.exception_handler import http_exception_handler
+from vehicle.infrastructure.database.exceptions.orm_exceptions import handle_sqlalchemy_exceptions
+from vehicle.infrastructure.database.setup import session_scope
+from vehicle.infrastructure.metrics.instrumentation import instrumented
+
+@instrumented
+@http_exception_handler
+@handle_sqlalchemy_exceptions
+def get_sales_report(event, context):
+    """ Get the confirmed sales with their totals by status, brand and month """
+    with session_scope() as db:
+        repository = VehicleRepositoryAdapter(db)
+        service = VehicleService(repository)
+        report = service.get_sales_report()
+
+    body = report.model_dump_json()
+    etag = weak_etag(body)
+    if is_not_modified(event, etag):
+        return not_modified(etag)
+
+    return {
+        'statusCode': 200,
+        'headers': {'ETag': etag},
+        'body': body,
+    }
@@ -2,12 +2,17 @@
 import json
 
 from vehicle.application.services.vehicle_service import VehicleService
+from vehicle.adapters.repositories.cached_vehicle_repository import CachedVehicleRepository
 from vehicle.adapters.repositories.vehicle_repository_adapter import VehicleRepositoryAdapter
+from vehicle.adapters.http.conditional import is_not_modified, not_modified, weak_etag
 from vehicle.exceptions.exception_handler import http_exception_handler
 from vehicle.exceptions.vehicle_exceptions import InvalidVehicleIDError
 from vehicle.infrastructure.database.exceptions.orm_exceptions import handle_sqlalchemy_exceptions
-from vehicle.infrastructure.database.setup import get_db
+from vehicle.infrastructure.cache.setup import vehicle_cache
+from vehicle.infrastructure.database.setup import session_scope
+from vehicle.infrastructure.metrics.instrumentation import instrumented
 
+@instrumented
 @http_exception_handler
 @handle_sqlalchemy_exceptions
 def get_vehicle(event, context):
@@ -19,12 +24,21 @@ def get_vehicle(event, context):
             status_code=400
         )
 
-    db = next(get_db())
-    repository = VehicleRepositoryAdapter(db)
-    service = VehicleService(repository)
-    vehicle = service.get(vehicle_id)
+    with session_scope() as db:
+        repository = CachedVehicleRepository(
+            VehicleRepositoryAdapter(db),
+            vehicle_cache
+        )
+        service = VehicleService(repository)
+        vehicle = service.get(vehicle_id)
+
+    body = json.dumps(vehicle.model_dump())
+    etag = weak_etag(body)
+    if is_not_modified(event, etag):
+        return not_modified(etag)
 
     return {
         'statusCode': 200,
-        'body': json.dumps(vehicle.model_dump()),
+        'headers': {'ETag': etag},
+        'body': body,
     }
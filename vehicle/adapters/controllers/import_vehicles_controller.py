@@ -0,0 +1,38 @@
+""" Import Vehicles in bulk """
+import json
+import os
+
+from vehicle.application.services.vehicle_service import VehicleService
+from vehicle.adapters.http.import_body import content_type, parse_rows, read_body
+from vehicle.adapters.repositories.vehicle_repository_adapter import VehicleRepositoryAdapter
+from vehicle.exceptions.exception_handler import http_exception_handler
+from vehicle.infrastructure.database.exceptions.orm_exceptions import handle_sqlalchemy_exceptions
+from vehicle.infrastructure.database.setup import session_scope
+from vehicle.infrastructure.metrics.instrumentation import instrumented
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))
+
+@instrumented
+@http_exception_handler
+@handle_sqlalchemy_exceptions
+def import_vehicles(event, context):
+    """ Import Vehicles from a JSON array, NDJSON or CSV body """
+    rows = parse_rows(read_body(event), content_type(event))
+
+    with session_scope() as db:
+        repository = VehicleRepositoryAdapter(db)
+        service = VehicleService(repository)
+        results = service.import_vehicles(rows, IMPORT_CHUNK_SIZE)
+
+    summary = {"created": 0, "duplicate": 0, "invalid": 0}
+    for result in results:
+        summary[result.status] += 1
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'message': 'Vehicles imported',
+            **summary,
+            'results': [result.model_dump(exclude_none=True) for result in results]
+        })
+    }
@@ -2,12 +2,17 @@
 import json
 
 from vehicle.application.services.vehicle_service import VehicleService
+from vehicle.adapters.repositories.cached_vehicle_repository import invalidating
+from vehicle.adapters.repositories.idempotency_repository_adapter import IdempotencyRepositoryAdapter
 from vehicle.adapters.repositories.vehicle_repository_adapter import VehicleRepositoryAdapter
 from vehicle.exceptions.exception_handler import http_exception_handler
 from vehicle.exceptions.vehicle_exceptions import InvalidVehicleIDError
 from vehicle.infrastructure.database.exceptions.orm_exceptions import handle_sqlalchemy_exceptions
-from vehicle.infrastructure.database.setup import get_db
+from vehicle.infrastructure.cache.setup import shared_vehicle_cache
+from vehicle.infrastructure.database.setup import session_scope
+from vehicle.infrastructure.metrics.instrumentation import instrumented
 
+@instrumented
 @http_exception_handler
 @handle_sqlalchemy_exceptions
 def initialize_sale(event, context):
@@ -23,6 +28,7 @@ def initialize_sale(event, context):
     )
     access_token = event.get('headers', {}).get('authorization')
     access_token = access_token.replace("Bearer ", "")
+    idempotency_key = event.get('headers', {}).get('idempotency-key')
 
     if not vehicle_id or not user_id:
         raise InvalidVehicleIDError(
@@ -31,14 +37,15 @@ def initialize_sale(event, context):
         )
 
 
-    db = next(get_db())
-    repository = VehicleRepositoryAdapter(db)
-    service = VehicleService(repository)
-    idempotency_key = service.initialize_sale(
-        vehicle_id,
-        user_id,
-        access_token
-    )
+    with session_scope() as db:
+        repository = invalidating(VehicleRepositoryAdapter(db), shared_vehicle_cache)
+        service = VehicleService(repository, IdempotencyRepositoryAdapter(db))
+        idempotency_key = service.initialize_sale(
+            vehicle_id,
+            user_id,
+            access_token,
+            idempotency_key
+        )
 
     return {
         'statusCode': 201,
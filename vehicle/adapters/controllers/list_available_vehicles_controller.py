@@ -1,24 +1,34 @@
 """ List Available Vehicles """
-import json
 
 from vehicle.application.services.vehicle_service import VehicleService
+from vehicle.application.services.pagination import parse_limit
 from vehicle.adapters.repositories.vehicle_repository_adapter import VehicleRepositoryAdapter
+from vehicle.adapters.http.conditional import is_not_modified, not_modified, weak_etag
 from vehicle.exceptions.exception_handler import http_exception_handler
 from vehicle.infrastructure.database.exceptions.orm_exceptions import handle_sqlalchemy_exceptions
-from vehicle.infrastructure.database.setup import get_db
+from vehicle.infrastructure.database.setup import session_scope
+from vehicle.infrastructure.metrics.instrumentation import instrumented
 
+@instrumented
 @http_exception_handler
 @handle_sqlalchemy_exceptions
 def list_available_vehicles(event, context):
     """ List Available Vehicles """
-    db = next(get_db())
-    repository = VehicleRepositoryAdapter(db)
-    service = VehicleService(repository)
-    vehicles = service.get_all_available()
+    query_parameters = event.get('queryStringParameters') or {}
+    limit = parse_limit(query_parameters.get('limit'))
+    cursor = query_parameters.get('cursor')
 
-    vehicles_dict = [vehicle.model_dump() for vehicle in vehicles]
+    with session_scope() as db:
+        repository = VehicleRepositoryAdapter(db)
+        service = VehicleService(repository)
+        etag = weak_etag("available", service.get_available_version(), limit, cursor)
+        if is_not_modified(event, etag):
+            return not_modified(etag)
+
+        page = service.get_all_available(limit, cursor)
 
     return {
         'statusCode': 200,
-        'body': json.dumps(vehicles_dict),
+        'headers': {'ETag': etag},
+        'body': page.model_dump_json(),
     }
@@ -0,0 +1,51 @@
+""" This module contains the controller for the idempotency records cleanup """
+import logging
+import os
+from datetime import datetime
+from typing import Callable
+
+from vehicle.adapters.repositories.idempotency_repository_adapter import IdempotencyRepositoryAdapter
+from vehicle.domain.entities.idempotency_record import PROCESSED_MESSAGE_TTL
+from vehicle.infrastructure.database.setup import session_scope
+from vehicle.exceptions.exception_handler import event_exception_handlers
+from vehicle.infrastructure.metrics.instrumentation import instrumented
+
+IDEMPOTENCY_PURGE_BATCH_SIZE = int(os.getenv("IDEMPOTENCY_PURGE_BATCH_SIZE", "1000"))
+IDEMPOTENCY_PURGE_MAX_BATCHES = int(os.getenv("IDEMPOTENCY_PURGE_MAX_BATCHES", "50"))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+@instrumented
+@event_exception_handlers(logger=logger)
+def purge_idempotency_records(event, context):
+    """
+    Delete the expired idempotency records and the consumed messages past
+    their redelivery window, one short transaction per batch
+    """
+    now = datetime.now()
+    with session_scope() as db:
+        repository = IdempotencyRepositoryAdapter(db)
+        purged = _purge_in_batches(lambda limit: repository.purge_expired(now, limit))
+        purged_messages = _purge_in_batches(
+            lambda limit: repository.purge_processed_messages(now - PROCESSED_MESSAGE_TTL, limit)
+        )
+
+    logger.info(f"Purged {purged} idempotency records and {purged_messages} processed messages")
+
+    return {"purged": purged, "purged_messages": purged_messages}
+
+def _purge_in_batches(purge: Callable[[int], int]) -> int:
+    """ Call a purge until a batch comes back short, and return how many rows it deleted """
+    purged = 0
+    for _ in range(IDEMPOTENCY_PURGE_MAX_BATCHES):
+        deleted = purge(IDEMPOTENCY_PURGE_BATCH_SIZE)
+        purged += deleted
+        if deleted < IDEMPOTENCY_PURGE_BATCH_SIZE:
+            break
+
+    return purged
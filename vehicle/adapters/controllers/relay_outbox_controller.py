@@ -0,0 +1,36 @@
+""" This module contains the controller for the outbox relay """
+import logging
+import os
+
+from vehicle.application.services.outbox_relay import OutboxRelay
+from vehicle.adapters.repositories.outbox_repository_adapter import OutboxRepositoryAdapter
+from vehicle.infrastructure.database.setup import session_scope
+from vehicle.infrastructure.queue.setup import message_queue
+from vehicle.exceptions.exception_handler import event_exception_handlers
+from vehicle.infrastructure.metrics.instrumentation import instrumented
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_MAX_BATCHES = int(os.getenv("OUTBOX_MAX_BATCHES", "10"))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+@instrumented
+@event_exception_handlers(logger=logger)
+def relay_outbox(event, context):
+    """ Relay the messages staged in the outbox to their queues """
+    with session_scope() as db:
+        relay = OutboxRelay(
+            OutboxRepositoryAdapter(db),
+            message_queue,
+            batch_size=OUTBOX_BATCH_SIZE
+        )
+        relayed = relay.relay(max_batches=OUTBOX_MAX_BATCHES)
+
+    logger.info(f"Relayed {relayed} outbox messages")
+
+    return {"relayed": relayed}
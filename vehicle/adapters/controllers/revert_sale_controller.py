@@ -1,12 +1,21 @@
 """ This module contains the controller for the create vehicle """
-import json
 import logging
+from typing import List
 
-from vehicle.application.services.vehicle_service import VehicleService
+from vehicle.application.services.async_vehicle_service import AsyncVehicleService
+from vehicle.adapters.repositories.cached_vehicle_repository import invalidating
+from vehicle.adapters.repositories.async_vehicle_repository_adapter import AsyncVehicleRepositoryAdapter
 from vehicle.adapters.repositories.vehicle_repository_adapter import VehicleRepositoryAdapter
+from vehicle.adapters.events.async_runner import run_async
 from vehicle.exceptions.exception_handler import event_exception_handlers
-from vehicle.exceptions.vehicle_exceptions import InvalidVehicleIDError
-from vehicle.infrastructure.database.setup import get_db
+from vehicle.adapters.events.sqs_batch import (
+    VehicleRecord,
+    parse_vehicle_records,
+    process_in_bulk_async,
+)
+from vehicle.infrastructure.cache.setup import shared_vehicle_cache
+from vehicle.infrastructure.database.async_setup import async_session_scope
+from vehicle.infrastructure.metrics.instrumentation import instrumented
 
 logging.basicConfig(
     level=logging.INFO,
@@ -15,19 +24,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@instrumented
 @event_exception_handlers(logger=logger)
-def revert_sale(event, context):
-    """ Revert a sale for a Vehicle """
-    body = json.loads(event["Records"][0]["body"])
-    vehicle_id = body["vehicle_id"]
+@run_async
+async def revert_sale(event, context):
+    """ Revert the sales of every Vehicle in the batch """
+    records = parse_vehicle_records(event, logger)
+
+    return await process_in_bulk_async(records, _revert_sales, logger)
 
-    if not vehicle_id:
-        raise InvalidVehicleIDError(
-            message="vehicle_id is required",
-            status_code=400
+async def _revert_sales(records: List[VehicleRecord]) -> None:
+    """ Revert the sales of the given records in one session """
+    async with async_session_scope() as db:
+        repository = AsyncVehicleRepositoryAdapter(
+            db,
+            lambda session: invalidating(VehicleRepositoryAdapter(session), shared_vehicle_cache)
         )
+        service = AsyncVehicleService(repository)
+        rejected = await service.revert_sales([record.vehicle_id for record in records])
 
-    db = next(get_db())
-    repository = VehicleRepositoryAdapter(db)
-    service = VehicleService(repository)
-    service.revert_sale(vehicle_id)
+    for vehicle_id, error in rejected.items():
+        logger.error(f"Sale of vehicle {vehicle_id} not reverted: {error}")
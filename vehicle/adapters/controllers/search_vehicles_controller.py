@@ -0,0 +1,36 @@
+""" Search Available Vehicles """
+
+from vehicle.application.services.vehicle_service import VehicleService
+from vehicle.application.services.pagination import parse_limit
+from vehicle.adapters.repositories.vehicle_repository_adapter import VehicleRepositoryAdapter
+from vehicle.adapters.http.conditional import is_not_modified, not_modified, weak_etag
+from vehicle.domain.entities.vehicle_search import VehicleSearch
+from vehicle.exceptions.exception_handler import http_exception_handler
+from vehicle.infrastructure.database.exceptions.orm_exceptions import handle_sqlalchemy_exceptions
+from vehicle.infrastructure.database.setup import session_scope
+from vehicle.infrastructure.metrics.instrumentation import instrumented
+
+@instrumented
+@http_exception_handler
+@handle_sqlalchemy_exceptions
+def search_vehicles(event, context):
+    """ Search Available Vehicles """
+    query_parameters = dict(event.get('queryStringParameters') or {})
+    limit = parse_limit(query_parameters.pop('limit', None))
+    cursor = query_parameters.pop('cursor', None)
+    criteria = VehicleSearch.model_validate(query_parameters)
+
+    with session_scope() as db:
+        repository = VehicleRepositoryAdapter(db)
+        service = VehicleService(repository)
+        etag = weak_etag("search", service.get_available_version(), limit, cursor, criteria.model_dump())
+        if is_not_modified(event, etag):
+            return not_modified(etag)
+
+        page = service.search(criteria, limit, cursor)
+
+    return {
+        'statusCode': 200,
+        'headers': {'ETag': etag},
+        'body': page.model_dump_json(),
+    }
@@ -2,12 +2,16 @@
 import json
 
 from vehicle.application.services.vehicle_service import VehicleService
+from vehicle.adapters.repositories.cached_vehicle_repository import invalidating
 from vehicle.adapters.repositories.vehicle_repository_adapter import VehicleRepositoryAdapter
 from vehicle.exceptions.exception_handler import http_exception_handler
 from vehicle.exceptions.vehicle_exceptions import InvalidVehicleIDError
 from vehicle.infrastructure.database.exceptions.orm_exceptions import handle_sqlalchemy_exceptions
-from vehicle.infrastructure.database.setup import get_db
+from vehicle.infrastructure.cache.setup import shared_vehicle_cache
+from vehicle.infrastructure.database.setup import session_scope
+from vehicle.infrastructure.metrics.instrumentation import instrumented
 
+@instrumented
 @http_exception_handler
 @handle_sqlalchemy_exceptions
 def update_vehicle(event, context):
@@ -21,10 +25,10 @@ def update_vehicle(event, context):
             status_code=400
         )
 
-    db = next(get_db())
-    repository = VehicleRepositoryAdapter(db)
-    service = VehicleService(repository)
-    vehicle = service.update_vehicle(vehicle_id, body)
+    with session_scope() as db:
+        repository = invalidating(VehicleRepositoryAdapter(db), shared_vehicle_cache)
+        service = VehicleService(repository)
+        vehicle = service.update_vehicle(vehicle_id, body)
 
     return {
         'statusCode': 200,
@@ -0,0 +1,30 @@
+"""
+This module runs coroutine handlers on the synchronous Lambda runtime.
+"""
+import asyncio
+from functools import wraps
+from typing import Any, Awaitable, Callable
+
+_loop: asyncio.AbstractEventLoop | None = None
+
+def event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the event loop of the container.
+    Pooled asyncio connections belong to the loop that opened them, so the
+    loop is kept open across warm invocations instead of using asyncio.run.
+    """
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+
+    return _loop
+
+def run_async(func: Callable[..., Awaitable[Any]]) -> Callable[..., Any]:
+    """
+    Decorator turning a coroutine handler into a Lambda handler.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return event_loop().run_until_complete(func(*args, **kwargs))
+    return wrapper
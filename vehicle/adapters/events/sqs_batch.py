@@ -0,0 +1,106 @@
+"""
+This module contains the helpers to process SQS batches in the controllers.
+"""
+import asyncio
+import json
+import os
+from logging import Logger
+from typing import Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+class VehicleRecord(NamedTuple):
+    """ A SQS record carrying a vehicle_id """
+    message_id: str
+    message_group_id: str
+    vehicle_id: int
+
+def parse_vehicle_records(event: dict, logger: Logger) -> List[VehicleRecord]:
+    """
+    Parse every record of the batch.
+    Records without a valid vehicle_id are logged and dropped, since
+    retrying them would never succeed.
+    """
+    records = []
+    for record in event.get("Records", []):
+        try:
+            vehicle_id = int(json.loads(record["body"])["vehicle_id"])
+        except (KeyError, TypeError, ValueError) as error:
+            logger.error(f"Invalid record {record.get('messageId')}: {error}")
+            continue
+
+        records.append(VehicleRecord(
+            message_id=record["messageId"],
+            message_group_id=record.get("attributes", {}).get("MessageGroupId", ""),
+            vehicle_id=vehicle_id,
+        ))
+
+    return records
+
+def batch_item_failures(message_ids: Iterable[str]) -> dict:
+    """ Build the partial batch response understood by the SQS event source """
+    return {
+        "batchItemFailures": [
+            {"itemIdentifier": message_id} for message_id in message_ids
+        ]
+    }
+
+def batch_max_workers() -> int:
+    """
+    Number of message groups processed at once when a batch is handled record by record.
+    The default matches the connections the pool can open (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+    """
+    return int(os.getenv("SQS_BATCH_MAX_WORKERS", "3"))
+
+def group_records(records: List[VehicleRecord]) -> List[List[VehicleRecord]]:
+    """
+    Split the records by message group, keeping their order in each group.
+    Records without a group have no ordering to preserve and stand alone.
+    """
+    groups: Dict[str, List[VehicleRecord]] = {}
+    for record in records:
+        groups.setdefault(record.message_group_id or f"record:{record.message_id}", []).append(record)
+
+    return list(groups.values())
+
+async def process_in_bulk_async(
+        records: List[VehicleRecord],
+        handle: Callable[[List[VehicleRecord]], Awaitable[None]],
+        logger: Logger,
+        max_workers: Optional[int] = None
+    ) -> dict:
+    """
+    Handle all the records in a single awaited call.
+    If the bulk call fails, the message groups are handled concurrently, at
+    most max_workers at a time, each call opening its own session. The
+    records of a group are handled one by one in order, and once one fails
+    the following ones are not processed, preserving the FIFO order.
+    """
+    if not records:
+        return batch_item_failures([])
+
+    try:
+        await handle(records)
+        return batch_item_failures([])
+    except Exception as error:
+        logger.error(f"Batch failed, processing message groups concurrently: {error}")
+
+    workers = asyncio.Semaphore(max_workers or batch_max_workers())
+
+    async def process_group(group: List[VehicleRecord]) -> List[str]:
+        """ Handle the records of a group in order, returning the ones to retry """
+        for index, record in enumerate(group):
+            try:
+                async with workers:
+                    await handle([record])
+            except Exception as error:
+                logger.error(f"Record {record.message_id} failed: {error}")
+                return [failed.message_id for failed in group[index:]]
+
+        return []
+
+    failed = {
+        message_id
+        for group_failures in await asyncio.gather(*map(process_group, group_records(records)))
+        for message_id in group_failures
+    }
+
+    return batch_item_failures(record.message_id for record in records if record.message_id in failed)
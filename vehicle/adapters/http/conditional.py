@@ -0,0 +1,42 @@
+"""
+This module implements conditional GET with weak ETags.
+"""
+import hashlib
+import json
+from typing import Any
+
+def weak_etag(*parts: Any) -> str:
+    """
+    Build a weak ETag from the parts a response depends on.
+    """
+    digest = hashlib.sha1(json.dumps(parts, default=str).encode('utf-8')).hexdigest()
+    return f'W/"{digest}"'
+
+def is_not_modified(event: dict, etag: str) -> bool:
+    """
+    Tell whether the If-None-Match header of an API Gateway event matches the ETag,
+    using the weak comparison of RFC 9110.
+    """
+    headers = {key.lower(): value for key, value in (event.get('headers') or {}).items()}
+    if_none_match = headers.get('if-none-match')
+    if not if_none_match:
+        return False
+
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or _opaque(etag) in [_opaque(candidate) for candidate in candidates]
+
+def not_modified(etag: str) -> dict:
+    """
+    Build the 304 response of a conditional GET.
+    """
+    return {
+        'statusCode': 304,
+        'headers': {'ETag': etag},
+        'body': '',
+    }
+
+def _opaque(etag: str) -> str:
+    """
+    Strip the weak indicator of an ETag.
+    """
+    return etag[2:] if etag.startswith('W/') else etag
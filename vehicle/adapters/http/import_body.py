@@ -0,0 +1,50 @@
+"""
+This module parses the body of a vehicle import request.
+"""
+import base64
+import csv
+import io
+import json
+from typing import Any, Iterator
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+CSV_CONTENT_TYPES = ("text/csv", "application/csv")
+
+def read_body(event: dict) -> str:
+    """
+    Read the raw body of an API Gateway event.
+    """
+    body = event.get('body') or ''
+    if event.get('isBase64Encoded'):
+        body = base64.b64decode(body).decode('utf-8')
+
+    return body
+
+def content_type(event: dict) -> str:
+    """
+    Read the media type of an API Gateway event, without its parameters.
+    """
+    headers = {key.lower(): value for key, value in (event.get('headers') or {}).items()}
+    return headers.get('content-type', 'application/json').split(';')[0].strip().lower()
+
+def parse_rows(body: str, media_type: str) -> Iterator[Any]:
+    """
+    Yield the rows of a JSON array, NDJSON or CSV body.
+    NDJSON lines that are not valid JSON are yielded as is, so they are
+    reported as invalid rows instead of failing the whole import.
+    """
+    if media_type in NDJSON_CONTENT_TYPES:
+        for line in io.StringIO(body):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield line.strip()
+    elif media_type in CSV_CONTENT_TYPES:
+        yield from csv.DictReader(io.StringIO(body))
+    else:
+        rows = json.loads(body or '[]')
+        if not isinstance(rows, list):
+            raise ValueError("Request body must be a JSON array of vehicles")
+        yield from rows
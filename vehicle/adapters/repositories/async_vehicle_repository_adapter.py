@@ -0,0 +1,63 @@
+"""
+This class contains the asyncio repository for the vehicle application.
+"""
+from typing import Any, Callable, Dict, List
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from vehicle.application.ports.async_vehicle_repository import AsyncVehicleRepository
+from vehicle.application.ports.vehicle_repository import VehicleRepository
+from vehicle.adapters.repositories.vehicle_repository_adapter import VehicleRepositoryAdapter
+from vehicle.infrastructure.database.models import Vehicle
+
+class AsyncVehicleRepositoryAdapter(AsyncVehicleRepository):
+    """
+    This class runs a synchronous repository on an AsyncSession.
+    Each call goes through AsyncSession.run_sync, so the queries are the
+    ones of VehicleRepositoryAdapter while the driver awaits the database.
+    """
+    def __init__(
+            self,
+            db: AsyncSession,
+            repository_factory: Callable[[Session], VehicleRepository] = VehicleRepositoryAdapter
+        ):
+        self.db = db
+        self.repository_factory = repository_factory
+
+    async def _run(self, method: str, *args: Any) -> Any:
+        """
+        Call a method of the synchronous repository bound to the session.
+        """
+        return await self.db.run_sync(
+            lambda session: getattr(self.repository_factory(session), method)(*args)
+        )
+
+    async def get_with_sold(self, vehicle_id: int) -> Vehicle | None:
+        """
+        Get a vehicle with its sale from the database.
+        """
+        return await self._run("get_with_sold", vehicle_id)
+
+    async def get_many_with_sold(self, vehicle_ids: List[int]) -> Dict[int, Vehicle]:
+        """
+        Get many vehicles with their sales from the database, indexed by id.
+        """
+        return await self._run("get_many_with_sold", vehicle_ids)
+
+    async def confirm_sales(self, vehicle_ids: List[int]) -> List[int]:
+        """
+        Confirm the draft sales of many vehicles in the database.
+        """
+        return await self._run("confirm_sales", vehicle_ids)
+
+    async def mark_processed(self, message_ids: List[str]) -> List[str]:
+        """
+        Record queue messages as consumed.
+        """
+        return await self._run("mark_processed", message_ids)
+
+    async def revert_sales(self, vehicles: List[Vehicle]) -> None:
+        """
+        Revert the sales of many vehicles in the database.
+        """
+        await self._run("revert_sales", vehicles)
@@ -0,0 +1,224 @@
+"""
+This class contains the read-through cache for the vehicle repository.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from vehicle.application.ports.cache import Cache
+from vehicle.application.ports.vehicle_repository import VehicleRepository
+from vehicle.domain.entities.idempotency_record import IdempotencyRecord
+from vehicle.domain.entities.sales_report import SalesReportBucket
+from vehicle.domain.entities.vehicle import Vehicle as VehicleEntity
+from vehicle.domain.entities.vehicle_brand import VehicleBrand
+from vehicle.domain.entities.vehicle_search import VehicleSearch
+from vehicle.domain.entities.vehicle_sold import VehicleSold
+from vehicle.domain.entities.vehicle_summary import VehicleSummary
+from vehicle.infrastructure.database.models import Vehicle
+
+class CachedVehicleRepository(VehicleRepository):
+    """
+    This class caches vehicle lookups of another repository.
+    Every write going through it invalidates the vehicles it touches,
+    which only reaches other functions when the cache is shared.
+    """
+    def __init__(self, repository: VehicleRepository, cache: Cache):
+        self.repository = repository
+        self.cache = cache
+
+    @staticmethod
+    def key(vehicle_id: int) -> str:
+        """
+        Cache key of a vehicle.
+        """
+        return f"vehicle:{vehicle_id}"
+
+    def invalidate(self, *vehicle_ids: int) -> None:
+        """
+        Remove vehicles from the cache.
+        """
+        self.cache.delete(*[self.key(vehicle_id) for vehicle_id in vehicle_ids])
+
+    def save(self, vehicle: VehicleEntity) -> VehicleEntity:
+        """
+        Save a vehicle to the database.
+        """
+        return self.repository.save(vehicle)
+
+    def save_many(self, vehicles: List[VehicleEntity]) -> List[Optional[VehicleEntity]]:
+        """
+        Save many vehicles to the database.
+        """
+        return self.repository.save_many(vehicles)
+
+    def update(self, vehicle_id: int, vehicle: VehicleEntity) -> VehicleEntity:
+        """
+        Update a vehicle in the database and invalidate it.
+        """
+        updated_vehicle = self.repository.update(vehicle_id, vehicle)
+        self.invalidate(vehicle_id)
+
+        return updated_vehicle
+
+    def get(self, vehicle_id: int) -> VehicleEntity:
+        """
+        Get a vehicle from the cache, falling back to the repository.
+        """
+        cached_vehicle = self.cache.get(self.key(vehicle_id))
+        if cached_vehicle is not None:
+            return VehicleEntity(**cached_vehicle)
+
+        vehicle = self.repository.get(vehicle_id)
+        if vehicle is not None:
+            self.cache.set(self.key(vehicle_id), vehicle.model_dump())
+
+        return vehicle
+
+    def get_with_sold(self, vehicle_id: int) -> Vehicle | None:
+        """
+        Get a vehicle with the sold status, always from the repository.
+        """
+        return self.repository.get_with_sold(vehicle_id)
+
+    def get_many_with_sold(self, vehicle_ids: List[int]) -> Dict[int, Vehicle]:
+        """
+        Get many vehicles with the sold status, always from the repository.
+        """
+        return self.repository.get_many_with_sold(vehicle_ids)
+
+    def get_all_available(
+            self,
+            limit: int,
+            after: Optional[Tuple[float, int]] = None
+        ) -> List[VehicleSummary]:
+        """
+        Get a page of available vehicles.
+        """
+        return self.repository.get_all_available(limit, after)
+
+    def get_available_version(self) -> str:
+        """
+        Get the version of the available vehicles.
+        """
+        return self.repository.get_available_version()
+
+    def get_sold_version(self) -> str:
+        """
+        Get the version of the sold vehicles.
+        """
+        return self.repository.get_sold_version()
+
+    def get_sales_report(self) -> List[SalesReportBucket]:
+        """
+        Get the confirmed sales by status, brand and month.
+        """
+        return self.repository.get_sales_report()
+
+    def search(
+            self,
+            criteria: VehicleSearch,
+            limit: int,
+            after: Optional[Tuple[float, int]] = None
+        ) -> List[VehicleSummary]:
+        """
+        Search available vehicles.
+        """
+        return self.repository.search(criteria, limit, after)
+
+    def get_all_sold(
+            self,
+            limit: int,
+            after: Optional[Tuple[float, int]] = None
+        ) -> List[VehicleSummary]:
+        """
+        Get a page of sold vehicles.
+        """
+        return self.repository.get_all_sold(limit, after)
+
+    def initialize_sale(
+            self,
+            vehicle_id: int,
+            user_id: str,
+            payment_request: Dict[str, Any],
+            idempotency_record: Optional[IdempotencyRecord] = None
+        ) -> VehicleSold | None:
+        """
+        Initialize a sale and invalidate the vehicle.
+        """
+        sale = self.repository.initialize_sale(vehicle_id, user_id, payment_request, idempotency_record)
+        self.invalidate(vehicle_id)
+
+        return sale
+
+    def confirm_sale(self, vehicle: Vehicle) -> None:
+        """
+        Confirm a sale and invalidate the vehicle.
+        """
+        self.repository.confirm_sale(vehicle)
+        self.invalidate(vehicle.id)
+
+    def confirm_sales(self, vehicle_ids: List[int]) -> List[int]:
+        """
+        Confirm many draft sales and invalidate the vehicles.
+        """
+        confirmed = self.repository.confirm_sales(vehicle_ids)
+        self.invalidate(*vehicle_ids)
+
+        return confirmed
+
+    def mark_processed(self, message_ids: List[str]) -> List[str]:
+        """
+        Record queue messages as consumed.
+        """
+        return self.repository.mark_processed(message_ids)
+
+    def revert_sale(self, vehicle: Vehicle) -> None:
+        """
+        Revert a sale and invalidate the vehicle.
+        """
+        self.repository.revert_sale(vehicle)
+        self.invalidate(vehicle.id)
+
+    def revert_sales(self, vehicles: List[Vehicle]) -> None:
+        """
+        Revert many sales and invalidate the vehicles.
+        """
+        self.repository.revert_sales(vehicles)
+        self.invalidate(*[vehicle.id for vehicle in vehicles])
+
+    def expire_draft_sales(self, before: datetime, limit: int) -> List[int]:
+        """
+        Revert the abandoned draft sales and invalidate their vehicles.
+        """
+        expired = self.repository.expire_draft_sales(before, limit)
+        self.invalidate(*expired)
+
+        return expired
+
+    def confirm_pickup(self, vehicle: Vehicle) -> None:
+        """
+        Confirm a pickup and invalidate the vehicle.
+        """
+        self.repository.confirm_pickup(vehicle)
+        self.invalidate(vehicle.id)
+
+    def get_brand(self, brand_name: str) -> VehicleBrand | None:
+        """
+        Get a brand by its name.
+        """
+        return self.repository.get_brand(brand_name)
+
+    def create_brand(self, brand_name: str) -> VehicleBrand:
+        """
+        Create a brand in the database.
+        """
+        return self.repository.create_brand(brand_name)
+
+def invalidating(repository: VehicleRepository, cache: Optional[Cache]) -> VehicleRepository:
+    """
+    Have the writes of a repository invalidate the vehicles they touch in a
+    shared cache, or leave the repository as is without one.
+    """
+    if cache is None:
+        return repository
+
+    return CachedVehicleRepository(repository, cache)
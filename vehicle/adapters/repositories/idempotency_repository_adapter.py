@@ -0,0 +1,74 @@
+"""
+This module contains the adapter for the idempotency repository.
+"""
+import json
+from datetime import datetime
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.orm import Session
+
+from vehicle.application.ports.idempotency_repository import IdempotencyRepository
+from vehicle.domain.entities.idempotency_record import IdempotencyRecord as IdempotencyRecordEntity
+from vehicle.infrastructure.database.models import IdempotencyRecord, ProcessedMessage
+
+class IdempotencyRepositoryAdapter(IdempotencyRepository):
+    """
+    This class contains the adapter for the idempotency repository.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, user_id: str, key: str) -> IdempotencyRecordEntity | None:
+        """
+        Get the record of a key of a user by its primary key, unless it expired.
+        """
+        record = self.db.execute(
+            select(IdempotencyRecord).where(
+                IdempotencyRecord.user_id == user_id,
+                IdempotencyRecord.key == key,
+                IdempotencyRecord.expires_at > datetime.now(),
+            )
+        ).scalar()
+        if record is None:
+            return None
+
+        return IdempotencyRecordEntity(
+            user_id=record.user_id,
+            key=record.key,
+            request_hash=record.request_hash,
+            response=json.loads(record.response),
+            expires_at=record.expires_at,
+        )
+
+    def purge_expired(self, now: datetime, limit: int) -> int:
+        """
+        Delete the oldest expired records, at most limit of them, and commit.
+        The expires_at index bounds the scan to the expired records.
+        """
+        expired = select(IdempotencyRecord.user_id, IdempotencyRecord.key) \
+            .where(IdempotencyRecord.expires_at <= now) \
+            .order_by(IdempotencyRecord.expires_at) \
+            .limit(limit)
+
+        result = self.db.execute(
+            delete(IdempotencyRecord)
+            .where(tuple_(IdempotencyRecord.user_id, IdempotencyRecord.key).in_(expired))
+        )
+        self.db.commit()
+
+        return result.rowcount
+
+    def purge_processed_messages(self, before: datetime, limit: int) -> int:
+        """
+        Delete the oldest consumed messages, at most limit of them, and commit.
+        """
+        processed = select(ProcessedMessage.message_id) \
+            .where(ProcessedMessage.processed_at <= before) \
+            .order_by(ProcessedMessage.processed_at) \
+            .limit(limit)
+
+        result = self.db.execute(
+            delete(ProcessedMessage).where(ProcessedMessage.message_id.in_(processed))
+        )
+        self.db.commit()
+
+        return result.rowcount
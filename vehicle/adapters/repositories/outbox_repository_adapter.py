@@ -0,0 +1,50 @@
+"""
+This module contains the adapter for the outbox repository.
+"""
+from typing import List
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from vehicle.application.ports.outbox_repository import OutboxRepository
+from vehicle.domain.entities.outbox_message import OutboxMessage as OutboxMessageEntity
+from vehicle.infrastructure.database.models import OutboxMessage
+from vehicle.infrastructure.security.field_cipher import FieldCipher
+from vehicle.infrastructure.security.setup import outbox_cipher
+
+class OutboxRepositoryAdapter(OutboxRepository):
+    """
+    This class contains the adapter for the outbox repository.
+    """
+    def __init__(self, db: Session, cipher: FieldCipher = outbox_cipher):
+        self.db = db
+        self.cipher = cipher
+
+    def fetch_pending(self, limit: int) -> List[OutboxMessageEntity]:
+        """
+        Fetch the oldest pending messages with FOR UPDATE SKIP LOCKED,
+        so relays running at the same time never pick the same message.
+        Their secret fields are decrypted for the queue.
+        """
+        messages = self.db.query(OutboxMessage) \
+            .order_by(OutboxMessage.id) \
+            .limit(limit) \
+            .with_for_update(skip_locked=True) \
+            .all()
+
+        return [
+            OutboxMessageEntity(
+                id=message.id,
+                queue=message.queue,
+                group_id=message.group_id,
+                body=self.cipher.decrypt_fields(message.body),
+            )
+            for message in messages
+        ]
+
+    def delete_sent(self, message_ids: List[int]) -> None:
+        """
+        Delete the relayed messages with a single statement and commit.
+        """
+        if message_ids:
+            self.db.execute(delete(OutboxMessage).where(OutboxMessage.id.in_(message_ids)))
+        self.db.commit()
@@ -1,43 +1,188 @@
 """
 This class contains the repository for the vehicle application.
 """
-from typing import List
-from datetime import datetime
-from sqlalchemy.orm import Session
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple
+from datetime import date, datetime
+from sqlalchemy import Insert, Row, Select, String, and_, cast, delete, func, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Query, Session, joinedload
+from sqlalchemy.orm.exc import NoResultFound
 
+from vehicle.domain.entities.idempotency_record import IdempotencyRecord as IdempotencyRecordEntity
+from vehicle.domain.entities.outbox_message import INITIALIZE_PAYMENT_QUEUE
+from vehicle.domain.entities.sales_report import SalesReportBucket
 from vehicle.domain.entities.vehicle import Vehicle as VehicleEntity
+from vehicle.domain.entities.vehicle_search import VehicleSearch
 from vehicle.domain.entities.vehicle_sold import VehicleSold as VehicleSoldEntity
+from vehicle.domain.entities.vehicle_summary import VehicleSummary
+from vehicle.application.ports.cache import Cache
 from vehicle.application.ports.vehicle_repository import VehicleRepository
-from vehicle.infrastructure.database.models import Vehicle, VehicleBrand, VehicleSold
+from vehicle.infrastructure.cache.setup import brand_cache
+from vehicle.infrastructure.security.field_cipher import FieldCipher
+from vehicle.infrastructure.security.setup import outbox_cipher
+from vehicle.infrastructure.database.models import (
+    IdempotencyRecord,
+    OutboxMessage,
+    ProcessedMessage,
+    StatusEnum,
+    Vehicle,
+    VehicleBrand,
+    VehicleSalesReport,
+    VehicleSold,
+)
+
+# Loader strategies: every query that reads relationships declares them up front,
+# so brand and sale come back in the same round trip instead of one lazy load per row.
+WITH_BRAND = (joinedload(Vehicle.brand),)
+WITH_BRAND_AND_SALE = (joinedload(Vehicle.brand), joinedload(Vehicle.sold))
+
+# Listings select only the columns they return and build plain dicts,
+# instead of loading ORM objects and validating an entity per row.
+SUMMARY_COLUMNS = (
+    Vehicle.id,
+    VehicleBrand.name,
+    Vehicle.model,
+    Vehicle.year,
+    Vehicle.color,
+    Vehicle.price,
+)
+SUMMARY_FIELDS = ("id", "brand_name", "model", "year", "color", "price")
+SALE_SUMMARY_COLUMNS = (
+    VehicleSold.order_id,
+    VehicleSold.status,
+    VehicleSold.sold_price,
+    VehicleSold.sold_date,
+    VehicleSold.user_id,
+)
+
+# Sales counted in the sales report: drafts are not paid yet.
+REPORTED_STATUSES = (StatusEnum.awaiting_pickup, StatusEnum.sold)
+
+# Change of the sales count and revenue of each (status, brand_id, month) of the report.
+ReportDeltas = Dict[Tuple[str, int, date], Tuple[int, float]]
 
 class VehicleRepositoryAdapter(VehicleRepository):
     """
     This class contains the repository for the vehicle application.
     """
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, brands: Cache = brand_cache, cipher: FieldCipher = outbox_cipher):
         self.db = db
+        self.brands = brands
+        self.cipher = cipher
+
+    def _insert(self, model) -> Insert | None:
+        """
+        Build an INSERT supporting ON CONFLICT for the current database,
+        or None when the dialect has no such clause.
+        """
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(model)
+        if dialect == "sqlite":
+            return sqlite.insert(model)
+        return None
+
+    def _resolve_brand_id(self, brand_name: str) -> int:
+        """
+        Get the id of a brand, creating it if needed, without committing.
+        Brand ids never change, so they are cached for the container lifetime.
+        """
+        brand_id = self.brands.get(brand_name)
+        if brand_id is not None:
+            return brand_id
+
+        insert = self._insert(VehicleBrand)
+        if insert is not None:
+            brand_id = self.db.execute(
+                insert.values(name=brand_name)
+                .on_conflict_do_nothing(index_elements=[VehicleBrand.name])
+                .returning(VehicleBrand.id)
+            ).scalar()
+
+        if brand_id is None:
+            brand = self.get_brand(brand_name)
+            if brand is None:
+                brand = VehicleBrand(name=brand_name)
+                self.db.add(brand)
+                self.db.flush()
+            brand_id = brand.id
+
+        return brand_id
+
+    def _query_vehicles(self, *options) -> Query:
+        """
+        Build a vehicle query with the given loader strategy.
+        """
+        return self.db.query(Vehicle).options(*options)
+
+    def _page(
+            self,
+            query: Select,
+            limit: int,
+            after: Optional[Tuple[float, int]]
+        ) -> List[Row]:
+        """
+        Apply keyset pagination on (price, id) to a vehicle select and fetch the rows.
+        """
+        if after is not None:
+            query = query.where(tuple_(Vehicle.price, Vehicle.id) > tuple_(*after))
+
+        return self.db.execute(query.order_by(Vehicle.price, Vehicle.id).limit(limit)).all()
+
+    def _resolve_brand_ids(self, brand_names: Set[str]) -> Dict[str, int]:
+        """
+        Get the ids of many brands, creating the missing ones, without committing.
+        """
+        brand_ids = {}
+        for brand_name in brand_names:
+            brand_id = self.brands.get(brand_name)
+            if brand_id is not None:
+                brand_ids[brand_name] = brand_id
+
+        missing = brand_names - brand_ids.keys()
+        if missing:
+            brand_ids.update(self.db.execute(
+                select(VehicleBrand.name, VehicleBrand.id)
+                .where(VehicleBrand.name.in_(missing))
+            ).all())
+
+        missing = brand_names - brand_ids.keys()
+        insert = self._insert(VehicleBrand)
+        if missing and insert is not None:
+            brand_ids.update(self.db.execute(
+                insert.values([{'name': brand_name} for brand_name in missing])
+                .on_conflict_do_nothing(index_elements=[VehicleBrand.name])
+                .returning(VehicleBrand.name, VehicleBrand.id)
+            ).all())
+
+        for brand_name in brand_names - brand_ids.keys():
+            brand_ids[brand_name] = self._resolve_brand_id(brand_name)
+
+        return brand_ids
 
     def save(self, vehicle: VehicleEntity) -> VehicleEntity:
         """
         Save a vehicle to the database.
         """
-        brand = self.get_brand(vehicle.brand_name)
-        if brand is None:
-            brand = self.create_brand(vehicle.brand_name)
+        brand_id = self._resolve_brand_id(vehicle.brand_name)
 
         new_vehicle = Vehicle(
-            brand_id=brand.id,
+            brand_id=brand_id,
             model=vehicle.model,
             year=vehicle.year,
             color=vehicle.color,
             price=vehicle.price,
         )
         self.db.add(new_vehicle)
+        self.db.flush()
+        vehicle_id = new_vehicle.id
         self.db.commit()
-        self.db.refresh(new_vehicle)
+        self.brands.set(vehicle.brand_name, brand_id)
 
         return VehicleEntity(
-            id=new_vehicle.id,
+            id=vehicle_id,
             brand_name=vehicle.brand_name,
             model=vehicle.model,
             year=vehicle.year,
@@ -45,41 +190,84 @@ class VehicleRepositoryAdapter(VehicleRepository):
             price=vehicle.price,
         )
 
+    def save_many(self, vehicles: List[VehicleEntity]) -> List[Optional[VehicleEntity]]:
+        """
+        Save many vehicles with batched INSERTs and a single commit.
+        Vehicles whose model already exists are skipped and returned as None.
+        """
+        brand_ids = self._resolve_brand_ids({vehicle.brand_name for vehicle in vehicles})
+        rows = [{
+            'brand_id': brand_ids[vehicle.brand_name],
+            'model': vehicle.model,
+            'year': vehicle.year,
+            'color': vehicle.color,
+            'price': vehicle.price,
+        } for vehicle in vehicles]
+
+        insert = self._insert(Vehicle)
+        if insert is None:
+            statement = Vehicle.__table__.insert()
+        else:
+            statement = insert.on_conflict_do_nothing(index_elements=[Vehicle.model])
+        created = self.db.execute(
+            statement.returning(Vehicle.id, Vehicle.model),
+            rows
+        ).all()
+        self.db.commit()
+        for brand_name, brand_id in brand_ids.items():
+            self.brands.set(brand_name, brand_id)
+
+        vehicle_ids = {model: vehicle_id for vehicle_id, model in created}
+        saved_vehicles = []
+        for vehicle in vehicles:
+            vehicle_id = vehicle_ids.pop(vehicle.model, None)
+            saved_vehicles.append(VehicleEntity(
+                id=vehicle_id,
+                brand_name=vehicle.brand_name,
+                model=vehicle.model,
+                year=vehicle.year,
+                color=vehicle.color,
+                price=vehicle.price,
+            ) if vehicle_id is not None else None)
+
+        return saved_vehicles
+
     def update(self, vehicle_id: int, vehicle: VehicleEntity) -> VehicleEntity:
         """
         Update a vehicle in the database.
         """
-        brand = self.get_brand(vehicle.brand_name)
-        if brand is None:
-            brand = self.create_brand(vehicle.brand_name)
+        brand_id = self._resolve_brand_id(vehicle.brand_name)
 
-        self.db.query(Vehicle).filter(Vehicle.id == vehicle_id).update({
+        updated_rows = self.db.query(Vehicle).filter(Vehicle.id == vehicle_id).update({
             'model': vehicle.model,
-            'brand_id': brand.id,
+            'brand_id': brand_id,
             'year': vehicle.year,
             'color': vehicle.color,
             'price': vehicle.price
-        })
-        self.db.commit()
+        }, synchronize_session=False)
+        if updated_rows == 0:
+            self.db.rollback()
+            raise NoResultFound(f"Vehicle with ID {vehicle_id} not found")
 
-        updated_vehicle = self.db.query(
-            Vehicle
-        ).filter(Vehicle.id == vehicle_id).first()
+        self.db.commit()
+        self.brands.set(vehicle.brand_name, brand_id)
 
         return VehicleEntity(
-            id=updated_vehicle.id,
-            brand_name=updated_vehicle.brand.name,
-            model=updated_vehicle.model,
-            year=updated_vehicle.year,
-            color=updated_vehicle.color,
-            price=updated_vehicle.price
+            id=vehicle_id,
+            brand_name=vehicle.brand_name,
+            model=vehicle.model,
+            year=vehicle.year,
+            color=vehicle.color,
+            price=vehicle.price
         )
 
     def get(self, vehicle_id: int) -> VehicleEntity:
         """
         Get a vehicle by its id.
         """
-        vehicle = self.db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
+        vehicle = self._query_vehicles(*WITH_BRAND) \
+            .filter(Vehicle.id == vehicle_id) \
+            .first()
         if vehicle is None:
             raise ValueError(f'Vehicle with id {vehicle_id} not found')
 
@@ -96,100 +284,626 @@ class VehicleRepositoryAdapter(VehicleRepository):
         """
         Get a vehicle by its id with the sold status.
         """
-        vehicle = self.db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
+        vehicle = self._query_vehicles(*WITH_BRAND_AND_SALE) \
+            .filter(Vehicle.id == vehicle_id) \
+            .first()
         return vehicle
 
-    def get_all_available(self) -> List[VehicleEntity]:
+    def get_many_with_sold(self, vehicle_ids: List[int]) -> Dict[int, Vehicle]:
         """
-        Get all available vehicles from the database.
+        Get many vehicles by their ids with the sold status.
         """
-        vehicles = self.db.query(Vehicle) \
-            .filter(Vehicle.sold == None) \
-            .order_by(Vehicle.price) \
+        vehicles = self._query_vehicles(*WITH_BRAND_AND_SALE) \
+            .filter(Vehicle.id.in_(vehicle_ids)) \
             .all()
+        return {vehicle.id: vehicle for vehicle in vehicles}
 
-        vehicles_list = [VehicleEntity(
-            id=vehicle.id,
-            brand_name=vehicle.brand.name,
-            model=vehicle.model,
-            year=vehicle.year,
-            color=vehicle.color,
-            price=vehicle.price,
-            sold=None
-            ) for vehicle in vehicles]
+    def get_all_available(
+            self,
+            limit: int,
+            after: Optional[Tuple[float, int]] = None
+        ) -> List[VehicleSummary]:
+        """
+        Get a page of available vehicles from the database.
+        """
+        rows = self._page(
+            select(*SUMMARY_COLUMNS).join(Vehicle.brand).where(Vehicle.is_available),
+            limit,
+            after
+        )
 
-        return vehicles_list
+        return [dict(zip(SUMMARY_FIELDS, row), sold=None) for row in rows]
 
-    def get_all_sold(self) -> List[VehicleEntity]:
+    def get_available_version(self) -> str:
         """
-        Get all sold vehicles from the database.
+        Get the version of the available vehicles: their count and latest update.
+        Any change to the listing adds, removes or updates a row, which moves one of them.
         """
-        vehicles = self.db.query(Vehicle) \
-            .filter(Vehicle.sold != None) \
-            .order_by(Vehicle.price) \
-            .all()
+        count, updated_at = self.db.execute(
+            select(func.count(), func.max(Vehicle.updated_at)).where(Vehicle.is_available)
+        ).one()
 
-        vehicles_list = [VehicleEntity(
-            id=vehicle.id,
-            brand_name=vehicle.brand.name,
-            model=vehicle.model,
-            year=vehicle.year,
-            color=vehicle.color,
-            price=vehicle.price,
-            sold=VehicleSoldEntity(
-                order_id=vehicle.sold.order_id,
-                vehicle_id=vehicle.sold.vehicle_id,
-                status=vehicle.sold.status,
-                sold_date=vehicle.sold.sold_date.isoformat(),
-                user_id=vehicle.sold.user_id,
-                sold_price=vehicle.sold.sold_price,
-            ).model_dump() if vehicle.sold else None
-            ) for vehicle in vehicles]
+        return f"{count}:{updated_at.isoformat() if updated_at else ''}"
+
+    def get_sold_version(self) -> str:
+        """
+        Get the version of the sold vehicles: their count and the latest
+        update of a sold vehicle or of its sale.
+        """
+        count, sale_updated_at, vehicle_updated_at = self.db.execute(
+            select(func.count(), func.max(VehicleSold.updated_at), func.max(Vehicle.updated_at))
+            .select_from(VehicleSold)
+            .join(VehicleSold.vehicle)
+        ).one()
+
+        return ":".join([
+            str(count),
+            sale_updated_at.isoformat() if sale_updated_at else '',
+            vehicle_updated_at.isoformat() if vehicle_updated_at else '',
+        ])
+
+    def search(
+            self,
+            criteria: VehicleSearch,
+            limit: int,
+            after: Optional[Tuple[float, int]] = None
+        ) -> List[VehicleSummary]:
+        """
+        Search a page of available vehicles in the database.
+        The brand is matched by id through a subquery, so brand and year
+        filters are served by the (brand_id, year) index.
+        """
+        query = select(*SUMMARY_COLUMNS).join(Vehicle.brand).where(Vehicle.is_available)
 
-        return vehicles_list
+        if criteria.brand_name is not None:
+            query = query.where(Vehicle.brand_id == select(VehicleBrand.id)
+                .where(VehicleBrand.name == criteria.brand_name)
+                .scalar_subquery())
+        if criteria.model is not None:
+            query = query.where(Vehicle.model.istartswith(criteria.model, autoescape=True))
+        if criteria.year_min is not None:
+            query = query.where(Vehicle.year >= criteria.year_min)
+        if criteria.year_max is not None:
+            query = query.where(Vehicle.year <= criteria.year_max)
+        if criteria.price_min is not None:
+            query = query.where(Vehicle.price >= criteria.price_min)
+        if criteria.price_max is not None:
+            query = query.where(Vehicle.price <= criteria.price_max)
+        if criteria.color is not None:
+            query = query.where(func.lower(Vehicle.color) == criteria.color.lower())
 
-    def initialize_sale(self, vehicle: Vehicle, user_id: str) -> Vehicle:
+        return [dict(zip(SUMMARY_FIELDS, row), sold=None) for row in self._page(query, limit, after)]
+
+    def get_all_sold(
+            self,
+            limit: int,
+            after: Optional[Tuple[float, int]] = None
+        ) -> List[VehicleSummary]:
+        """
+        Get a page of sold vehicles from the database.
+        """
+        rows = self._page(
+            select(*SUMMARY_COLUMNS, *SALE_SUMMARY_COLUMNS)
+            .join(Vehicle.brand)
+            .join(Vehicle.sold),
+            limit,
+            after
+        )
+
+        summaries = []
+        for row in rows:
+            order_id, status, sold_price, sold_date, user_id = row[len(SUMMARY_FIELDS):]
+            summaries.append(dict(
+                zip(SUMMARY_FIELDS, row),
+                sold={
+                    "order_id": order_id,
+                    "vehicle_id": row[0],
+                    "status": status.value,
+                    "sold_price": sold_price,
+                    "sold_date": sold_date.isoformat() if sold_date else None,
+                    "user_id": user_id,
+                    "created_at": None,
+                    "updated_at": None,
+                },
+            ))
+
+        return summaries
+
+    def initialize_sale(
+            self,
+            vehicle_id: int,
+            user_id: str,
+            payment_request: Dict[str, Any],
+            idempotency_record: Optional[IdempotencyRecordEntity] = None
+        ) -> VehicleSoldEntity | None:
         """
         Initialize a sale in the database.
-        Marking vehicle as sold and creating a new VehicleSold object.
+        The vehicle is claimed with a compare-and-set UPDATE on is_available,
+        which row locks it so concurrent buyers wait and then find it taken,
+        and the sale is inserted with the price it returned. The unique
+        vehicle_id constraint stays as a backstop.
+        The payment request is staged in the outbox, and the idempotency record
+        saved, before the single commit.
+        Returns None when the vehicle does not exist or is not available, or
+        when a concurrent request holds the idempotency key.
+        """
+        insert = self._insert(VehicleSold)
+        if insert is None:
+            return self._initialize_sale_with_lock(vehicle_id, user_id, payment_request, idempotency_record)
+
+        price = self.db.execute(
+            update(Vehicle)
+            .where(Vehicle.id == vehicle_id, Vehicle.is_available)
+            .values(is_available=False)
+            .returning(Vehicle.price)
+        ).scalar()
+        if price is None:
+            self.db.rollback()
+            return None
+
+        sold_vehicle = self.db.execute(
+            insert.values(vehicle_id=vehicle_id, sold_price=price, user_id=user_id)
+            .on_conflict_do_nothing(index_elements=[VehicleSold.vehicle_id])
+            .returning(VehicleSold)
+        ).scalar()
+        if sold_vehicle is None:
+            self.db.rollback()
+            return None
+
+        sale = self._to_sold_entity(sold_vehicle)
+        self._stage_payment_request(sale, payment_request)
+        if not self._save_idempotency_record(idempotency_record):
+            self.db.rollback()
+            return None
+        self.db.commit()
+
+        return sale
+
+    def _initialize_sale_with_lock(
+            self,
+            vehicle_id: int,
+            user_id: str,
+            payment_request: Dict[str, Any],
+            idempotency_record: Optional[IdempotencyRecordEntity] = None
+        ) -> VehicleSoldEntity | None:
+        """
+        Initialize a sale on databases without ON CONFLICT,
+        locking the vehicle row with SELECT ... FOR UPDATE.
         """
+        vehicle = self.db.query(Vehicle) \
+            .filter(Vehicle.id == vehicle_id) \
+            .with_for_update() \
+            .first()
+        if vehicle is None or not vehicle.is_available:
+            self.db.rollback()
+            return None
+
+        vehicle.is_available = False
         sold_vehicle = VehicleSold(
             vehicle_id=vehicle.id,
             sold_price=vehicle.price,
             user_id=user_id,
         )
-
         self.db.add(sold_vehicle)
+        self.db.flush()
+        sale = self._to_sold_entity(sold_vehicle)
+        self._stage_payment_request(sale, payment_request)
+        if not self._save_idempotency_record(idempotency_record):
+            self.db.rollback()
+            return None
         self.db.commit()
-        self.db.refresh(sold_vehicle)
 
-        vehicle.sold = sold_vehicle
+        return sale
 
-        self.db.commit()
-        self.db.refresh(vehicle)
+    def _stage_payment_request(
+            self,
+            sale: VehicleSoldEntity,
+            payment_request: Dict[str, Any]
+        ) -> None:
+        """
+        Stage the initialize payment message of a sale in the outbox.
+        The access token of the buyer is encrypted until the message is relayed.
+        """
+        self.db.add(OutboxMessage(
+            queue=INITIALIZE_PAYMENT_QUEUE,
+            group_id=str(sale.vehicle_id),
+            body=json.dumps(self.cipher.encrypt_fields({
+                "vehicle_id": sale.vehicle_id,
+                "order_id": sale.order_id,
+                **payment_request,
+            })),
+        ))
 
-        return vehicle
+    def _save_idempotency_record(self, record: Optional[IdempotencyRecordEntity]) -> bool:
+        """
+        Save the response of an idempotent request, if any, with the change it answers.
+        A record that expired but was not purged yet is replaced with
+        INSERT ... ON CONFLICT DO UPDATE WHERE expires_at <= now, so the key
+        can be used again. Returns False when a live record holds the key.
+        """
+        if record is None:
+            return True
+
+        now = datetime.now()
+        values = {
+            'user_id': record.user_id,
+            'key': record.key,
+            'request_hash': record.request_hash,
+            'response': json.dumps(record.response),
+            'created_at': now,
+            'expires_at': record.expires_at,
+        }
+
+        insert = self._insert(IdempotencyRecord)
+        if insert is None:
+            return self._save_idempotency_record_with_delete(values, now)
+
+        return self.db.execute(
+            insert.values(**values)
+            .on_conflict_do_update(
+                index_elements=[IdempotencyRecord.user_id, IdempotencyRecord.key],
+                set_={
+                    'request_hash': insert.excluded.request_hash,
+                    'response': insert.excluded.response,
+                    'created_at': insert.excluded.created_at,
+                    'expires_at': insert.excluded.expires_at,
+                },
+                where=IdempotencyRecord.expires_at <= now,
+            )
+            .returning(IdempotencyRecord.key)
+        ).scalar() is not None
+
+    def _save_idempotency_record_with_delete(self, values: Dict[str, Any], now: datetime) -> bool:
+        """
+        Save an idempotency record on databases without ON CONFLICT: a live
+        record keeps the key, an expired one is deleted first, and a record
+        written concurrently is caught on flush inside a savepoint.
+        """
+        key = and_(IdempotencyRecord.user_id == values['user_id'], IdempotencyRecord.key == values['key'])
+        if self.db.execute(
+            select(IdempotencyRecord.key).where(key, IdempotencyRecord.expires_at > now)
+        ).first() is not None:
+            return False
+
+        self.db.execute(
+            delete(IdempotencyRecord)
+            .where(key, IdempotencyRecord.expires_at <= now)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            with self.db.begin_nested():
+                self.db.add(IdempotencyRecord(**values))
+        except IntegrityError:
+            return False
+
+        return True
+
+    @staticmethod
+    def _to_sold_entity(sold_vehicle: VehicleSold) -> VehicleSoldEntity:
+        """
+        Convert a VehicleSold row into its domain entity.
+        """
+        return VehicleSoldEntity(
+            order_id=sold_vehicle.order_id,
+            vehicle_id=sold_vehicle.vehicle_id,
+            status=sold_vehicle.status.value,
+            sold_price=sold_vehicle.sold_price,
+            sold_date=sold_vehicle.sold_date.isoformat() if sold_vehicle.sold_date else None,
+            user_id=sold_vehicle.user_id,
+        )
 
     def confirm_sale(self, vehicle: Vehicle) -> None:
         """
         Confirm a sale for a vehicle in the database.
         """
-        self.db.query(VehicleSold).filter(VehicleSold.vehicle_id == vehicle.id).update({
-            'status': 'awaiting_pickup',
-            'sold_price': vehicle.price,
-            'sold_date': datetime.now(),
-        })
+        self.confirm_sales([vehicle.id])
+
+    def confirm_sales(self, vehicle_ids: List[int]) -> List[int]:
+        """
+        Confirm the draft sales of many vehicles with a single compare-and-set
+        UPDATE ... WHERE status = 'draft' RETURNING, without reading them first.
+        Each sale takes the current price and brand of its vehicle. Sales that
+        are not drafts anymore, such as redelivered confirmations, are left as is.
+        """
+        if not vehicle_ids:
+            return []
+
+        confirmed_at = datetime.now()
+        if self._insert(VehicleSold) is None:
+            confirmed = self._confirm_sales_with_lock(vehicle_ids, confirmed_at)
+        else:
+            confirmed = self.db.execute(
+                update(VehicleSold)
+                .where(VehicleSold.vehicle_id.in_(vehicle_ids), VehicleSold.status == StatusEnum.draft)
+                .values(self._confirmed_sale_values(confirmed_at))
+                .returning(VehicleSold.vehicle_id, VehicleSold.sold_price, VehicleSold.brand_id)
+                .execution_options(synchronize_session=False)
+            ).all()
+
+        # Drafts are not reported, so a confirmation only adds to the report.
+        deltas: ReportDeltas = {}
+        for _, sold_price, brand_id in confirmed:
+            self._add_report_delta(deltas, StatusEnum.awaiting_pickup, brand_id, confirmed_at, 1, sold_price)
+        self._apply_report_deltas(deltas)
+        self.db.commit()
+
+        return [vehicle_id for vehicle_id, _, _ in confirmed]
+
+    def _confirm_sales_with_lock(self, vehicle_ids: List[int], confirmed_at: datetime) -> List[Tuple[int, float, int]]:
+        """
+        Confirm draft sales on databases without RETURNING, locking them with
+        SELECT ... FOR UPDATE, and return their (vehicle_id, sold_price, brand_id).
+        """
+        drafts = self.db.execute(
+            select(VehicleSold.vehicle_id, Vehicle.price, Vehicle.brand_id)
+            .join(VehicleSold.vehicle)
+            .where(VehicleSold.vehicle_id.in_(vehicle_ids), VehicleSold.status == StatusEnum.draft)
+            .with_for_update()
+        ).all()
+        if drafts:
+            self.db.execute(
+                update(VehicleSold)
+                .where(VehicleSold.vehicle_id.in_([vehicle_id for vehicle_id, _, _ in drafts]))
+                .values(self._confirmed_sale_values(confirmed_at))
+                .execution_options(synchronize_session=False)
+            )
+
+        return [tuple(draft) for draft in drafts]
+
+    @staticmethod
+    def _confirmed_sale_values(confirmed_at: datetime) -> Dict[str, Any]:
+        """
+        Values of a confirmed sale: the current price and brand of its vehicle.
+        """
+        return {
+            'status': StatusEnum.awaiting_pickup,
+            'sold_price': select(Vehicle.price)
+                .where(Vehicle.id == VehicleSold.vehicle_id)
+                .scalar_subquery(),
+            'brand_id': select(Vehicle.brand_id)
+                .where(Vehicle.id == VehicleSold.vehicle_id)
+                .scalar_subquery(),
+            'sold_date': confirmed_at,
+        }
+
+    def mark_processed(self, message_ids: List[str]) -> List[str]:
+        """
+        Record queue messages as consumed with INSERT ... ON CONFLICT DO NOTHING
+        RETURNING, which returns the ones not consumed before. It is committed
+        with the change the messages trigger.
+        """
+        if not message_ids:
+            return []
+
+        insert = self._insert(ProcessedMessage)
+        if insert is None:
+            consumed = set(self.db.execute(
+                select(ProcessedMessage.message_id).where(ProcessedMessage.message_id.in_(message_ids))
+            ).scalars())
+            new_message_ids = [message_id for message_id in dict.fromkeys(message_ids) if message_id not in consumed]
+            self.db.add_all([ProcessedMessage(message_id=message_id) for message_id in new_message_ids])
+            self.db.flush()
+
+            return new_message_ids
+
+        return list(self.db.execute(
+            insert.values([{"message_id": message_id} for message_id in dict.fromkeys(message_ids)])
+            .on_conflict_do_nothing(index_elements=[ProcessedMessage.message_id])
+            .returning(ProcessedMessage.message_id)
+        ).scalars())
+
+    def expire_draft_sales(self, before: datetime, limit: int) -> List[int]:
+        """
+        Revert the oldest draft sales initialized before the given time with a
+        single DELETE ... RETURNING over the (status, created_at) index, making
+        their vehicles available again. Drafts are not reported, so the sales
+        report is left as is. Drafts locked by a confirmation are skipped.
+        Only drafts whose payment request is still waiting in the outbox are
+        expired: once it was relayed, the payment may be captured, and the sale
+        is left for its confirmation or revert. The outbox rows are locked with
+        the drafts, so a message being relayed is skipped, and are deleted in
+        the same transaction, so no payment starts for the expired sales.
+        """
+        stale = select(VehicleSold.order_id) \
+            .join(OutboxMessage, and_(
+                OutboxMessage.queue == INITIALIZE_PAYMENT_QUEUE,
+                OutboxMessage.group_id == cast(VehicleSold.vehicle_id, String),
+            )) \
+            .where(VehicleSold.status == StatusEnum.draft, VehicleSold.created_at <= before) \
+            .order_by(VehicleSold.created_at) \
+            .limit(limit) \
+            .with_for_update(skip_locked=True)
+
+        if self._insert(VehicleSold) is None:
+            stale_ids = list(self.db.execute(stale).scalars())
+            expired = list(self.db.execute(
+                select(VehicleSold.vehicle_id).where(VehicleSold.order_id.in_(stale_ids))
+            ).scalars())
+            self.db.execute(
+                delete(VehicleSold)
+                .where(VehicleSold.order_id.in_(stale_ids))
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            expired = list(self.db.execute(
+                delete(VehicleSold)
+                .where(VehicleSold.order_id.in_(stale), VehicleSold.status == StatusEnum.draft)
+                .returning(VehicleSold.vehicle_id)
+                .execution_options(synchronize_session=False)
+            ).scalars())
+
+        if expired:
+            self.db.execute(
+                update(Vehicle)
+                .where(Vehicle.id.in_(expired))
+                .values(is_available=True)
+                .execution_options(synchronize_session=False)
+            )
+            self.db.execute(
+                delete(OutboxMessage)
+                .where(
+                    OutboxMessage.queue == INITIALIZE_PAYMENT_QUEUE,
+                    OutboxMessage.group_id.in_([str(vehicle_id) for vehicle_id in expired])
+                )
+                .execution_options(synchronize_session=False)
+            )
         self.db.commit()
 
+        return expired
+
     def confirm_pickup(self, vehicle: Vehicle) -> None:
         """
         Confirm a pickup for a vehicle in the database.
+        Only a sale still awaiting pickup once locked is changed, so a
+        concurrent pickup or revert is not counted twice in the report.
         """
-        self.db.query(VehicleSold).filter(VehicleSold.vehicle_id == vehicle.id).update({
+        sales = [
+            sale for sale in self._lock_sales([vehicle.id])
+            if sale.status == StatusEnum.awaiting_pickup
+        ]
+        if not sales:
+            self.db.rollback()
+            return
+
+        deltas: ReportDeltas = {}
+        for sale in sales:
+            self._add_report_delta(deltas, sale.status, sale.brand_id, sale.sold_date, -1, sale.sold_price)
+            self._add_report_delta(deltas, StatusEnum.sold, sale.brand_id, sale.sold_date, 1, sale.sold_price)
+
+        self.db.query(VehicleSold).filter(
+            VehicleSold.vehicle_id == vehicle.id,
+            VehicleSold.status == StatusEnum.awaiting_pickup
+        ).update({
             'status': 'sold',
         })
+        self.db.query(Vehicle).filter(Vehicle.id == vehicle.id).update({
+            'is_available': False,
+        }, synchronize_session=False)
+        self._apply_report_deltas(deltas)
         self.db.commit()
 
+    def _lock_sales(self, vehicle_ids: List[int]) -> List[Row]:
+        """
+        Read and lock the sales of the vehicles before they change, with
+        the columns of the sale and of its vehicle the report needs.
+        """
+        return self.db.execute(
+            select(
+                VehicleSold.vehicle_id,
+                VehicleSold.status,
+                VehicleSold.sold_price,
+                VehicleSold.sold_date,
+                VehicleSold.brand_id,
+                Vehicle.brand_id.label("vehicle_brand_id"),
+                Vehicle.price,
+            )
+            .join(VehicleSold.vehicle)
+            .where(VehicleSold.vehicle_id.in_(vehicle_ids))
+            .with_for_update()
+        ).all()
+
+    @staticmethod
+    def _add_report_delta(
+            deltas: ReportDeltas,
+            status: StatusEnum,
+            brand_id: Optional[int],
+            sold_date: Optional[datetime],
+            sales_count: int,
+            price: float
+        ) -> None:
+        """
+        Count a sale entering (sales_count 1) or leaving (sales_count -1) the report.
+        """
+        if status not in REPORTED_STATUSES or brand_id is None or sold_date is None:
+            return
+
+        key = (status.value, brand_id, sold_date.date().replace(day=1))
+        count, revenue = deltas.get(key, (0, 0.0))
+        deltas[key] = (count + sales_count, revenue + sales_count * price)
+
+    def _apply_report_deltas(self, deltas: ReportDeltas) -> None:
+        """
+        Add the deltas to the sales report with a single upsert.
+        """
+        rows = [
+            {
+                "status": status,
+                "brand_id": brand_id,
+                "month": month,
+                "sales_count": sales_count,
+                "revenue": revenue,
+            }
+            for (status, brand_id, month), (sales_count, revenue) in deltas.items()
+            if sales_count or revenue
+        ]
+        if not rows:
+            return
+
+        insert = self._insert(VehicleSalesReport)
+        if insert is None:
+            self._apply_report_deltas_with_lock(rows)
+            return
+
+        insert = insert.values(rows)
+        self.db.execute(insert.on_conflict_do_update(
+            index_elements=[
+                VehicleSalesReport.status,
+                VehicleSalesReport.brand_id,
+                VehicleSalesReport.month,
+            ],
+            set_={
+                "sales_count": VehicleSalesReport.sales_count + insert.excluded.sales_count,
+                "revenue": VehicleSalesReport.revenue + insert.excluded.revenue,
+                "updated_at": datetime.now(),
+            },
+        ))
+
+    def _apply_report_deltas_with_lock(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Add the deltas to the sales report on databases without ON CONFLICT,
+        locking each row with SELECT ... FOR UPDATE.
+        """
+        for row in rows:
+            report = self.db.query(VehicleSalesReport) \
+                .filter_by(status=row["status"], brand_id=row["brand_id"], month=row["month"]) \
+                .with_for_update() \
+                .first()
+            if report is None:
+                self.db.add(VehicleSalesReport(**row))
+                continue
+
+            report.sales_count += row["sales_count"]
+            report.revenue += row["revenue"]
+        self.db.flush()
+
+    def get_sales_report(self) -> List[SalesReportBucket]:
+        """
+        Get the confirmed sales by status, brand and month from the sales report.
+        """
+        rows = self.db.execute(
+            select(
+                VehicleSalesReport.status,
+                VehicleBrand.name,
+                VehicleSalesReport.month,
+                VehicleSalesReport.sales_count,
+                VehicleSalesReport.revenue,
+            )
+            .join(VehicleBrand, VehicleBrand.id == VehicleSalesReport.brand_id)
+            .where(VehicleSalesReport.sales_count > 0)
+            .order_by(VehicleSalesReport.month, VehicleSalesReport.status, VehicleBrand.name)
+        ).all()
+
+        return [
+            {
+                "status": status,
+                "brand_name": brand_name,
+                "month": month.strftime("%Y-%m"),
+                "sales_count": sales_count,
+                "revenue": revenue,
+            }
+            for status, brand_name, month, sales_count, revenue in rows
+        ]
+
     def get_brand(self, brand_name: str) -> VehicleBrand | None:
         """
         Get a brand by its name.
@@ -214,9 +928,28 @@ class VehicleRepositoryAdapter(VehicleRepository):
         """
         Revert a sale for a vehicle in the database.
         """
-        vehicle_sold = self.db.query(VehicleSold) \
-            .filter(VehicleSold.vehicle_id == vehicle.id) \
-            .first()
+        self.revert_sales([vehicle])
+
+    def revert_sales(self, vehicles: List[Vehicle]) -> None:
+        """
+        Revert the sales of many vehicles with a single DELETE,
+        making the vehicles available again in the same transaction.
+        Sales found sold once locked, picked up since they were checked,
+        are left as they are.
+        """
+        deltas: ReportDeltas = {}
+        vehicle_ids = []
+        for sale in self._lock_sales([vehicle.id for vehicle in vehicles]):
+            if sale.status == StatusEnum.sold:
+                continue
+            vehicle_ids.append(sale.vehicle_id)
+            self._add_report_delta(deltas, sale.status, sale.brand_id, sale.sold_date, -1, sale.sold_price)
 
-        self.db.delete(vehicle_sold)
+        self.db.query(VehicleSold) \
+            .filter(VehicleSold.vehicle_id.in_(vehicle_ids), VehicleSold.status != StatusEnum.sold) \
+            .delete(synchronize_session=False)
+        self.db.query(Vehicle) \
+            .filter(Vehicle.id.in_(vehicle_ids)) \
+            .update({'is_available': True}, synchronize_session=False)
+        self._apply_report_deltas(deltas)
         self.db.commit()
@@ -0,0 +1,49 @@
+"""
+This module contains the asyncio repository for the sale flows of the vehicle application.
+"""
+from abc import ABC, abstractmethod
+
+from typing import Dict, List
+from vehicle.infrastructure.database.models import Vehicle
+
+class AsyncVehicleRepository(ABC):
+    """
+    This class contains the asyncio counterpart of the sale methods of VehicleRepository.
+    """
+    @abstractmethod
+    async def get_with_sold(self, vehicle_id: int) -> Vehicle:
+        """
+        This method gets a vehicle from the database with the sold status.
+        """
+        pass
+
+    @abstractmethod
+    async def get_many_with_sold(self, vehicle_ids: List[int]) -> Dict[int, Vehicle]:
+        """
+        This method gets many vehicles from the database with the sold status,
+        indexed by their id.
+        """
+        pass
+
+    @abstractmethod
+    async def confirm_sales(self, vehicle_ids: List[int]) -> List[int]:
+        """
+        This method confirms the draft sales of many vehicles in the database
+        and returns the vehicles whose sale it confirmed.
+        """
+        pass
+
+    @abstractmethod
+    async def mark_processed(self, message_ids: List[str]) -> List[str]:
+        """
+        This method records queue messages as consumed and returns the ones
+        that were not consumed before.
+        """
+        pass
+
+    @abstractmethod
+    async def revert_sales(self, vehicles: List[Vehicle]) -> None:
+        """
+        This method reverts the sales of many vehicles in the database.
+        """
+        pass
@@ -0,0 +1,31 @@
+"""
+This module contains the cache port for the vehicle application.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+class Cache(ABC):
+    """
+    This class contains the cache used by the vehicle application.
+    Values must be JSON serializable.
+    """
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """
+        This method gets a value from the cache, or None on a miss.
+        """
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        """
+        This method stores a value in the cache.
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, *keys: str) -> None:
+        """
+        This method removes values from the cache.
+        """
+        pass
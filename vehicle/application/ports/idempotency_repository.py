@@ -0,0 +1,34 @@
+"""
+This module contains the idempotency repository port for the vehicle application.
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from vehicle.domain.entities.idempotency_record import IdempotencyRecord
+
+class IdempotencyRepository(ABC):
+    """
+    This class contains the responses of the requests sent with an Idempotency-Key.
+    Records are written by the repository of the request they answer, in its transaction.
+    """
+    @abstractmethod
+    def get(self, user_id: str, key: str) -> IdempotencyRecord | None:
+        """
+        This method gets the record of a key of a user, unless it expired.
+        """
+        pass
+
+    @abstractmethod
+    def purge_expired(self, now: datetime, limit: int) -> int:
+        """
+        This method deletes up to limit expired records and returns how many were deleted.
+        """
+        pass
+
+    @abstractmethod
+    def purge_processed_messages(self, before: datetime, limit: int) -> int:
+        """
+        This method deletes up to limit messages consumed before the given time
+        and returns how many were deleted.
+        """
+        pass
@@ -0,0 +1,21 @@
+"""
+This module contains the message queue port for the vehicle application.
+"""
+from abc import ABC, abstractmethod
+from typing import List
+
+from vehicle.domain.entities.outbox_message import OutboxMessage
+
+class MessageQueue(ABC):
+    """
+    This class contains the queue the outbox is relayed to.
+    """
+    max_batch_size: int = 10
+
+    @abstractmethod
+    def send_batch(self, queue: str, messages: List[OutboxMessage]) -> List[int]:
+        """
+        This method sends at most max_batch_size messages to a queue,
+        returning the ids of the messages that were accepted.
+        """
+        pass
@@ -0,0 +1,26 @@
+"""
+This module contains the outbox repository port for the vehicle application.
+"""
+from abc import ABC, abstractmethod
+from typing import List
+
+from vehicle.domain.entities.outbox_message import OutboxMessage
+
+class OutboxRepository(ABC):
+    """
+    This class contains the outbox of messages staged by the vehicle application.
+    """
+    @abstractmethod
+    def fetch_pending(self, limit: int) -> List[OutboxMessage]:
+        """
+        This method fetches the oldest pending messages, locking them so
+        concurrent relays skip them until delete_sent commits.
+        """
+        pass
+
+    @abstractmethod
+    def delete_sent(self, message_ids: List[int]) -> None:
+        """
+        This method removes the relayed messages and releases the locks.
+        """
+        pass
@@ -3,9 +3,15 @@ This module contains the repository for the vehicle application.
 """
 from abc import ABC, abstractmethod
 
-from typing import List
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from vehicle.domain.entities.idempotency_record import IdempotencyRecord
+from vehicle.domain.entities.sales_report import SalesReportBucket
 from vehicle.domain.entities.vehicle import Vehicle as VehicleEntity
 from vehicle.domain.entities.vehicle_brand import VehicleBrand
+from vehicle.domain.entities.vehicle_search import VehicleSearch
+from vehicle.domain.entities.vehicle_sold import VehicleSold
+from vehicle.domain.entities.vehicle_summary import VehicleSummary
 from vehicle.infrastructure.database.models import Vehicle
 
 class VehicleRepository(ABC):
@@ -19,10 +25,19 @@ class VehicleRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def save_many(self, vehicles: List[VehicleEntity]) -> List[Optional[VehicleEntity]]:
+        """
+        This method saves many vehicles to the database in a single transaction.
+        Vehicles whose model already exists are skipped and returned as None.
+        """
+        pass
+
     @abstractmethod
     def update(self, vehicle_id: int, vehicle: VehicleEntity) -> VehicleEntity:
         """
         This method updates a vehicle in the database.
+        Raises NoResultFound when the vehicle does not exist.
         """
         pass
 
@@ -41,23 +56,86 @@ class VehicleRepository(ABC):
         pass
 
     @abstractmethod
-    def get_all_available(self) -> List[VehicleEntity]:
+    def get_many_with_sold(self, vehicle_ids: List[int]) -> Dict[int, Vehicle]:
+        """
+        This method gets many vehicles from the database with the sold status,
+        indexed by their id.
+        """
+        pass
+
+    @abstractmethod
+    def get_all_available(
+            self,
+            limit: int,
+            after: Optional[Tuple[float, int]] = None
+        ) -> List[VehicleSummary]:
+        """
+        This method gets available vehicles from the database,
+        ordered by (price, id) and starting after the given position.
+        """
+        pass
+
+    @abstractmethod
+    def get_available_version(self) -> str:
+        """
+        This method gets a token that changes whenever the available vehicles
+        change, without reading them.
+        """
+        pass
+
+    @abstractmethod
+    def get_sold_version(self) -> str:
+        """
+        This method gets a token that changes whenever the sold vehicles
+        change, without reading them.
+        """
+        pass
+
+    @abstractmethod
+    def get_sales_report(self) -> List[SalesReportBucket]:
         """
-        This method gets all available vehicles from the database.
+        This method gets the confirmed sales by status, brand and month.
         """
         pass
 
     @abstractmethod
-    def get_all_sold(self) -> List[VehicleEntity]:
+    def search(
+            self,
+            criteria: VehicleSearch,
+            limit: int,
+            after: Optional[Tuple[float, int]] = None
+        ) -> List[VehicleSummary]:
         """
-        This method gets all sold vehicles from the database.
+        This method gets the available vehicles matching the criteria,
+        ordered by (price, id) and starting after the given position.
         """
         pass
 
     @abstractmethod
-    def initialize_sale(self, vehicle: Vehicle, user_id: str) -> None:
+    def get_all_sold(
+            self,
+            limit: int,
+            after: Optional[Tuple[float, int]] = None
+        ) -> List[VehicleSummary]:
         """
-        This method initializes a sale for a vehicle in the database.
+        This method gets sold vehicles from the database,
+        ordered by (price, id) and starting after the given position.
+        """
+        pass
+
+    @abstractmethod
+    def initialize_sale(
+            self,
+            vehicle_id: int,
+            user_id: str,
+            payment_request: Dict[str, Any],
+            idempotency_record: Optional[IdempotencyRecord] = None
+        ) -> VehicleSold | None:
+        """
+        This method initializes a sale for a vehicle in the database and stages
+        the payment request in the outbox, in a single transaction.
+        The idempotency record, if any, is saved in the same transaction.
+        Returns None when the vehicle does not exist or already has a sale.
         """
         pass
 
@@ -68,6 +146,22 @@ class VehicleRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def confirm_sales(self, vehicle_ids: List[int]) -> List[int]:
+        """
+        This method confirms the draft sales of many vehicles in the database
+        and returns the vehicles whose sale it confirmed.
+        """
+        pass
+
+    @abstractmethod
+    def mark_processed(self, message_ids: List[str]) -> List[str]:
+        """
+        This method records queue messages as consumed, in the transaction of
+        the change they trigger, and returns the ones not consumed before.
+        """
+        pass
+
     @abstractmethod
     def revert_sale(self, vehicle: Vehicle) -> None:
         """
@@ -75,6 +169,21 @@ class VehicleRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def revert_sales(self, vehicles: List[Vehicle]) -> None:
+        """
+        This method reverts the sales of many vehicles in the database.
+        """
+        pass
+
+    @abstractmethod
+    def expire_draft_sales(self, before: datetime, limit: int) -> List[int]:
+        """
+        This method reverts up to limit draft sales initialized before the given
+        time, making their vehicles available again, and returns the vehicles.
+        """
+        pass
+
     @abstractmethod
     def confirm_pickup(self, vehicle: Vehicle) -> None:
         """
@@ -0,0 +1,57 @@
+""" This module contains the asyncio service for the sale flows of the vehicle application """
+from typing import Dict, List, Optional
+
+from vehicle.application.ports.async_vehicle_repository import AsyncVehicleRepository
+from vehicle.application.services.vehicle_service import VehicleService
+from vehicle.exceptions.custom_exception import CustomException
+
+class AsyncVehicleService:
+    """
+    This class contains the asyncio variants of the sale methods of VehicleService.
+    The rules are the ones of VehicleService; only the repository calls are awaited.
+    """
+    def __init__(self, vehicle_repository: AsyncVehicleRepository):
+        self.vehicle_repository = vehicle_repository
+
+    async def confirm_sales(
+            self,
+            vehicle_ids: List[int],
+            message_ids: Optional[List[str]] = None
+        ) -> Dict[int, CustomException]:
+        """
+        Confirm the draft sales of many Vehicles at once, without reading them first.
+        With the ids of the messages that asked for each confirmation, messages
+        consumed before are skipped.
+        Returns the vehicles whose sale could not be confirmed, with the reason.
+        """
+        if message_ids is not None:
+            vehicle_ids = VehicleService._unprocessed(
+                vehicle_ids,
+                message_ids,
+                await self.vehicle_repository.mark_processed(message_ids)
+            )
+        if not vehicle_ids:
+            return {}
+
+        confirmed = set(await self.vehicle_repository.confirm_sales(vehicle_ids))
+        unconfirmed = [vehicle_id for vehicle_id in vehicle_ids if vehicle_id not in confirmed]
+        if not unconfirmed:
+            return {}
+
+        return VehicleService._unconfirmed_reasons(
+            unconfirmed,
+            await self.vehicle_repository.get_many_with_sold(unconfirmed)
+        )
+
+    async def revert_sales(self, vehicle_ids: List[int]) -> Dict[int, CustomException]:
+        """
+        Revert the sales of many Vehicles at once.
+        Returns the vehicles whose sale could not be reverted, with the reason.
+        """
+        vehicles = await self.vehicle_repository.get_many_with_sold(vehicle_ids)
+        revertible, rejected = VehicleService._partition(vehicle_ids, vehicles)
+
+        if revertible:
+            await self.vehicle_repository.revert_sales(revertible)
+
+        return rejected
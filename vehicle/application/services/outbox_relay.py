@@ -0,0 +1,87 @@
+""" This module contains the relay from the outbox to the message queue """
+from itertools import groupby
+from typing import Iterator, List
+
+from vehicle.application.ports.message_queue import MessageQueue
+from vehicle.application.ports.outbox_repository import OutboxRepository
+from vehicle.domain.entities.outbox_message import OutboxMessage
+
+class OutboxRelay:
+    """ This class relays the messages staged in the outbox """
+    def __init__(
+            self,
+            outbox_repository: OutboxRepository,
+            message_queue: MessageQueue,
+            batch_size: int = 100
+        ):
+        self.outbox_repository = outbox_repository
+        self.message_queue = message_queue
+        self.batch_size = batch_size
+
+    def relay(self, max_batches: int = 10) -> int:
+        """ Relay pending messages until the outbox is drained, returning how many were sent """
+        relayed = 0
+
+        for _ in range(max_batches):
+            messages = self.outbox_repository.fetch_pending(self.batch_size)
+            relayed += self._relay_batch(messages)
+
+            if len(messages) < self.batch_size:
+                break
+
+        return relayed
+
+    def _relay_batch(self, messages: List[OutboxMessage]) -> int:
+        """
+        Send the messages in queue batches and delete the ones that were accepted.
+        Once a message is refused, the rest of its group waits for the next run
+        so FIFO order is kept.
+        """
+        sent_ids: List[int] = []
+        failed_groups = set()
+
+        try:
+            for queue, queue_messages in groupby(
+                    sorted(messages, key=lambda message: message.queue),
+                    key=lambda message: message.queue
+                ):
+                for batch in self._batches(list(queue_messages)):
+                    batch = [
+                        message for message in batch
+                        if message.group_id not in failed_groups
+                    ]
+                    if not batch:
+                        continue
+
+                    accepted = set(self.message_queue.send_batch(queue, batch))
+
+                    for message in batch:
+                        if message.id in accepted:
+                            sent_ids.append(message.id)
+                        else:
+                            failed_groups.add(message.group_id)
+        finally:
+            self.outbox_repository.delete_sent(sent_ids)
+
+        return len(sent_ids)
+
+    def _batches(self, messages: List[OutboxMessage]) -> Iterator[List[OutboxMessage]]:
+        """
+        Split messages into batches holding at most one message per group,
+        so a refused message never has a later message of its group sent with it.
+        """
+        pending = messages
+        while pending:
+            batch: List[OutboxMessage] = []
+            deferred: List[OutboxMessage] = []
+            seen = set()
+
+            for message in pending:
+                if len(batch) < self.message_queue.max_batch_size and message.group_id not in seen:
+                    batch.append(message)
+                else:
+                    deferred.append(message)
+                seen.add(message.group_id)
+
+            yield batch
+            pending = deferred
@@ -0,0 +1,66 @@
+""" This module contains the keyset pagination helpers """
+import base64
+import binascii
+import json
+from typing import List, Optional, Tuple
+
+from vehicle.domain.entities.vehicle_page import VehiclePage
+from vehicle.domain.entities.vehicle_summary import VehicleSummary
+from vehicle.exceptions.vehicle_exceptions import InvalidPaginationError
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+def parse_limit(limit: Optional[str]) -> int:
+    """ Parse the page size received from the client """
+    if limit is None or limit == "":
+        return DEFAULT_PAGE_SIZE
+
+    try:
+        value = int(limit)
+    except (TypeError, ValueError) as error:
+        raise InvalidPaginationError(
+            message="limit must be an integer",
+            status_code=400,
+        ) from error
+
+    if not 1 <= value <= MAX_PAGE_SIZE:
+        raise InvalidPaginationError(
+            message=f"limit must be between 1 and {MAX_PAGE_SIZE}",
+            status_code=400,
+        )
+
+    return value
+
+def encode_cursor(price: float, vehicle_id: int) -> str:
+    """ Encode the (price, id) position of a vehicle as an opaque cursor """
+    payload = json.dumps([price, vehicle_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[float, int]]:
+    """ Decode a cursor created by encode_cursor """
+    if not cursor:
+        return None
+
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        price, vehicle_id = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        return float(price), int(vehicle_id)
+    except (binascii.Error, ValueError, TypeError) as error:
+        raise InvalidPaginationError(
+            message="cursor is invalid",
+            status_code=400,
+        ) from error
+
+def build_page(vehicles: List[VehicleSummary], limit: int) -> VehiclePage:
+    """
+    Build a page from up to limit + 1 vehicles.
+    The extra vehicle only tells whether a next page exists.
+    """
+    page = vehicles[:limit]
+    next_cursor = None
+    if len(vehicles) > limit:
+        last = page[-1]
+        next_cursor = encode_cursor(last["price"], last["id"])
+
+    return VehiclePage.model_construct(vehicles=page, next_cursor=next_cursor)
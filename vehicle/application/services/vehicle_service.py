@@ -1,28 +1,45 @@
 """ This module contains the service for the vehicle application """
-from typing import List
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import hashlib
 import json
 import uuid
-import os
-import boto3
 
+from pydantic import ValidationError
 from sqlalchemy.orm.exc import NoResultFound
 
+from vehicle.domain.entities.idempotency_record import IDEMPOTENCY_TTL, IdempotencyRecord
+from vehicle.domain.entities.sales_report import SalesReport, SalesReportBucket, SalesReportLine
 from vehicle.domain.entities.vehicle import Vehicle
+from vehicle.domain.entities.vehicle_import_result import VehicleImportResult
+from vehicle.domain.entities.vehicle_page import VehiclePage
+from vehicle.domain.entities.vehicle_search import VehicleSearch
+from vehicle.application.ports.idempotency_repository import IdempotencyRepository
 from vehicle.application.ports.vehicle_repository import VehicleRepository
+from vehicle.application.services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    build_page,
+    decode_cursor,
+)
+from vehicle.exceptions.custom_exception import CustomException
 from vehicle.exceptions.vehicle_exceptions import (
+    IdempotencyKeyReusedError,
     VehicleAlreadyPickedUpError,
     VehicleAlreadySoldError,
+    VehicleNotFoundError,
     VehicleSaleNotInitializedError
 )
-from vehicle.infrastructure.database.models import StatusEnum
-
-sqs = boto3.client("sqs", region_name="us-east-1")
-initialize_payment_queue_url = os.getenv("INITIALIZE_PAYMENT_QUEUE_URL")
+from vehicle.infrastructure.database.models import StatusEnum, Vehicle as VehicleModel
 
 class VehicleService:
     """ This class contains the service for the vehicle application """
-    def __init__(self, vehicle_repository: VehicleRepository):
+    def __init__(
+            self,
+            vehicle_repository: VehicleRepository,
+            idempotency_repository: Optional[IdempotencyRepository] = None
+        ):
         self.vehicle_repository = vehicle_repository
+        self.idempotency_repository = idempotency_repository
 
     def register_vehicle(self, vehicle_data: dict) -> Vehicle:
         """ Register a new Vehicle """
@@ -32,12 +49,52 @@ class VehicleService:
 
         return vehicle
 
+    def import_vehicles(
+            self,
+            rows: Iterable[Any],
+            chunk_size: int = 500
+        ) -> List[VehicleImportResult]:
+        """ Validate and register many Vehicles, saving them in chunks """
+        results = []
+        chunk = []
+        for row_number, row in enumerate(rows):
+            try:
+                chunk.append((row_number, Vehicle.model_validate(row)))
+            except ValidationError as error:
+                results.append(VehicleImportResult(
+                    row=row_number,
+                    status="invalid",
+                    errors=error.errors(include_url=False, include_input=False),
+                ))
+                continue
+
+            if len(chunk) >= chunk_size:
+                results.extend(self._import_chunk(chunk))
+                chunk = []
+
+        if chunk:
+            results.extend(self._import_chunk(chunk))
+
+        return sorted(results, key=lambda result: result.row)
+
+    def _import_chunk(
+            self,
+            chunk: List[Tuple[int, Vehicle]]
+        ) -> List[VehicleImportResult]:
+        """ Save a chunk of validated Vehicles """
+        saved_vehicles = self.vehicle_repository.save_many(
+            [vehicle for _, vehicle in chunk]
+        )
+
+        return [
+            VehicleImportResult(row=row_number, status="created", vehicle_id=vehicle.id)
+            if vehicle is not None
+            else VehicleImportResult(row=row_number, status="duplicate")
+            for (row_number, _), vehicle in zip(chunk, saved_vehicles)
+        ]
+
     def update_vehicle(self, vehicle_id: int, vehicle_data: dict) -> Vehicle:
         """ Update a Vehicle """
-        vehicle = self.vehicle_repository.get(vehicle_id)
-        if vehicle is None:
-            raise NoResultFound(f"Vehicle with ID {vehicle_id} not found")
-
         vehicle = Vehicle(**vehicle_data)
         vehicle = self.vehicle_repository.update(vehicle_id, vehicle)
 
@@ -51,55 +108,227 @@ class VehicleService:
 
         return vehicle
 
-    def get_all_available(self) -> List[Vehicle]:
-        """ Get all available Vehicles """
-        return self.vehicle_repository.get_all_available()
+    def get_all_available(
+            self,
+            limit: int = DEFAULT_PAGE_SIZE,
+            cursor: Optional[str] = None
+        ) -> VehiclePage:
+        """ Get a page of available Vehicles """
+        vehicles = self.vehicle_repository.get_all_available(
+            limit + 1,
+            decode_cursor(cursor)
+        )
+
+        return build_page(vehicles, limit)
 
-    def get_all_sold(self) -> List[Vehicle]:
-        """ Get all sold Vehicles """
-        return self.vehicle_repository.get_all_sold()
+    def get_available_version(self) -> str:
+        """ Get a token that changes whenever the available Vehicles change """
+        return self.vehicle_repository.get_available_version()
+
+    def get_sold_version(self) -> str:
+        """ Get a token that changes whenever the sold Vehicles change """
+        return self.vehicle_repository.get_sold_version()
+
+    def search(
+            self,
+            criteria: VehicleSearch,
+            limit: int = DEFAULT_PAGE_SIZE,
+            cursor: Optional[str] = None
+        ) -> VehiclePage:
+        """ Get a page of available Vehicles matching the criteria """
+        vehicles = self.vehicle_repository.search(
+            criteria,
+            limit + 1,
+            decode_cursor(cursor)
+        )
+
+        return build_page(vehicles, limit)
+
+    def get_all_sold(
+            self,
+            limit: int = DEFAULT_PAGE_SIZE,
+            cursor: Optional[str] = None
+        ) -> VehiclePage:
+        """ Get a page of sold Vehicles """
+        vehicles = self.vehicle_repository.get_all_sold(
+            limit + 1,
+            decode_cursor(cursor)
+        )
+
+        return build_page(vehicles, limit)
+
+    def get_sales_report(self) -> SalesReport:
+        """ Get the confirmed sales with their totals by status, brand and month """
+        buckets = self.vehicle_repository.get_sales_report()
+
+        return SalesReport(
+            sales_count=sum(bucket["sales_count"] for bucket in buckets),
+            revenue=sum(bucket["revenue"] for bucket in buckets),
+            by_status=self._rollup(buckets, "status"),
+            by_brand=self._rollup(buckets, "brand_name"),
+            by_month=self._rollup(buckets, "month"),
+        )
+
+    @staticmethod
+    def _rollup(buckets: List[SalesReportBucket], field: str) -> List[SalesReportLine]:
+        """ Sum the sales of the report buckets sharing the same value of a field """
+        totals: Dict[str, Tuple[int, float]] = {}
+        for bucket in buckets:
+            sales_count, revenue = totals.get(bucket[field], (0, 0.0))
+            totals[bucket[field]] = (sales_count + bucket["sales_count"], revenue + bucket["revenue"])
+
+        return [
+            SalesReportLine(key=key, sales_count=sales_count, revenue=revenue)
+            for key, (sales_count, revenue) in sorted(totals.items())
+        ]
 
     def initialize_sale(
             self,
             vehicle_id: int,
             user_id: str,
-            access_token: str
+            access_token: str,
+            idempotency_key: Optional[str] = None
         ) -> str:
-        """ Initialize a sale for a Vehicle """
-        vehicle = self.vehicle_repository.get_with_sold(vehicle_id)
+        """
+        Initialize a sale for a Vehicle.
+        The payment request is staged in the outbox with the sale and relayed
+        to the payment queue by the outbox relay.
+        With an idempotency key, retries of the request replay the first response
+        without touching the sale, for IDEMPOTENCY_TTL.
+        """
+        payment_request = self._payment_request(access_token)
+        record = None
+        if idempotency_key is not None:
+            record = IdempotencyRecord(
+                user_id=user_id,
+                key=idempotency_key,
+                request_hash=self._request_hash("initialize_sale", vehicle_id),
+                response={"idempotency_key": payment_request["idempotency_key"]},
+                expires_at=datetime.now() + IDEMPOTENCY_TTL,
+            )
+            replayed = self._replay(record)
+            if replayed is not None:
+                return replayed["idempotency_key"]
 
-        if vehicle.sold is not None:
-            raise VehicleAlreadySoldError(
-                message="Vehicle already sold",
-                status_code=409,
+        sale = self.vehicle_repository.initialize_sale(vehicle_id, user_id, payment_request, record)
+
+        if sale is None:
+            # A concurrent retry with the same key may have won the sale.
+            replayed = self._replay(record) if record is not None else None
+            if replayed is not None:
+                return replayed["idempotency_key"]
+
+            raise self._sale_rejection(self.vehicle_repository.get_with_sold(vehicle_id))
+
+        return payment_request["idempotency_key"]
+
+    def _replay(self, record: IdempotencyRecord) -> Optional[Dict[str, Any]]:
+        """ Get the response of an earlier request sent with the key of the record """
+        earlier = self.idempotency_repository.get(record.user_id, record.key)
+        if earlier is None:
+            return None
+
+        if earlier.request_hash != record.request_hash:
+            raise IdempotencyKeyReusedError(
+                message="Idempotency-Key already used for another request",
+                status_code=422,
             )
 
-        updated_vehicle = self.vehicle_repository.initialize_sale(vehicle, user_id)
-        idempotency_key = str(uuid.uuid4())
-
-        sqs.send_message(
-            QueueUrl=initialize_payment_queue_url,
-            MessageBody=json.dumps({
-                "vehicle_id": updated_vehicle.id,
-                "order_id": updated_vehicle.sold.order_id,
-                "idempotency_key": idempotency_key,
-                "access_token": access_token,
-            }),
-            MessageGroupId=str(updated_vehicle.id)
-        )
+        return earlier.response
+
+    @staticmethod
+    def _request_hash(operation: str, *arguments: Any) -> str:
+        """ Hash what identifies a request, so a key cannot be reused for another one """
+        request = json.dumps([operation, *[str(argument) for argument in arguments]])
 
-        return idempotency_key
+        return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _payment_request(access_token: str) -> Dict[str, Any]:
+        """ Build the payment request of a new sale, with a fresh idempotency key """
+        return {
+            "idempotency_key": str(uuid.uuid4()),
+            "access_token": access_token,
+        }
+
+    @staticmethod
+    def _sale_rejection(vehicle: Optional[VehicleModel]) -> CustomException:
+        """ Explain why a sale could not be initialized for a Vehicle """
+        if vehicle is None:
+            return VehicleNotFoundError(
+                message="Vehicle not found",
+                status_code=404,
+            )
+
+        return VehicleAlreadySoldError(
+            message="Vehicle already sold",
+            status_code=409,
+        )
 
     def confirm_sale(self, vehicle_id: int) -> None:
         """ Confirm a sale for a Vehicle """
-        vehicle = self.vehicle_repository.get_with_sold(vehicle_id)
+        rejected = self.confirm_sales([vehicle_id])
 
-        print(vehicle.sold.status == StatusEnum.sold)
+        if vehicle_id in rejected:
+            raise rejected[vehicle_id]
 
-        if vehicle.sold.status == StatusEnum.sold:
-            raise ValueError("Vehicle already sold")
+    def confirm_sales(
+            self,
+            vehicle_ids: List[int],
+            message_ids: Optional[List[str]] = None
+        ) -> Dict[int, CustomException]:
+        """
+        Confirm the draft sales of many Vehicles at once, without reading them first.
+        With the ids of the messages that asked for each confirmation, messages
+        consumed before are skipped.
+        Returns the vehicles whose sale could not be confirmed, with the reason.
+        """
+        if message_ids is not None:
+            vehicle_ids = self._unprocessed(
+                vehicle_ids,
+                message_ids,
+                self.vehicle_repository.mark_processed(message_ids)
+            )
+        if not vehicle_ids:
+            return {}
 
-        self.vehicle_repository.confirm_sale(vehicle)
+        confirmed = set(self.vehicle_repository.confirm_sales(vehicle_ids))
+        unconfirmed = [vehicle_id for vehicle_id in vehicle_ids if vehicle_id not in confirmed]
+        if not unconfirmed:
+            return {}
+
+        return self._unconfirmed_reasons(
+            unconfirmed,
+            self.vehicle_repository.get_many_with_sold(unconfirmed)
+        )
+
+    @staticmethod
+    def _unprocessed(
+            vehicle_ids: List[int],
+            message_ids: List[str],
+            new_message_ids: List[str]
+        ) -> List[int]:
+        """ Keep the Vehicles whose message was not consumed before """
+        new_message_ids = set(new_message_ids)
+
+        return [
+            vehicle_id
+            for vehicle_id, message_id in zip(vehicle_ids, message_ids)
+            if message_id in new_message_ids
+        ]
+
+    @staticmethod
+    def _unconfirmed_reasons(
+            vehicle_ids: List[int],
+            vehicles: Dict[int, VehicleModel]
+        ) -> Dict[int, CustomException]:
+        """
+        Explain why the sales of Vehicles were not confirmed.
+        Sales already awaiting pickup were confirmed before and are not rejected.
+        """
+        _, rejected = VehicleService._partition(vehicle_ids, vehicles)
+
+        return rejected
 
     def confirm_pickup(self, vehicle_id: int) -> None:
         """ Confirm a pickup for a Vehicle """
@@ -122,6 +351,55 @@ class VehicleService:
     def revert_sale(self, vehicle_id: int) -> None:
         """ Revert a sale for a Vehicle """
         vehicle = self.vehicle_repository.get_with_sold(vehicle_id)
+        self._check_sale_open(vehicle)
+
+        self.vehicle_repository.revert_sale(vehicle)
+
+    def revert_sales(self, vehicle_ids: List[int]) -> Dict[int, CustomException]:
+        """
+        Revert the sales of many Vehicles at once.
+        Returns the vehicles whose sale could not be reverted, with the reason.
+        """
+        vehicles = self.vehicle_repository.get_many_with_sold(vehicle_ids)
+        revertible, rejected = self._partition(vehicle_ids, vehicles)
+
+        if revertible:
+            self.vehicle_repository.revert_sales(revertible)
+
+        return rejected
+
+    def expire_draft_sales(self, before: datetime, limit: int) -> List[int]:
+        """
+        Revert up to limit sales left in draft since before the given time,
+        as their payment never completed. Returns the reclaimed vehicles.
+        """
+        return self.vehicle_repository.expire_draft_sales(before, limit)
+
+    @staticmethod
+    def _partition(
+            vehicle_ids: List[int],
+            vehicles: Dict[int, VehicleModel]
+        ) -> Tuple[List[VehicleModel], Dict[int, CustomException]]:
+        """ Split the vehicles between the ones with an open sale and the rejected ones """
+        accepted = []
+        rejected = {}
+        for vehicle_id in dict.fromkeys(vehicle_ids):
+            try:
+                VehicleService._check_sale_open(vehicles.get(vehicle_id))
+                accepted.append(vehicles[vehicle_id])
+            except CustomException as error:
+                rejected[vehicle_id] = error
+
+        return accepted, rejected
+
+    @staticmethod
+    def _check_sale_open(vehicle: Optional[VehicleModel]) -> None:
+        """ Check that a Vehicle has a sale that was not picked up yet """
+        if vehicle is None:
+            raise VehicleNotFoundError(
+                message="Vehicle not found",
+                status_code=404,
+            )
 
         if vehicle.sold is None:
             raise VehicleSaleNotInitializedError(
@@ -134,5 +412,3 @@ class VehicleService:
                 message="Vehicle already sold",
                 status_code=409,
             )
-
-        self.vehicle_repository.revert_sale(vehicle)
@@ -0,0 +1,22 @@
+"""
+This module contains the domain model for the response of an idempotent request.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict
+from pydantic import BaseModel, Field
+
+# How long a response is replayed for retries of the same request.
+IDEMPOTENCY_TTL = timedelta(hours=24)
+
+# How long consumed message ids are kept, well past the 300 seconds the sale queues retain a message.
+PROCESSED_MESSAGE_TTL = timedelta(hours=1)
+
+class IdempotencyRecord(BaseModel):
+    """
+    This class contains the response of a request sent with an Idempotency-Key.
+    """
+    user_id: str = Field(..., description="User that sent the request")
+    key: str = Field(..., min_length=1, max_length=255, description="Idempotency-Key chosen by the client")
+    request_hash: str = Field(..., description="Hash of the request the key was first used for")
+    response: Dict[str, Any] = Field(..., description="Response replayed on retries")
+    expires_at: datetime = Field(..., description="When the response stops being replayed")
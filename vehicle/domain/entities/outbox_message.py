@@ -0,0 +1,16 @@
+"""
+This module contains the domain model for a message staged in the outbox.
+"""
+from typing import Optional
+from pydantic import BaseModel, Field
+
+INITIALIZE_PAYMENT_QUEUE = "initialize_payment"
+
+class OutboxMessage(BaseModel):
+    """
+    This class contains a message waiting to be relayed to a queue.
+    """
+    id: Optional[int] = Field(default=None, description="Outbox message id")
+    queue: str = Field(..., description="Name of the destination queue")
+    group_id: str = Field(..., description="FIFO message group id")
+    body: str = Field(..., description="Message body")
@@ -0,0 +1,35 @@
+"""
+This module contains the read models of the sales report.
+"""
+from typing import List
+from pydantic import BaseModel, Field
+# pydantic needs the typing_extensions TypedDict before Python 3.12.
+from typing_extensions import TypedDict
+
+class SalesReportBucket(TypedDict):
+    """
+    This class contains the confirmed sales of a brand in a month, by status.
+    """
+    status: str
+    brand_name: str
+    month: str
+    sales_count: int
+    revenue: float
+
+class SalesReportLine(BaseModel):
+    """
+    This class contains the sales of a status, a brand or a month.
+    """
+    key: str = Field(..., description="Status, brand name or month (YYYY-MM)")
+    sales_count: int = Field(..., description="Number of sales")
+    revenue: float = Field(..., description="Sum of the sold prices")
+
+class SalesReport(BaseModel):
+    """
+    This class contains the confirmed sales and their breakdowns.
+    """
+    sales_count: int = Field(default=0, description="Number of sales")
+    revenue: float = Field(default=0, description="Sum of the sold prices")
+    by_status: List[SalesReportLine] = Field(default_factory=list, description="Sales by status")
+    by_brand: List[SalesReportLine] = Field(default_factory=list, description="Sales by brand")
+    by_month: List[SalesReportLine] = Field(default_factory=list, description="Sales by month")
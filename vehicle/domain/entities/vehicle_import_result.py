@@ -0,0 +1,14 @@
+"""
+This module contains the domain model for the result of a vehicle import row.
+"""
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
+
+class VehicleImportResult(BaseModel):
+    """
+    This class contains the outcome of one imported row.
+    """
+    row: int = Field(..., description="Position of the row in the request body")
+    status: Literal["created", "duplicate", "invalid"] = Field(..., description="Outcome")
+    vehicle_id: Optional[int] = Field(default=None, description="Created vehicle ID")
+    errors: Optional[List[dict]] = Field(default=None, description="Validation errors")
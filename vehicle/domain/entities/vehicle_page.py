@@ -0,0 +1,16 @@
+"""
+This module contains the domain model for a page of vehicles.
+"""
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+from vehicle.domain.entities.vehicle_summary import VehicleSummary
+
+class VehiclePage(BaseModel):
+    """
+    This class contains a page of vehicles and the cursor to the next one.
+    Pages are built with model_construct from database rows and serialized
+    with model_dump_json, skipping validation of every row.
+    """
+    vehicles: List[VehicleSummary] = Field(default_factory=list, description="Vehicles in the page")
+    next_cursor: Optional[str] = Field(default=None, description="Cursor of the next page")
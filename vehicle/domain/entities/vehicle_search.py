@@ -0,0 +1,32 @@
+"""
+This module contains the domain model for a vehicle search.
+"""
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+class VehicleSearch(BaseModel):
+    """
+    This class contains the criteria of a search over available vehicles.
+    Every criterion is optional and they are combined with AND.
+    """
+    model_config = ConfigDict(extra="forbid")
+
+    brand_name: Optional[str] = Field(default=None, min_length=1, max_length=100, description="Brand Name")
+    model: Optional[str] = Field(default=None, min_length=1, max_length=100, description="Model prefix")
+    year_min: Optional[int] = Field(default=None, ge=1886, description="Minimum year")
+    year_max: Optional[int] = Field(default=None, ge=1886, description="Maximum year")
+    price_min: Optional[float] = Field(default=None, ge=0, description="Minimum price")
+    price_max: Optional[float] = Field(default=None, ge=0, description="Maximum price")
+    color: Optional[str] = Field(default=None, min_length=1, max_length=50, description="Color")
+
+    @model_validator(mode="after")
+    def check_ranges(self) -> "VehicleSearch":
+        """
+        Reject ranges whose minimum is above their maximum.
+        """
+        if self.year_min is not None and self.year_max is not None and self.year_min > self.year_max:
+            raise ValueError("year_min must not be greater than year_max")
+        if self.price_min is not None and self.price_max is not None and self.price_min > self.price_max:
+            raise ValueError("price_min must not be greater than price_max")
+
+        return self
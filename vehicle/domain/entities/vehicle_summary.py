@@ -0,0 +1,33 @@
+"""
+This module contains the read models of the vehicle listings.
+"""
+from typing import Optional
+# pydantic needs the typing_extensions TypedDict before Python 3.12.
+from typing_extensions import TypedDict
+
+class VehicleSaleSummary(TypedDict):
+    """
+    This class contains the sale of a vehicle in a listing.
+    """
+    order_id: int
+    vehicle_id: int
+    status: str
+    sold_price: float
+    sold_date: Optional[str]
+    user_id: str
+    created_at: Optional[str]
+    updated_at: Optional[str]
+
+class VehicleSummary(TypedDict):
+    """
+    This class contains a vehicle in a listing.
+    Listings are plain dicts built from selected columns, so no model is
+    validated per row; pydantic-core only serializes them.
+    """
+    id: int
+    brand_name: str
+    model: str
+    year: int
+    color: str
+    price: float
+    sold: Optional[VehicleSaleSummary]
@@ -0,0 +1,99 @@
+"""Map exceptions to the responses and logs of the controllers."""
+from functools import lru_cache
+import json
+from typing import Any, Callable, Dict, NamedTuple, Type
+from pydantic import ValidationError
+from vehicle.exceptions.custom_exception import CustomException
+from vehicle.exceptions.vehicle_exceptions import (
+    CustomDatabaseException,
+    CustomNotFoundException,
+    IdempotencyKeyReusedError,
+    InvalidPaginationError,
+    InvalidVehicleIDError,
+    MultipleResultsFoundError,
+    VehicleAlreadyExistsError,
+    VehicleAlreadySoldError,
+    VehicleNotFoundError,
+    VehicleSaleNotInitializedError,
+    VehicleAlreadyPickedUpError,
+)
+
+class ErrorMapping(NamedTuple):
+    """How an exception is answered by HTTP handlers and logged by event handlers."""
+    label: str
+    response: Callable[[Exception], Dict[str, Any]]
+    detail: Callable[[Exception], Any] = str
+
+_MAPPINGS: Dict[Type[Exception], ErrorMapping] = {}
+
+@lru_cache(maxsize=256)
+def error_body(message: str, error: str) -> str:
+    """Serialize the body of an error once per message, as most are constants."""
+    return json.dumps({'message': message, 'error': error})
+
+def custom_response(error: CustomException) -> Dict[str, Any]:
+    """Response carrying the status code and message of a CustomException."""
+    return {'statusCode': error.status_code, 'body': error_body(error.message, str(error))}
+
+def bad_request(message: str) -> Callable[[Exception], Dict[str, Any]]:
+    """Build the 400 response of an exception carrying no status code."""
+    def response(error: Exception) -> Dict[str, Any]:
+        return {'statusCode': 400, 'body': error_body(message, str(error))}
+    return response
+
+def validation_response(error: ValidationError) -> Dict[str, Any]:
+    """400 response listing the validation errors."""
+    return {
+        'statusCode': 400,
+        'body': json.dumps({
+            'message': 'Validation error',
+            'errors': error.errors(include_url=False)
+        })
+    }
+
+INTERNAL_ERROR_BODY = json.dumps({'message': 'An error occurred'})
+
+def internal_error_response(error: Exception) -> Dict[str, Any]:
+    """500 response that does not leak the unexpected error."""
+    return {'statusCode': 500, 'body': INTERNAL_ERROR_BODY}
+
+def register_error(
+        exception_class: Type[Exception],
+        label: str,
+        response: Callable[[Exception], Dict[str, Any]] = custom_response,
+        detail: Callable[[Exception], Any] = str
+    ) -> None:
+    """Map an exception class, and the subclasses without their own mapping."""
+    _MAPPINGS[exception_class] = ErrorMapping(label, response, detail)
+    resolve_error.cache_clear()
+
+@lru_cache(maxsize=None)
+def resolve_error(exception_class: Type[Exception]) -> ErrorMapping:
+    """Find the mapping of the closest class in the MRO, once per exception class."""
+    for klass in exception_class.__mro__:
+        if klass in _MAPPINGS:
+            return _MAPPINGS[klass]
+
+    return _MAPPINGS[Exception]
+
+register_error(Exception, "An error occurred", internal_error_response)
+register_error(CustomException, "Custom exception")
+register_error(InvalidVehicleIDError, "Invalid vehicle_id")
+register_error(InvalidPaginationError, "Invalid pagination")
+register_error(VehicleNotFoundError, "Vehicle not found")
+register_error(CustomNotFoundException, "Custom not found exception")
+register_error(MultipleResultsFoundError, "Multiple results found error")
+register_error(VehicleAlreadyExistsError, "Vehicle already exists error")
+register_error(VehicleSaleNotInitializedError, "Vehicle sale not initialized error")
+register_error(VehicleAlreadySoldError, "Vehicle already sold error")
+register_error(VehicleAlreadyPickedUpError, "Vehicle already picked up error")
+register_error(IdempotencyKeyReusedError, "Idempotency key reused error")
+register_error(CustomDatabaseException, "Custom database exception")
+register_error(KeyError, "Key error", bad_request('Key error'))
+register_error(ValueError, "Value error", bad_request('Value error'))
+register_error(
+    ValidationError,
+    "Validation error",
+    validation_response,
+    lambda error: error.errors(include_url=False)
+)
@@ -58,3 +58,15 @@ class VehicleAlreadyPickedUpError(CustomException):
     Vehicle Already Picked Up Error
     """
     pass
+
+class InvalidPaginationError(CustomException):
+    """
+    Invalid Pagination Error
+    """
+    pass
+
+class IdempotencyKeyReusedError(CustomException):
+    """
+    Idempotency Key Reused Error
+    """
+    pass
@@ -0,0 +1,68 @@
+"""
+This module contains the in-process cache, kept alive across warm invocations.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from vehicle.application.ports.cache import Cache
+
+class InMemoryCache(Cache):
+    """
+    Bounded LRU cache with an optional time to live per entry.
+    """
+    def __init__(
+            self,
+            max_size: int = 1024,
+            ttl: Optional[float] = None,
+            clock: Callable[[], float] = time.monotonic
+        ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a value, dropping it if it expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self.clock():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry when full.
+        """
+        expires_at = self.clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        """
+        Remove values from the cache.
+        """
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Remove every value from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
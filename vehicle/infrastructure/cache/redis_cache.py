@@ -0,0 +1,65 @@
+"""
+This module contains the cache shared between containers, backed by Redis.
+"""
+import json
+import logging
+from typing import Any, Optional, Tuple, Type
+
+from vehicle.application.ports.cache import Cache
+
+logger = logging.getLogger(__name__)
+
+class RedisCache(Cache):
+    """
+    Cache stored in Redis (e.g. ElastiCache), so invalidations reach every container.
+    The client only needs the get, set and delete commands of redis-py.
+    A call failing with one of errors is logged and treated as a miss, so an
+    outage of Redis falls back to the database instead of failing the request.
+    """
+    def __init__(
+            self,
+            client,
+            ttl: int = 60,
+            prefix: str = "auto-deal:",
+            errors: Tuple[Type[Exception], ...] = (Exception,)
+        ):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.errors = errors
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a value from Redis, or None when Redis is unavailable.
+        """
+        try:
+            value = self.client.get(self.prefix + key)
+        except self.errors as error:
+            logger.warning(f"Vehicle cache unavailable, reading {key} from the database: {error}")
+            return None
+
+        if value is None:
+            return None
+
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value in Redis with the configured expiration.
+        """
+        try:
+            self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+        except self.errors as error:
+            logger.warning(f"Vehicle cache unavailable, {key} not cached: {error}")
+
+    def delete(self, *keys: str) -> None:
+        """
+        Remove values from Redis. When Redis is unavailable, they expire with their TTL.
+        """
+        if not keys:
+            return
+
+        try:
+            self.client.delete(*[self.prefix + key for key in keys])
+        except self.errors as error:
+            logger.error(f"Vehicle cache unavailable, {keys} not invalidated: {error}")
@@ -0,0 +1,41 @@
+"""
+This module contains the cache setup for the vehicle application.
+"""
+import os
+
+from vehicle.application.ports.cache import Cache
+from vehicle.infrastructure.cache.memory_cache import InMemoryCache
+from vehicle.infrastructure.cache.redis_cache import RedisCache
+
+def setup_cache() -> Cache:
+    """
+    Setup the vehicle cache.
+    Uses Redis when VEHICLE_CACHE_URL is set, otherwise an in-process cache
+    that lives as long as the Lambda container. Each function has its own
+    containers, so the writers cannot reach the in-process cache of
+    get_vehicle: it is only refreshed when its entries expire, after
+    VEHICLE_CACHE_TTL seconds.
+    Redis calls give up after VEHICLE_CACHE_TIMEOUT seconds, and a failed
+    call falls back to the database.
+    """
+    ttl = int(os.getenv("VEHICLE_CACHE_TTL", "30"))
+    cache_url = os.getenv("VEHICLE_CACHE_URL")
+
+    if cache_url:
+        # redis is only imported by the containers that share a cache.
+        import redis
+
+        timeout = float(os.getenv("VEHICLE_CACHE_TIMEOUT", "0.2"))
+        client = redis.Redis.from_url(cache_url, socket_timeout=timeout, socket_connect_timeout=timeout)
+
+        return RedisCache(client, ttl=ttl, errors=(redis.RedisError,))
+
+    return InMemoryCache(
+        max_size=int(os.getenv("VEHICLE_CACHE_MAX_SIZE", "1024")),
+        ttl=ttl,
+    )
+
+vehicle_cache = setup_cache()
+# Only a shared cache is invalidated by the writers.
+shared_vehicle_cache = vehicle_cache if isinstance(vehicle_cache, RedisCache) else None
+brand_cache = InMemoryCache(max_size=int(os.getenv("BRAND_CACHE_MAX_SIZE", "512")))
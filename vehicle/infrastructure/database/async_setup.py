@@ -0,0 +1,56 @@
+"""
+This module contains the asyncio database setup for the vehicle application.
+The engine is built on first use, so handlers that never open an async
+session do not import the asyncio drivers.
+"""
+import os
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from vehicle.infrastructure.database.setup import engine_options
+
+# Synchronous driver prefixes and their asyncio counterparts.
+ASYNC_DRIVERS = {
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+    "postgresql://": "postgresql+asyncpg://",
+    "postgres://": "postgresql+asyncpg://",
+    "sqlite:///": "sqlite+aiosqlite:///",
+    "sqlite://": "sqlite+aiosqlite://",
+}
+
+def async_database_url(database_url: str) -> str:
+    """
+    Swap the driver of a database URL for its asyncio counterpart.
+    """
+    for prefix, async_prefix in ASYNC_DRIVERS.items():
+        if database_url.startswith(prefix):
+            return async_prefix + database_url[len(prefix):]
+
+    return database_url
+
+@lru_cache(maxsize=None)
+def async_session_factory() -> async_sessionmaker:
+    """
+    Build the asyncio engine and its session factory, once per container.
+    """
+    database_url = os.getenv("DATABASE_URL") or "sqlite:///:memory:"
+    engine = create_async_engine(async_database_url(database_url), **engine_options(database_url))
+
+    return async_sessionmaker(engine, autocommit=False, autoflush=False)
+
+@asynccontextmanager
+async def async_session_scope() -> AsyncIterator[AsyncSession]:
+    """
+    Provide an async session for the duration of an invocation.
+    The session is always closed, returning its connection to the pool.
+    """
+    db = async_session_factory()()
+    try:
+        yield db
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
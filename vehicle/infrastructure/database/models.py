@@ -3,7 +3,7 @@ This module contains the database models for the AutoDeal application.
 """
 import enum
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, UniqueConstraint, Enum
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Date, DateTime, UniqueConstraint, Enum, Text, Index, Boolean, text, true
 from sqlalchemy.orm import relationship
 from vehicle.infrastructure.database.setup import Base
 
@@ -29,12 +29,29 @@ class Vehicle(Base):
     year = Column(Integer)
     color = Column(String)
     price = Column(Float)
+    # False from the moment a sale is initialized until it is reverted,
+    # so listings never have to look at vehicle_sold.
+    is_available = Column(Boolean, default=True, server_default=true(), nullable=False)
     brand = relationship('VehicleBrand', back_populates='vehicles')
     sold = relationship('VehicleSold', uselist=False, back_populates='vehicle')
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
-    __table_args__ = (UniqueConstraint("model", name="model_key"),)
+    __table_args__ = (
+        UniqueConstraint("model", name="model_key"),
+        # Keyset pagination of listings and searches orders by (price, id).
+        Index("ix_vehicle_price_id", "price", "id"),
+        # Searches by brand, usually narrowed by year.
+        Index("ix_vehicle_brand_id_year", "brand_id", "year"),
+        # Storefront listings: a range scan over available vehicles only.
+        Index(
+            "ix_vehicle_available_price_id",
+            "price",
+            "id",
+            postgresql_where=text("is_available"),
+            sqlite_where=text("is_available = 1"),
+        ),
+    )
 
 class StatusEnum(enum.Enum):
     """
@@ -54,7 +71,61 @@ class VehicleSold(Base):
     status = Column(Enum(StatusEnum), default=StatusEnum.draft, nullable=False)
     sold_price = Column(Float, nullable=False)
     sold_date = Column(DateTime, default=datetime.now)
+    # Brand of the vehicle when the sale was confirmed, the one it is reported under.
+    brand_id = Column(Integer, ForeignKey('vehicle_brand.id'), nullable=True)
     user_id = Column(String, nullable=False)
     vehicle = relationship('Vehicle', back_populates='sold')
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    __table_args__ = (
+        # The sweeper scans the oldest drafts to revert the abandoned ones.
+        Index("ix_vehicle_sold_status_created_at", "status", "created_at"),
+    )
+
+class VehicleSalesReport(Base):
+    """
+    Represents the confirmed sales of a brand in a month, by status.
+    It is kept up to date in the transactions that confirm, pick up or revert sales.
+    """
+    __tablename__ = 'vehicle_sales_report'
+    status = Column(String, primary_key=True)
+    brand_id = Column(Integer, ForeignKey('vehicle_brand.id'), primary_key=True)
+    month = Column(Date, primary_key=True)
+    sales_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+class IdempotencyRecord(Base):
+    """
+    Represents the response of a request sent with an Idempotency-Key,
+    replayed when the client retries it until it expires.
+    """
+    __tablename__ = 'idempotency_record'
+    user_id = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    request_hash = Column(String, nullable=False)
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.now)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class ProcessedMessage(Base):
+    """
+    Represents a queue message already consumed, so its redeliveries are skipped.
+    It is written in the same transaction as the change the message triggered.
+    """
+    __tablename__ = 'processed_message'
+    message_id = Column(String, primary_key=True)
+    processed_at = Column(DateTime, default=datetime.now, index=True)
+
+class OutboxMessage(Base):
+    """
+    Represents a message waiting to be relayed to a queue.
+    It is written in the same transaction as the change it announces.
+    """
+    __tablename__ = 'outbox_message'
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    queue = Column(String, nullable=False)
+    group_id = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.now)
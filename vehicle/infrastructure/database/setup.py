@@ -3,9 +3,11 @@ This module contains the database setup for the vehicle application.
 """
 import os
 import sys
-from dotenv import load_dotenv
+from contextlib import contextmanager
+from typing import Iterator
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool
 
 def is_running_with_alembic():
     """
@@ -13,15 +15,46 @@ def is_running_with_alembic():
     """
     return 'alembic' in sys.modules
 
+def is_enabled(name: str, default: str = "false") -> bool:
+    """
+    Read a boolean flag from the environment.
+    """
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+def engine_options(database_url: str) -> dict:
+    """
+    Build the connection pool options for the engine.
+
+    A Lambda container serves one invocation at a time, so the pool is kept
+    small and is reused across warm invocations. When connecting through
+    RDS Proxy, DB_USE_NULL_POOL hands pooling over to the proxy.
+    """
+    if database_url.startswith("sqlite"):
+        return {}
+
+    if is_enabled("DB_USE_NULL_POOL"):
+        return {"poolclass": NullPool}
+
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "1")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "2")),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "10")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "300")),
+        "pool_pre_ping": is_enabled("DB_POOL_PRE_PING", "true"),
+    }
+
 def setup_database():
     """
     Setup the database connection and session.
     """
     if is_running_with_alembic():
+        # Only migrations read .env, so handlers never pay for importing dotenv.
+        from dotenv import load_dotenv
+
         load_dotenv()
 
     database_url = os.getenv("DATABASE_URL") or "sqlite:///:memory:"
-    engine = create_engine(database_url)
+    engine = create_engine(database_url, **engine_options(database_url))
     session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     base = declarative_base()
 
@@ -29,6 +62,21 @@ def setup_database():
 
 engine, SessionLocal, Base = setup_database()
 
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    Provide a session for the duration of an invocation.
+    The session is always closed, returning its connection to the pool.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
 def get_db():
     """
     This function returns a session to the database.
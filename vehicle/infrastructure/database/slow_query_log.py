@@ -0,0 +1,190 @@
+"""
+This module contains the opt-in slow query log of the vehicle application.
+"""
+import hashlib
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from vehicle.infrastructure.database.setup import is_enabled
+
+logger = logging.getLogger(__name__)
+
+# Fingerprints kept per container, so unexpected statements cannot grow it forever.
+MAX_FINGERPRINTS = 500
+
+EXPLAIN_SAVEPOINT = "slow_query_explain"
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAMETERS = re.compile(r"%\(\w+\)s|%s|\$\d+|\?")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACES = re.compile(r"\s+")
+
+def normalize(statement: str) -> str:
+    """
+    Reduce a statement to its shape: literals and bound parameters become ?,
+    lists of them a single (...), so IN lists of any size share a fingerprint.
+    """
+    shape = _LITERALS.sub("?", _PARAMETERS.sub("?", statement))
+    shape = _LISTS.sub("(...)", shape)
+
+    return _SPACES.sub(" ", shape).strip()
+
+def fingerprint(shape: str) -> str:
+    """
+    Short identifier of a statement shape, to search the logs with.
+    """
+    return hashlib.sha1(shape.encode()).hexdigest()[:12]
+
+class SlowQueryLog:
+    """
+    Record the duration and row count of every statement by fingerprint,
+    and log the ones slower than a threshold. On PostgreSQL, the plan of
+    slow SELECTs can be captured with EXPLAIN (ANALYZE, BUFFERS), which
+    runs the statement again.
+    """
+    def __init__(self, threshold_ms: float, explain: bool = False, top_n: int = 10):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.top_n = top_n
+        self.stats: Dict[str, Dict[str, Any]] = {}
+
+    def install(self, target: Any = Engine) -> "SlowQueryLog":
+        """
+        Listen to the statements of an engine, every engine by default.
+        """
+        event.listen(target, "before_cursor_execute", self.before_cursor_execute)
+        event.listen(target, "after_cursor_execute", self.after_cursor_execute)
+
+        return self
+
+    def uninstall(self, target: Any = Engine) -> None:
+        """
+        Stop listening to the statements of an engine.
+        """
+        event.remove(target, "before_cursor_execute", self.before_cursor_execute)
+        event.remove(target, "after_cursor_execute", self.after_cursor_execute)
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        """
+        Remember when the statement was sent.
+        """
+        conn.info.setdefault("slow_query_started_at", []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        """
+        Record the statement, and log it when it is slow.
+        """
+        duration_ms = (time.perf_counter() - conn.info["slow_query_started_at"].pop()) * 1000
+        rows = cursor.rowcount
+        shape = normalize(statement)
+        key = fingerprint(shape)
+        self._record(key, shape, duration_ms, rows)
+
+        if duration_ms < self.threshold_ms:
+            return
+
+        plan = None
+        if self.explain and not executemany and self._explainable(conn, shape):
+            plan = self._explain(conn, statement, parameters)
+
+        logger.warning(
+            f"Slow query {key} took {duration_ms:.1f} ms and returned {rows} rows: {shape}"
+            + (f"\n{plan}" if plan else "")
+        )
+
+    def _record(self, key: str, shape: str, duration_ms: float, rows: int) -> None:
+        """
+        Add a statement to the aggregate of its fingerprint.
+        """
+        stats = self.stats.get(key)
+        if stats is None:
+            if len(self.stats) >= MAX_FINGERPRINTS:
+                return
+            stats = self.stats[key] = {
+                "fingerprint": key,
+                "statement": shape,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "rows": 0,
+            }
+
+        stats["count"] += 1
+        stats["total_ms"] += duration_ms
+        stats["max_ms"] = max(stats["max_ms"], duration_ms)
+        stats["rows"] += max(rows, 0)
+
+    @staticmethod
+    def _explainable(conn, shape: str) -> bool:
+        """
+        Only SELECTs are explained, as EXPLAIN ANALYZE runs the statement.
+        WITH is left out, since its CTEs may write.
+        """
+        return conn.dialect.name == "postgresql" and shape.upper().startswith("SELECT")
+
+    @staticmethod
+    def _explain(conn, statement: str, parameters: Any) -> Optional[str]:
+        """
+        Capture the plan of a statement on a DBAPI cursor of the same
+        connection, so the EXPLAIN is not recorded itself. It runs inside a
+        savepoint: a failed EXPLAIN, such as one hitting statement_timeout,
+        is rolled back without aborting the transaction of the handler.
+        """
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            try:
+                cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+            except Exception:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+                raise
+            cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+
+            return plan
+        except Exception as error:
+            logger.warning(f"Could not explain the slow query: {error}")
+            return None
+        finally:
+            cursor.close()
+
+    def top(self) -> List[Dict[str, Any]]:
+        """
+        The fingerprints that took the most time in this container.
+        """
+        return sorted(self.stats.values(), key=lambda stats: stats["total_ms"], reverse=True)[:self.top_n]
+
+    def log_top(self) -> None:
+        """
+        Log the fingerprints that took the most time in this container.
+        """
+        for stats in self.top():
+            logger.info(
+                f"Query {stats['fingerprint']}: {stats['count']} calls, "
+                f"{stats['total_ms']:.1f} ms total, {stats['max_ms']:.1f} ms max, "
+                f"{stats['rows']} rows: {stats['statement']}"
+            )
+
+def setup_slow_query_log() -> Optional[SlowQueryLog]:
+    """
+    Setup the slow query log when SLOW_QUERY_LOG_MS is set.
+    SLOW_QUERY_EXPLAIN captures the plans of slow SELECTs on PostgreSQL,
+    and SLOW_QUERY_TOP_N is how many fingerprints are reported.
+    """
+    threshold_ms = os.getenv("SLOW_QUERY_LOG_MS")
+    if not threshold_ms:
+        return None
+
+    return SlowQueryLog(
+        threshold_ms=float(threshold_ms),
+        explain=is_enabled("SLOW_QUERY_EXPLAIN"),
+        top_n=int(os.getenv("SLOW_QUERY_TOP_N", "10")),
+    ).install()
+
+slow_query_log = setup_slow_query_log()
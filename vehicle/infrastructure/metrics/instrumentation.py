@@ -0,0 +1,47 @@
+"""
+This module contains the decorator that instruments the Lambda handlers.
+"""
+import time
+from functools import wraps
+from typing import Callable
+
+from aws_lambda_powertools.metrics import MetricUnit
+
+from vehicle.infrastructure.database.slow_query_log import slow_query_log
+from vehicle.infrastructure.metrics.setup import database_activity, elapsed_ms, metrics
+
+_cold_start = True
+
+def instrumented(func: Callable):
+    """
+    Decorator that publishes the metrics of each invocation of a handler:
+    its latency, the statements it sent to the database and the time they
+    took, and whether it was a cold start. Metrics added while the handler
+    runs, such as the SQS send latency, are published with them.
+    With the slow query log enabled, its top fingerprints are logged too.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        global _cold_start
+        cold_start, _cold_start = _cold_start, False
+        database_activity.reset()
+        # Before the handler runs, so metrics flushed early at the limit of
+        # 100 values carry the dimension too.
+        metrics.add_dimension(name="function", value=func.__name__)
+        started_at = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.add_metric(name="Latency", unit=MetricUnit.Milliseconds, value=elapsed_ms(started_at))
+            metrics.add_metric(name="ColdStart", unit=MetricUnit.Count, value=int(cold_start))
+            metrics.add_metric(name="DbStatements", unit=MetricUnit.Count, value=database_activity.statements)
+            metrics.add_metric(
+                name="DbTime",
+                unit=MetricUnit.Milliseconds,
+                value=round(database_activity.seconds * 1000, 3)
+            )
+            metrics.flush_metrics()
+            if slow_query_log is not None:
+                slow_query_log.log_top()
+
+    return wrapper
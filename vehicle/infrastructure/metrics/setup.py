@@ -0,0 +1,69 @@
+"""
+This module contains the metrics setup for the vehicle application.
+"""
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from aws_lambda_powertools.metrics import Metrics, MetricUnit
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Metrics are printed to stdout in CloudWatch Embedded Metric Format,
+# so publishing them costs no API call.
+metrics = Metrics(
+    namespace=os.getenv("POWERTOOLS_METRICS_NAMESPACE", "AutoDeal"),
+    service=os.getenv("POWERTOOLS_SERVICE_NAME", "vehicle"),
+)
+
+class DatabaseActivity:
+    """
+    Count the statements every engine sends and the time the database takes
+    to answer them, between two resets.
+    """
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+    def reset(self) -> None:
+        """
+        Start counting again, at the beginning of an invocation.
+        """
+        self.statements = 0
+        self.seconds = 0.0
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        """
+        Remember when the statement was sent.
+        """
+        conn.info.setdefault("statement_started_at", []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        """
+        Add the statement and its duration.
+        """
+        started_at = conn.info["statement_started_at"].pop()
+        self.statements += 1
+        self.seconds += time.perf_counter() - started_at
+
+database_activity = DatabaseActivity()
+event.listen(Engine, "before_cursor_execute", database_activity.before_cursor_execute)
+event.listen(Engine, "after_cursor_execute", database_activity.after_cursor_execute)
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """
+    Add the duration of a block as a metric, in milliseconds.
+    """
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_metric(name=name, unit=MetricUnit.Milliseconds, value=elapsed_ms(started_at))
+
+def elapsed_ms(started_at: float) -> float:
+    """
+    Milliseconds elapsed since a time.perf_counter() reading.
+    """
+    return round((time.perf_counter() - started_at) * 1000, 3)
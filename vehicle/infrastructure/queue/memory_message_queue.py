@@ -0,0 +1,30 @@
+"""
+This module contains a message queue kept in memory, for tests and local runs.
+"""
+from typing import Dict, Iterable, List
+
+from vehicle.application.ports.message_queue import MessageQueue
+from vehicle.domain.entities.outbox_message import OutboxMessage
+
+class InMemoryMessageQueue(MessageQueue):
+    """
+    Stand-in for SQS that records the messages sent to each queue.
+    Messages whose id is in rejected_ids are refused, like a failed batch entry.
+    """
+    def __init__(self, rejected_ids: Iterable[int] = ()):
+        self.rejected_ids = set(rejected_ids)
+        self.sent: Dict[str, List[OutboxMessage]] = {}
+        self.batches = 0
+
+    def send_batch(self, queue: str, messages: List[OutboxMessage]) -> List[int]:
+        """
+        Record a batch of messages.
+        """
+        if len(messages) > self.max_batch_size:
+            raise ValueError(f"A batch holds at most {self.max_batch_size} messages")
+
+        self.batches += 1
+        accepted = [message for message in messages if message.id not in self.rejected_ids]
+        self.sent.setdefault(queue, []).extend(accepted)
+
+        return [message.id for message in accepted]
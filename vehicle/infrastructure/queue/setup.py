@@ -0,0 +1,44 @@
+"""
+This module contains the message queue setup for the vehicle application.
+"""
+import os
+from functools import lru_cache
+
+from vehicle.application.ports.message_queue import MessageQueue
+from vehicle.domain.entities.outbox_message import INITIALIZE_PAYMENT_QUEUE
+from vehicle.infrastructure.database.setup import is_enabled
+from vehicle.infrastructure.queue.memory_message_queue import InMemoryMessageQueue
+from vehicle.infrastructure.queue.sqs_message_queue import SqsMessageQueue
+
+@lru_cache(maxsize=None)
+def sqs_client():
+    """
+    Build the SQS client once per container.
+    boto3 is imported here, not at module level, as importing it and building
+    a client is the most expensive part of a cold start.
+    """
+    import boto3
+
+    return boto3.client("sqs", region_name=os.getenv("AWS_REGION", "us-east-1"))
+
+def setup_message_queue() -> MessageQueue:
+    """
+    Setup the queue the outbox is relayed to.
+    Uses SQS at INITIALIZE_PAYMENT_QUEUE_URL. The in-memory stand-in drops
+    what it is sent, so it is only used when MESSAGE_QUEUE_IN_MEMORY is set
+    by tests and benchmarks; a relay without a queue URL fails instead of
+    deleting the payment requests it could not send.
+    """
+    queue_url = os.getenv("INITIALIZE_PAYMENT_QUEUE_URL")
+
+    if queue_url:
+        return SqsMessageQueue(sqs_client, {INITIALIZE_PAYMENT_QUEUE: queue_url})
+
+    if is_enabled("MESSAGE_QUEUE_IN_MEMORY"):
+        return InMemoryMessageQueue()
+
+    raise RuntimeError(
+        "INITIALIZE_PAYMENT_QUEUE_URL is not set: set it, or MESSAGE_QUEUE_IN_MEMORY outside of AWS"
+    )
+
+message_queue = setup_message_queue()
@@ -0,0 +1,50 @@
+"""
+This module contains the message queue backed by Amazon SQS.
+"""
+from functools import cached_property
+from typing import Any, Callable, Dict, List
+
+from vehicle.application.ports.message_queue import MessageQueue
+from vehicle.domain.entities.outbox_message import OutboxMessage
+from vehicle.infrastructure.metrics.setup import timed
+
+class SqsMessageQueue(MessageQueue):
+    """
+    Message queue that relays the outbox to SQS FIFO queues with send_message_batch.
+    The outbox id is the deduplication id, so a message relayed twice is delivered once.
+    The client is built on the first send, keeping boto3 out of the cold start.
+    """
+    def __init__(self, client_factory: Callable[[], Any], queue_urls: Dict[str, str]):
+        self.client_factory = client_factory
+        self.queue_urls = queue_urls
+
+    @cached_property
+    def client(self):
+        """
+        The SQS client, created on first use.
+        """
+        return self.client_factory()
+
+    def send_batch(self, queue: str, messages: List[OutboxMessage]) -> List[int]:
+        """
+        Send a batch of messages to SQS, publishing the latency of the call.
+        """
+        if not messages:
+            return []
+
+        client = self.client
+        with timed("SqsSendLatency"):
+            response = client.send_message_batch(
+                QueueUrl=self.queue_urls[queue],
+                Entries=[
+                    {
+                        "Id": str(message.id),
+                        "MessageBody": message.body,
+                        "MessageGroupId": message.group_id,
+                        "MessageDeduplicationId": f"outbox-{message.id}",
+                    }
+                    for message in messages
+                ],
+            )
+
+        return [int(entry["Id"]) for entry in response.get("Successful", [])]
@@ -0,0 +1,54 @@
+"""
+This module contains the encryption of the secret fields of staged messages.
+"""
+import json
+from functools import cached_property
+from typing import Any, Dict, Optional, Tuple
+
+class FieldCipher:
+    """
+    Encrypt the secret fields of a message body with Fernet, so credentials
+    staged in the outbox are never stored in plaintext, and decrypt them
+    when the message is relayed. keys is a comma-separated list: the first
+    key encrypts, and every key decrypts, so a key can be rotated while
+    messages encrypted with the previous one are still pending.
+    """
+    def __init__(self, keys: Optional[str], fields: Tuple[str, ...]):
+        self.keys = keys
+        self.fields = fields
+
+    @cached_property
+    def fernet(self):
+        """
+        The Fernet of the keys, built on first use.
+        cryptography is imported here, not at module level, so the handlers
+        that never stage a secret do not pay for it on cold start.
+        """
+        if not self.keys:
+            raise RuntimeError("OUTBOX_ENCRYPTION_KEY is not set: secrets cannot be staged in the outbox")
+
+        from cryptography.fernet import Fernet, MultiFernet
+
+        return MultiFernet([Fernet(key.strip()) for key in self.keys.split(",")])
+
+    def encrypt_fields(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Encrypt the secret fields of a message body.
+        """
+        return {
+            name: self.fernet.encrypt(value.encode()).decode() if name in self.fields else value
+            for name, value in body.items()
+        }
+
+    def decrypt_fields(self, body: str) -> str:
+        """
+        Decrypt the secret fields of a serialized message body, if it has any.
+        """
+        message = json.loads(body)
+        if not any(name in message for name in self.fields):
+            return body
+
+        return json.dumps({
+            name: self.fernet.decrypt(value.encode()).decode() if name in self.fields else value
+            for name, value in message.items()
+        })
@@ -0,0 +1,17 @@
+"""
+This module contains the security setup for the vehicle application.
+"""
+import os
+
+from vehicle.infrastructure.security.field_cipher import FieldCipher
+
+# Fields of the outbox messages holding credentials.
+OUTBOX_SECRET_FIELDS = ("access_token",)
+
+def setup_outbox_cipher() -> FieldCipher:
+    """
+    Setup the cipher of the outbox secrets, with the keys of OUTBOX_ENCRYPTION_KEY.
+    """
+    return FieldCipher(os.getenv("OUTBOX_ENCRYPTION_KEY"), OUTBOX_SECRET_FIELDS)
+
+outbox_cipher = setup_outbox_cipher()